@@ -4,13 +4,14 @@ import pandas as pd
 from typing import Tuple, List, Dict, Any
 
 class BaseEngine(ABC):
-    def __init__(self, data: pd.DataFrame, strategy_cls, config: dict):
+    def __init__(self, data: pd.DataFrame, strategy_cls, config: dict, copy: bool = True):
         """
         data: OHLCV dataframe (index = timestamps)
         strategy_cls: class that follows BaseStrategy API (data, config) -> generate_signals()
         config: strategy config dict (params like fast/slow/qty, cash, commission, symbol)
+        copy: False keeps data's arrays (a shallow copy), e.g. a read-only shared-memory frame
         """
-        self.data = data.copy() if data is not None else data
+        self.data = data.copy(deep=copy) if data is not None else data
         self.strategy_cls = strategy_cls
         self.config = config or {}
 
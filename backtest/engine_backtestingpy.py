@@ -5,8 +5,8 @@ from backtest.stats_utils import trades_to_equity_curve, compute_stats
 from backtest.evaluator import evaluate_backtest
 
 class BacktestingPyEngine:
-    def __init__(self, data: pd.DataFrame, strategy_cls, config: dict):
-        self.data = data.copy()
+    def __init__(self, data: pd.DataFrame, strategy_cls, config: dict, copy: bool = True):
+        self.data = data.copy(deep=copy)
         self.strategy_cls = strategy_cls
         self.config = config
 
@@ -0,0 +1,267 @@
+# backtest/engine_custom.py
+"""Native backtest engine: one compiled pass over the bar arrays.
+
+Strategy signals are replayed the way VectorBTEngine replays them (a buy
+exits a short or enters a long, a sell exits a long or enters a short, a
+repeat in the current direction is ignored) and filled at the close of
+their bar for config["qty"] units, with config["commission"] charged on
+every fill's value and optional config["slippage"] against the trader.
+
+Optional engine-side stops, config["sl_stop"] / config["tp_stop"] (fractions
+of the entry price, vectorbt's names), are checked intrabar on the bars after
+the entry against low/high; a stop fills at its level, or at the open when
+the bar gaps through it, and the stop loss wins when both are hit in one bar.
+After a stop the engine stays flat until the strategy's next entry, so the
+strategy's own exit signal for that position is not taken as a new entry.
+
+run() returns the trades as a TradeFrame: the simulation's record arrays,
+yielding the unified trade dicts when iterated (built on first use).
+"""
+import numpy as np
+import pandas as pd
+
+from backtest.base_engine import BaseEngine
+from backtest.stats_utils import compute_stats
+from strategies.signal_frame import BUY, as_signal_frame
+from utils.jit import njit
+
+# Exit reasons in the trade records
+EXIT_SIGNAL, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_OPEN = 0, 1, 2, 3
+_EXIT_NAMES = {EXIT_SIGNAL: "signal", EXIT_STOP_LOSS: "stop_loss", EXIT_TAKE_PROFIT: "take_profit", EXIT_OPEN: "open"}
+
+
+@njit
+def _simulate(open_, high, low, close, sig_pos, sig_side, qty, fees, slippage, cash, sl_stop, tp_stop):
+    """
+    Returns (equity per bar, trade records). Records are arrays over trades: entry bar, exit bar,
+    direction (+1 long / -1 short), entry price, exit price, fees paid, pnl and exit reason. A position
+    still open after the last bar is closed there at the close (reason EXIT_OPEN, no exit fee).
+    """
+    n_bars, n_sig = len(close), len(sig_pos)
+    equity = np.empty(n_bars)
+
+    cap = n_sig // 2 + 1                 # every trade needs an entry signal
+    entry_bar = np.empty(cap, np.int64)
+    exit_bar = np.empty(cap, np.int64)
+    direction = np.empty(cap, np.int8)
+    entry_price = np.empty(cap)
+    exit_price = np.empty(cap)
+    paid = np.empty(cap)
+    pnl = np.empty(cap)
+    reason = np.empty(cap, np.int8)
+    n = 0
+
+    intent = 0              # the strategy's position, from its signals alone
+    position = 0            # the engine's position: intent, unless a stop closed it
+    price_in = 0.0
+    fee_in = 0.0
+    k = 0
+    for i in range(n_bars):
+        # Intrabar stops on bars after the entry
+        if position != 0 and entry_bar[n] < i:
+            fill = np.nan
+            why = EXIT_SIGNAL
+            if position == 1:
+                if sl_stop == sl_stop and low[i] <= price_in * (1 - sl_stop):
+                    fill = min(open_[i], price_in * (1 - sl_stop))
+                    why = EXIT_STOP_LOSS
+                elif tp_stop == tp_stop and high[i] >= price_in * (1 + tp_stop):
+                    fill = max(open_[i], price_in * (1 + tp_stop))
+                    why = EXIT_TAKE_PROFIT
+            else:
+                if sl_stop == sl_stop and high[i] >= price_in * (1 + sl_stop):
+                    fill = max(open_[i], price_in * (1 + sl_stop))
+                    why = EXIT_STOP_LOSS
+                elif tp_stop == tp_stop and low[i] <= price_in * (1 - tp_stop):
+                    fill = min(open_[i], price_in * (1 - tp_stop))
+                    why = EXIT_TAKE_PROFIT
+            if why != EXIT_SIGNAL:
+                fill *= 1 - position * slippage
+                fee_out = fees * qty * fill
+                cash += position * qty * fill - fee_out
+                exit_bar[n] = i
+                exit_price[n] = fill
+                paid[n] = fee_in + fee_out
+                pnl[n] = position * qty * (fill - price_in) - fee_in - fee_out
+                reason[n] = why
+                n += 1
+                position = 0
+
+        # Strategy signals at this bar's close, in order
+        while k < n_sig and sig_pos[k] == i:
+            side = sig_side[k]
+            k += 1
+            if intent == 0:
+                intent = side
+                position = side
+                price_in = close[i] * (1 + side * slippage)
+                fee_in = fees * qty * price_in
+                cash -= side * qty * price_in + fee_in
+                entry_bar[n] = i
+                direction[n] = side
+                entry_price[n] = price_in
+            elif side == -intent:
+                intent = 0
+                if position != 0:
+                    fill = close[i] * (1 - position * slippage)
+                    fee_out = fees * qty * fill
+                    cash += position * qty * fill - fee_out
+                    exit_bar[n] = i
+                    exit_price[n] = fill
+                    paid[n] = fee_in + fee_out
+                    pnl[n] = position * qty * (fill - price_in) - fee_in - fee_out
+                    reason[n] = EXIT_SIGNAL
+                    n += 1
+                    position = 0
+
+        equity[i] = cash + position * qty * close[i]
+
+    if position != 0:
+        exit_bar[n] = n_bars - 1
+        exit_price[n] = close[n_bars - 1]
+        paid[n] = fee_in
+        pnl[n] = position * qty * (close[n_bars - 1] - price_in) - fee_in
+        reason[n] = EXIT_OPEN
+        n += 1
+
+    return (equity, entry_bar[:n].copy(), exit_bar[:n].copy(), direction[:n].copy(), entry_price[:n].copy(),
+            exit_price[:n].copy(), paid[:n].copy(), pnl[:n].copy(), reason[:n].copy())
+
+
+def _stop(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+class TradeFrame:
+    """
+    Columnar trades of one run, one array entry per trade: entry_bar / exit_bar (positions in `index`),
+    direction (BUY / SELL), entry_price, exit_price, fees, pnl and reason (EXIT_* codes). Iterating yields
+    the unified trade dicts, like SignalFrame does for signals; to_frame() gives a DataFrame.
+    """
+
+    def __init__(self, index: pd.Index, symbol: str, qty: float, entry_bar, exit_bar, direction, entry_price,
+                 exit_price, fees, pnl, reason):
+        self.index = index
+        self.symbol = symbol
+        self.qty = qty
+        self.entry_bar = entry_bar
+        self.exit_bar = exit_bar
+        self.direction = direction
+        self.entry_price = entry_price
+        self.exit_price = exit_price
+        self.fees = fees
+        self.pnl = pnl
+        self.reason = reason
+        self._records = None
+
+    def to_records(self) -> list[dict]:
+        if self._records is None:
+            # Timestamps boxed in one vectorised conversion (iterating a DatetimeIndex boxes them one by one)
+            entry_ts = self.index[self.entry_bar].astype(object).tolist()
+            exit_ts = self.index[self.exit_bar].astype(object).tolist()
+            symbol, qty = self.symbol, self.qty
+            self._records = [
+                {
+                    "timestamp": t_in,
+                    "symbol": symbol,
+                    "side": "buy" if d == BUY else "sell",
+                    "qty": qty,
+                    "price": p_in,
+                    "exit_timestamp": t_out,
+                    "exit_price": p_out,
+                    "fees": f,
+                    "pnl": p,
+                    "exit_reason": _EXIT_NAMES[r],
+                }
+                for t_in, t_out, d, p_in, p_out, f, p, r in zip(
+                    entry_ts, exit_ts, self.direction.tolist(), self.entry_price.tolist(),
+                    self.exit_price.tolist(), self.fees.tolist(), self.pnl.tolist(), self.reason.tolist())
+            ]
+        return self._records
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "symbol": self.symbol,
+            "side": np.where(self.direction == BUY, "buy", "sell"),
+            "qty": self.qty,
+            "price": self.entry_price,
+            "exit_timestamp": self.index[self.exit_bar],
+            "exit_price": self.exit_price,
+            "fees": self.fees,
+            "pnl": self.pnl,
+            "exit_reason": np.array(list(_EXIT_NAMES.values()))[self.reason],
+        }, index=self.index[self.entry_bar].rename("timestamp"))
+
+    def __len__(self):
+        return len(self.pnl)
+
+    def __iter__(self):
+        return iter(self.to_records())
+
+    def __getitem__(self, item):
+        return self.to_records()[item]
+
+    def __repr__(self):
+        return f"TradeFrame({len(self)} trades, symbol={self.symbol!r})"
+
+
+class CustomEngine(BaseEngine):
+    def __init__(self, data: pd.DataFrame, strategy_cls, config: dict, copy: bool = True):
+        super().__init__(data, strategy_cls, config, copy=copy)
+
+    def run(self, save_html: str | None = None):
+        df = self.data
+        cfg = self.config
+
+        # ----------------------------------------------------
+        # 1. Generate signals from strategy
+        # ----------------------------------------------------
+        strategy = self.strategy_cls(df, cfg)
+        signals = as_signal_frame(strategy.generate_signals(), df.index)
+
+        # ----------------------------------------------------
+        # 2. Simulate fills, fees, positions and stops
+        # ----------------------------------------------------
+        qty = float(cfg.get("qty", 1))
+        fees = float(cfg.get("commission", 0.0))
+        cash = float(cfg.get("cash", 100000.0))
+
+        def column(name):
+            return np.ascontiguousarray(df[name].to_numpy(dtype=np.float64))
+
+        close = column("close")
+        (equity, entry_bar, exit_bar, direction, entry_price, exit_price, paid, pnl, reason) = _simulate(
+            column("open"), column("high"), column("low"), close,
+            np.ascontiguousarray(signals.pos, dtype=np.int64), np.ascontiguousarray(signals.side, dtype=np.int8),
+            qty, fees, float(cfg.get("slippage", 0.0)), cash,
+            _stop(cfg.get("sl_stop")), _stop(cfg.get("tp_stop")),
+        )
+
+        # ----------------------------------------------------
+        # 3. Trades in the unified format
+        # ----------------------------------------------------
+        index = df.index
+        trades = TradeFrame(index, cfg.get("symbol", "UNKNOWN"), qty, entry_bar, exit_bar, direction,
+                            entry_price, exit_price, paid, pnl, reason)
+
+        # ----------------------------------------------------
+        # 4. Metadata + evaluation
+        # ----------------------------------------------------
+        meta = {
+            "engine": "custom",
+            "strategy": self.strategy_cls.__name__,
+            "params": cfg,
+        }
+        equity = pd.Series(equity, index=index, name="equity", copy=False)
+        report = {
+            "equity": equity,
+            "stats": compute_stats(trades, equity, pnl=pnl),
+            "meta": meta,
+        }
+
+        if save_html:
+            from visuals.html_report import save_full_html_report
+            print("Saving Custom HTML report to", save_html)
+            save_full_html_report(df, trades, report["stats"], equity, save_html, meta=meta)
+
+        return df, trades, report
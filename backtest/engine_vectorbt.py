@@ -1,12 +1,14 @@
 # backtest/engine_vectorbt.py
+import numpy as np
 import pandas as pd
 import vectorbt as vbt
 from backtest.base_engine import BaseEngine
+from strategies.signal_frame import BUY, SELL, as_signal_frame
 
 
 class VectorBTEngine(BaseEngine):
-    def __init__(self, data: pd.DataFrame, strategy_cls, config: dict):
-        super().__init__(data, strategy_cls, config)
+    def __init__(self, data: pd.DataFrame, strategy_cls, config: dict, copy: bool = True):
+        super().__init__(data, strategy_cls, config, copy=copy)
 
     def run(self, save_html: str | None = None):
         df = self.data.copy()
@@ -15,65 +17,36 @@ class VectorBTEngine(BaseEngine):
         # 1. Generate signals from strategy
         # ----------------------------------------------------
         strategy = self.strategy_cls(df, self.config)
-        signals = strategy.generate_signals()     # list of signals (buy/sell)
+        signals = as_signal_frame(strategy.generate_signals(), df.index)   # SignalFrame (or list of dicts)
 
         # ----------------------------------------------------
         # 2. Build VectorBT-compatible signals (stateful)
         # ----------------------------------------------------
-        long_entries = pd.Series(False, index=df.index)
-        long_exits   = pd.Series(False, index=df.index)
+        n = len(df)
+        long_entries = np.zeros(n, dtype=bool)
+        long_exits = np.zeros(n, dtype=bool)
 
-        short_entries = pd.Series(False, index=df.index)
-        short_exits   = pd.Series(False, index=df.index)
+        short_entries = np.zeros(n, dtype=bool)
+        short_exits = np.zeros(n, dtype=bool)
 
-        # Sort signals chronologically
-        signals_sorted = sorted(signals, key=lambda s: pd.Timestamp(s["timestamp"]))
-
-        # Position state while replaying strategy signals
+        # Position state while replaying strategy signals (already in bar order):
+        # buy exits a short or enters a long, sell exits a long or enters a short,
+        # a duplicate in the current direction is ignored.
         pos = 0  # -1 short, 0 flat, +1 long
+        targets = {(-1, BUY): short_exits, (0, BUY): long_entries,
+                   (1, SELL): long_exits, (0, SELL): short_entries}
 
-        for s in signals_sorted:
-            ts = pd.Timestamp(s["timestamp"])
-            if ts not in df.index:
+        for i, side in zip(signals.pos.tolist(), signals.side.tolist()):
+            target = targets.get((pos, side))
+            if target is None:
                 continue
+            target[i] = True
+            pos += side
 
-            side = s["side"].lower()
-
-            # --------------------------------------------
-            # BUY LOGIC
-            # --------------------------------------------
-            if side == "buy":
-                if pos == -1:
-                    # EXIT SHORT ONLY
-                    short_exits.at[ts] = True
-                    pos = 0
-
-                elif pos == 0:
-                    # ENTER LONG ONLY
-                    long_entries.at[ts] = True
-                    pos = 1
-
-                else:
-                    # pos == 1: already in long → ignore duplicate buy
-                    continue
-
-            # --------------------------------------------
-            # SELL LOGIC
-            # --------------------------------------------
-            elif side == "sell":
-                if pos == 1:
-                    # EXIT LONG ONLY
-                    long_exits.at[ts] = True
-                    pos = 0
-
-                elif pos == 0:
-                    # ENTER SHORT ONLY
-                    short_entries.at[ts] = True
-                    pos = -1
-
-                else:
-                    # pos == -1: already short → ignore duplicate sell
-                    continue
+        long_entries = pd.Series(long_entries, index=df.index)
+        long_exits = pd.Series(long_exits, index=df.index)
+        short_entries = pd.Series(short_entries, index=df.index)
+        short_exits = pd.Series(short_exits, index=df.index)
 
         # ----------------------------------------------------
         # 3. Portfolio execution
@@ -83,6 +83,6 @@ def run_demo_backtest(engine_name="backtestingpy"):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--engine", default="backtestingpy", help="Choose engine: backtestingpy or vectorbt")
+    parser.add_argument("--engine", default="backtestingpy", help="Choose engine: backtestingpy, vectorbt or custom")
     args = parser.parse_args()
     run_demo_backtest(engine_name=args.engine)
@@ -0,0 +1,81 @@
+# backtest/run_sweep.py
+
+import argparse
+import importlib
+from pathlib import Path
+
+from markets.common.data_factory import get_data_fetcher
+from markets.common.data_store import DataStore
+from backtest.sweep import sweep
+
+
+def run_demo_sweep(engine_name="custom", processes=None, top=20):
+    """
+    Runs a parameter sweep of one strategy over a grid, on all cores by default.
+    Same config layout as run_backtest.py; the grid overrides the strategy params.
+    """
+
+    # --- Config (kept inline, like run_backtest.py)
+    config = {
+        "market": "crypto",
+        "data_provider": "binance",
+        "strategy": {
+            "class": "strategies.ema_crossover_talib.EMACrossoverTALib",  # full import path
+            "symbol": "ETHUSDT",
+            "timeframe": "5m",
+            "qty": 1,
+            "cash": 100000.0,
+            "commission": 0.0005,    # 0.05%
+        },
+        # Indicator params first: combinations sharing them run together and reuse cached indicators
+        "grid": {
+            "fast": [5, 8, 9, 12, 13],
+            "slow": [21, 26, 34, 55],
+            "stop_loss": [0.005, 0.01, 0.02],
+            "target_profit": [0.01, 0.02, 0.04, 0.08],
+        },
+        "sort_by": "sharpe",
+        "start_date": "01-11-2025",
+        "end_date": "16-11-2025",
+    }
+
+    # --- Load strategy dynamically from config
+    strategy_path = config["strategy"]["class"]
+    module_name, class_name = strategy_path.rsplit(".", 1)
+    StrategyClass = getattr(importlib.import_module(module_name), class_name)
+
+    # --- Prepare data
+    store = DataStore(base_path="data/parquet")
+    data_fetcher = get_data_fetcher(config["data_provider"], data_store=store)
+
+    print(f"Fetching data for {config['strategy']['symbol']} ...")
+    df = data_fetcher.fetch_ohlcv(
+        config["strategy"]["symbol"],
+        config["strategy"]["timeframe"],
+        config.get("start_date"),
+        config.get("end_date"),
+    )
+
+    # --- Run sweep
+    print(f"Sweeping {StrategyClass.__name__} on the {engine_name.upper()} engine ...")
+    results = sweep(df, StrategyClass, config["grid"], base_config=config["strategy"], engine=engine_name,
+                    processes=processes, sort_by=config["sort_by"])
+
+    # --- Save + print results
+    report_dir = Path("backtest/reports")
+    report_dir.mkdir(parents=True, exist_ok=True)
+    report_file = report_dir / f"sweep_{class_name}_{engine_name}.csv"
+    results.to_frame().to_csv(report_file, index=False)
+
+    print(f"\n=== Top {top} by {config['sort_by']} ===")
+    print(results.top(top).to_string(index=False))
+    print(f"\n✅ Results saved to: {report_file.resolve()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", default="custom", help="Choose engine: custom, vectorbt or backtestingpy")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+    run_demo_sweep(engine_name=args.engine, processes=args.processes, top=args.top)
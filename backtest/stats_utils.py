@@ -37,8 +37,8 @@ def max_drawdown(eq: pd.Series):
 # -----------------------------
 # MASTER STAT FUNCTION
 # -----------------------------
-def compute_stats(trades, equity: pd.Series):
-    """General-purpose stats (platform-neutral)."""
+def compute_stats(trades, equity: pd.Series, pnl=None):
+    """General-purpose stats (platform-neutral). pnl: per-trade pnl array, read from the trade dicts if not given."""
 
     if equity.empty:
         return {
@@ -53,16 +53,18 @@ def compute_stats(trades, equity: pd.Series):
 
     returns = equity.pct_change().dropna()
 
-    pnl_list = [t.get("pnl", 0.0) for t in trades]
-    pnl_sum = float(np.sum(pnl_list))
-    wins = sum(1 for p in pnl_list if p > 0)
+    if pnl is None:
+        pnl = [t.get("pnl", 0.0) for t in trades]
+    pnl = np.asarray(pnl, dtype=float)
+    pnl_sum = float(np.sum(pnl))
+    wins = int(np.count_nonzero(pnl > 0))
 
     return {
         "total_return": float((equity.iloc[-1] - equity.iloc[0]) / equity.iloc[0]),
         "sharpe": compute_sharpe(returns),
         "max_drawdown": max_drawdown(equity),
-        "win_rate": (wins / len(trades)) if trades else 0.0,
-        "trade_count": len(trades),
+        "win_rate": (wins / len(pnl)) if len(pnl) else 0.0,
+        "trade_count": len(pnl),
         "pnl_sum": pnl_sum,
         "cagr": compute_cagr(equity),
     }
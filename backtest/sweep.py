@@ -0,0 +1,267 @@
+# backtest/sweep.py
+"""Parameter sweeps over any engine from get_engine() and any strategy class.
+
+    results = sweep(df, EMACrossoverTALib, {"fast": [5, 9, 13], "slow": [21, 34, 55],
+                                           "stop_loss": [0.005, 0.01], "target_profit": [0.01, 0.02]},
+                    base_config={"symbol": "ETHUSDT", "qty": 1, "cash": 100000.0, "commission": 0.0005})
+    print(results.top(10))
+
+The grid's combinations run on a process pool. The OHLCV columns and index
+are published once in a shared-memory block that every worker maps on
+start-up, so a task carries only its parameter dict and returns one row of
+compute_stats() numbers. Rows stream into a ResultsTable kept sorted on one
+stat as they arrive (iter_sweep() yields them as they arrive instead).
+
+Combinations are dispatched in grid order, in chunks: the first grid keys
+vary slowest, so put indicator parameters (fast/slow) first and each chunk
+reuses the worker's cached indicators (utils.indicator_cache).
+"""
+import bisect
+import contextlib
+import io
+import itertools
+import math
+import os
+import sys
+import time
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest.engine_factory import get_engine
+from backtest.stats_utils import compute_stats
+
+STAT_COLUMNS = ["total_return", "sharpe", "max_drawdown", "win_rate", "trade_count", "pnl_sum", "cagr"]
+_ALIGN = 64
+
+
+# -----------------------------------------------------------------
+# Shared-memory OHLCV
+# -----------------------------------------------------------------
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Map an existing block; the publisher unlinks it. Pool workers share the publisher's resource tracker,
+    so before Python 3.13 (no track=False) their registration of the name merges with the publisher's."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedFrame:
+    """
+    A numeric DataFrame copied once into shared memory. `spec` is the small picklable description
+    workers pass to attach(), which rebuilds the frame over the shared buffer without copying it
+    (arrays are read-only). Use as a context manager, or close() to release the block.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        index = data.index
+        if isinstance(index, pd.DatetimeIndex):
+            index_values = index.asi8
+            index_meta = ("datetime", str(index.unit), None if index.tz is None else str(index.tz))
+        else:
+            index_values = np.asarray(index.to_numpy())
+            if index_values.dtype.hasobject:
+                raise ValueError("SharedFrame needs a DatetimeIndex or a numeric index")
+            index_meta = ("values", None, None)
+
+        arrays = [("__index__", index_values)]
+        for column in data.columns:
+            values = data[column].to_numpy()
+            if values.dtype.hasobject:
+                raise ValueError(f"SharedFrame needs numeric columns, {column!r} is {values.dtype}")
+            arrays.append((column, values))
+
+        layout, offset = [], 0
+        for name, values in arrays:
+            layout.append((name, values.dtype.str, offset))
+            offset += -(-values.nbytes // _ALIGN) * _ALIGN
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (name, dtype, start), (_, values) in zip(layout, arrays):
+            np.ndarray(len(values), dtype=dtype, buffer=self._shm.buf, offset=start)[:] = values
+
+        self.spec = {
+            "name": self._shm.name,
+            "rows": len(data),
+            "layout": layout,
+            "index": index_meta,
+            "index_name": index.name,
+        }
+
+    @staticmethod
+    def attach(spec: dict):
+        """(frame, shm) for a published spec; keep `shm` referenced for as long as the frame is used."""
+        shm = _attach(spec["name"])
+        arrays = {}
+        for name, dtype, start in spec["layout"]:
+            values = np.ndarray(spec["rows"], dtype=dtype, buffer=shm.buf, offset=start)
+            values.flags.writeable = False
+            arrays[name] = values
+
+        kind, unit, tz = spec["index"]
+        index_values = arrays.pop("__index__")
+        if kind == "datetime":
+            index = pd.DatetimeIndex(index_values.view(f"M8[{unit}]"), name=spec["index_name"], copy=False)
+            if tz is not None:
+                index = index.tz_localize("UTC").tz_convert(tz)
+        else:
+            index = pd.Index(index_values, name=spec["index_name"], copy=False)
+        return pd.DataFrame(arrays, index=index, copy=False), shm
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -----------------------------------------------------------------
+# Grid
+# -----------------------------------------------------------------
+def parameter_grid(grid) -> list[dict]:
+    """Every combination of a {param: values} grid, first key varying slowest. A list of dicts is kept as is."""
+    if isinstance(grid, dict):
+        keys = list(grid)
+        values = [v if isinstance(v, (list, tuple, range, np.ndarray)) else [v] for v in grid.values()]
+        combos = [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+    else:
+        combos = [dict(c) for c in grid]
+    if not combos:
+        raise ValueError("Empty parameter grid")
+    return combos
+
+
+# -----------------------------------------------------------------
+# Results table
+# -----------------------------------------------------------------
+class ResultsTable:
+    """Sweep rows (params + stats) kept sorted on `sort_by` as they are added; NaN and failed runs sort last."""
+
+    def __init__(self, sort_by: str = "sharpe", ascending: bool = False):
+        self.sort_by = sort_by
+        self.ascending = ascending
+        self._keys = []
+        self._rows = []
+
+    def _key(self, row):
+        value = row.get(self.sort_by)
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return math.inf
+        return value if self.ascending else -value
+
+    def add(self, row: dict):
+        key = self._key(row)
+        at = bisect.bisect_right(self._keys, key)
+        self._keys.insert(at, key)
+        self._rows.insert(at, row)
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def best(self):
+        return self._rows[0] if self._rows else None
+
+    def top(self, n: int = 10) -> pd.DataFrame:
+        return pd.DataFrame(self._rows[:n])
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self._rows)
+
+
+# -----------------------------------------------------------------
+# Workers
+# -----------------------------------------------------------------
+_worker = {}        # per-process: frame, shm, engine class, strategy class, base config
+
+
+def _init_worker(spec, engine_name, strategy_cls, base_config):
+    if spec is not None:
+        _worker["frame"], _worker["shm"] = SharedFrame.attach(spec)
+    _worker["engine"] = get_engine(engine_name)
+    _worker["strategy"] = strategy_cls
+    _worker["base_config"] = base_config
+
+
+def _stats(trades, report) -> dict:
+    """compute_stats() for the run; CustomEngine already reports exactly that, other engines their own stats."""
+    if report.get("meta", {}).get("engine") == "custom":
+        return report["stats"]
+    return compute_stats(trades, report["equity"])
+
+
+def _run_one(task):
+    task_id, params = task
+    config = {**_worker["base_config"], **params}
+    t0 = time.perf_counter()
+    row = {"task": task_id, **params}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            # The shared frame is read-only, so the engine can use it without its own copy
+            _, trades, report = _worker["engine"](_worker["frame"], _worker["strategy"], config, copy=False).run()
+        stats = _stats(trades, report)
+        row.update({k: stats.get(k) for k in STAT_COLUMNS})
+    except Exception as exc:        # one bad combination must not end the sweep
+        row.update({k: np.nan for k in STAT_COLUMNS})
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    row["seconds"] = time.perf_counter() - t0
+    return row
+
+
+# -----------------------------------------------------------------
+# Sweep
+# -----------------------------------------------------------------
+def iter_sweep(data: pd.DataFrame, strategy_cls, grid, base_config: dict | None = None, engine: str = "custom",
+               processes: int | None = None, chunksize: int | None = None):
+    """
+    Run every combination of `grid` (see parameter_grid) merged over `base_config` and yield one row per run,
+    in completion order: the parameters, the compute_stats() values, "seconds" spent in the run and "error"
+    for a run that raised. processes: pool size (os.cpu_count() by default); 1 runs in this process.
+    """
+    combos = parameter_grid(grid)
+    base_config = dict(base_config or {})
+    processes = max(1, min(processes or os.cpu_count() or 1, len(combos)))
+    tasks = list(enumerate(combos))
+
+    if processes == 1:
+        _init_worker(None, engine, strategy_cls, base_config)
+        _worker["frame"] = data
+        try:
+            yield from map(_run_one, tasks)
+        finally:
+            _worker.clear()
+        return
+
+    if chunksize is None:
+        chunksize = max(1, min(64, len(tasks) // (processes * 8)))
+    with SharedFrame(data) as shared:
+        ctx = get_context()
+        with ctx.Pool(processes, initializer=_init_worker,
+                      initargs=(shared.spec, engine, strategy_cls, base_config)) as pool:
+            yield from pool.imap_unordered(_run_one, tasks, chunksize=chunksize)
+
+
+def sweep(data: pd.DataFrame, strategy_cls, grid, base_config: dict | None = None, engine: str = "custom",
+          processes: int | None = None, chunksize: int | None = None, sort_by: str = "sharpe",
+          ascending: bool = False, progress: bool = True) -> ResultsTable:
+    """iter_sweep() collected into a ResultsTable sorted on `sort_by`, printing progress as rows stream in."""
+    combos = parameter_grid(grid)
+    table = ResultsTable(sort_by, ascending)
+    total = len(combos)
+    step = max(1, total // 20)
+    t0 = time.perf_counter()
+    for row in iter_sweep(data, strategy_cls, combos, base_config, engine, processes, chunksize):
+        table.add(row)
+        if progress and (len(table) % step == 0 or len(table) == total):
+            elapsed = time.perf_counter() - t0
+            best = table.best.get(sort_by)
+            best = format(best, ".4g") if isinstance(best, (int, float)) else best
+            print(f"  {len(table):>7,}/{total:,} runs  {elapsed:7.1f}s  ({len(table) / elapsed:7.1f} runs/s)  "
+                  f"best {sort_by}={best}")
+    return table
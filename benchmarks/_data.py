@@ -0,0 +1,22 @@
+# benchmarks/_data.py
+"""Synthetic OHLCV for the benchmarks; edge cases (flat stretches, zero volume, NaNs) stay in each benchmark."""
+import numpy as np
+import pandas as pd
+
+
+def make_frame(n_bars, seed=0, freq="1min", start="2020-01-01", vol=0.001, spread=0.001, gap=0.0):
+    """
+    Geometric random walk from 100 (log-return stdev `vol` per bar) on a UTC index named "timestamp".
+
+    high/low reach up to `spread` beyond the bar's open/close. With gap > 0 each bar opens off the previous
+    close (stdev `gap`), so bars can gap through stop levels; otherwise open == close. Volume is exponential
+    with mean 10.
+    """
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(start, periods=n_bars, freq=freq, tz="UTC", name="timestamp")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, vol, n_bars)))
+    open_ = np.r_[close[:1], close[:-1]] * (1 + rng.normal(0, gap, n_bars)) if gap else close.copy()
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, spread, n_bars))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, spread, n_bars))
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close,
+                         "volume": rng.exponential(10, n_bars)}, index=idx)
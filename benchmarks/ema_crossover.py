@@ -0,0 +1,83 @@
+# benchmarks/ema_crossover.py
+"""EMACrossover.generate_signals: vectorized version vs the previous iterrows loop.
+
+Checks that both produce identical signal lists, then times them. The
+iterrows reference is only run up to --max-reference bars (it needs minutes
+at 1e7).
+
+Usage:
+    python -m benchmarks.ema_crossover --bars 100000 1000000 10000000
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from benchmarks import _data
+from strategies.ema_crossover import EMACrossover
+
+CONFIG = {"fast_period": 9, "slow_period": 21, "qty": 0.01, "symbol": "BTCUSDT"}
+
+
+def make_frame(n_bars):
+    df = _data.make_frame(n_bars)
+    # Flat stretches make both EMAs equal, exercising the 0-signal state
+    df.iloc[1000:1100] = df.iloc[1000].to_numpy()
+    return df
+
+
+def reference_signals(data, config):
+    """generate_signals as it was before vectorization."""
+    df = data.copy()
+    fast = config.get("fast_period", 9)
+    slow = config.get("slow_period", 21)
+    qty = config.get("qty", 0.01)
+    df["ema_fast"] = df["close"].ewm(span=fast, adjust=False).mean()
+    df["ema_slow"] = df["close"].ewm(span=slow, adjust=False).mean()
+    df["signal"] = 0
+    df.loc[df["ema_fast"] > df["ema_slow"], "signal"] = 1
+    df.loc[df["ema_fast"] < df["ema_slow"], "signal"] = -1
+
+    signals = []
+    last_signal = 0
+    for ts, row in df.iterrows():
+        if row["signal"] != last_signal:
+            last_signal = row["signal"]
+            if row["signal"] == 1:
+                signals.append({"timestamp": ts, "symbol": config.get("symbol", "BTCUSDT"), "side": "buy", "qty": qty})
+            elif row["signal"] == -1:
+                signals.append({"timestamp": ts, "symbol": config.get("symbol", "BTCUSDT"), "side": "sell", "qty": qty})
+    return signals
+
+
+def _timed(fn):
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        out = fn()
+        return out, time.perf_counter() - t0
+
+
+def run(sizes, max_reference):
+    ok = True
+    for n in sizes:
+        df = make_frame(n)
+        fast, t_fast = _timed(lambda: EMACrossover(df, CONFIG).generate_signals())
+        line = f"{n:>12,} bars  vectorized {t_fast * 1000:9.1f} ms  signals={len(fast):,}"
+        if n <= max_reference:
+            ref, t_ref = _timed(lambda: reference_signals(df, CONFIG))
+            records = fast.to_records()
+            same = ref == records and all(type(a["timestamp"]) is type(b["timestamp"]) for a, b in zip(ref, records))
+            ok &= same
+            line += f"  iterrows {t_ref * 1000:10.1f} ms  speedup {t_ref / t_fast:7.1f}x  identical={same}"
+        print(line)
+    print("✅ identical output" if ok else "❌ output differs")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--max-reference", type=int, default=1_000_000,
+                        help="largest size the iterrows reference is run at")
+    args = parser.parse_args()
+    run(args.bars, args.max_reference)
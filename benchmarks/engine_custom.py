@@ -0,0 +1,182 @@
+# benchmarks/engine_custom.py
+"""Golden-output check and timing of CustomEngine.
+
+The compiled simulation (and its pure-Python fallback) is compared
+trade-for-trade and bar-for-bar against a plain Python reference of the
+same fill rules, with and without engine stops, fees and slippage. Then
+per-run latency is timed on small frames and throughput on large ones,
+next to VectorBTEngine and BacktestingPyEngine when those libraries are
+installed.
+
+Usage:
+    python -m benchmarks.engine_custom --parity-bars 50000 --small-bars 1000 --runs 200 --bars 1000000 10000000
+"""
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+import pandas as pd
+
+from backtest import engine_custom
+from backtest.engine_custom import CustomEngine
+from benchmarks._data import make_frame
+from strategies.ema_crossover import EMACrossover
+from strategies.ema_crossover_talib import EMACrossoverTALib
+from strategies.vwap_breakout import VWAPBreakout
+from utils.jit import NUMBA_AVAILABLE
+
+GAP = 0.0005          # opens off the previous close, so bars gap through stops
+BASE = {"symbol": "ETHUSDT", "qty": 1, "cash": 100000.0}
+CASES = [
+    ("EMACrossoverTALib", EMACrossoverTALib,
+     {**BASE, "fast": 9, "slow": 21, "stop_loss": 0.002, "target_profit": 0.004, "commission": 0.0005}),
+    ("EMACrossover +stops", EMACrossover,
+     {**BASE, "fast_period": 9, "slow_period": 21, "commission": 0.001, "slippage": 0.0002,
+      "sl_stop": 0.003, "tp_stop": 0.006}),
+    ("VWAPBreakout W +stops", VWAPBreakout,
+     {**BASE, "session": "W", "mult": 1.0, "stop_loss": 0.002, "target_profit": 0.01, "commission": 0.0005,
+      "sl_stop": 0.0015}),
+]
+
+
+# ---------------------------------------------------------------
+# Reference: the same fill rules, one bar at a time in plain Python
+# ---------------------------------------------------------------
+def reference(df, signals, cfg):
+    qty, fees = float(cfg.get("qty", 1)), float(cfg.get("commission", 0.0))
+    slip, cash = float(cfg.get("slippage", 0.0)), float(cfg.get("cash", 100000.0))
+    sl, tp = cfg.get("sl_stop"), cfg.get("tp_stop")
+    by_bar = {}
+    for s in signals:
+        by_bar.setdefault(s["timestamp"], []).append(1 if s["side"] == "buy" else -1)
+
+    trades, equity = [], []
+    intent = position = 0
+    open_trade = None
+
+    def close_trade(ts, price, reason):
+        nonlocal cash, position
+        fee = fees * qty * price
+        cash += position * qty * price - fee
+        open_trade.update(exit_timestamp=ts, exit_price=price, fees=open_trade["fees"] + fee,
+                          pnl=position * qty * (price - open_trade["price"]) - open_trade["fees"] - fee,
+                          exit_reason=reason)
+        trades.append(open_trade)
+        position = 0
+
+    for ts, o, h, l, c in zip(df.index, df["open"], df["high"], df["low"], df["close"]):
+        if position and open_trade["timestamp"] < ts:
+            entry = open_trade["price"]
+            hit = None
+            if position == 1:
+                if sl is not None and l <= entry * (1 - sl):
+                    hit = min(o, entry * (1 - sl)), "stop_loss"
+                elif tp is not None and h >= entry * (1 + tp):
+                    hit = max(o, entry * (1 + tp)), "take_profit"
+            else:
+                if sl is not None and h >= entry * (1 + sl):
+                    hit = max(o, entry * (1 + sl)), "stop_loss"
+                elif tp is not None and l <= entry * (1 - tp):
+                    hit = min(o, entry * (1 - tp)), "take_profit"
+            if hit:
+                close_trade(ts, hit[0] * (1 - position * slip), hit[1])
+
+        for side in by_bar.get(ts, []):
+            if intent == 0:
+                intent = position = side
+                price = c * (1 + side * slip)
+                fee = fees * qty * price
+                cash -= side * qty * price + fee
+                open_trade = {"timestamp": ts, "symbol": cfg["symbol"], "side": "buy" if side == 1 else "sell",
+                              "qty": qty, "price": price, "fees": fee}
+            elif side == -intent:
+                intent = 0
+                if position:
+                    close_trade(ts, c * (1 - position * slip), "signal")
+        equity.append(cash + position * qty * c)
+
+    if position:
+        c = df["close"].iloc[-1]
+        open_trade.update(exit_timestamp=df.index[-1], exit_price=c,
+                          pnl=position * qty * (c - open_trade["price"]) - open_trade["fees"], exit_reason="open")
+        trades.append(open_trade)
+    return trades, pd.Series(equity, index=df.index)
+
+
+# ---------------------------------------------------------------
+def _timed(fn):
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        out = fn()
+        return out, time.perf_counter() - t0
+
+
+@contextlib.contextmanager
+def _python_simulation():
+    compiled = engine_custom._simulate
+    engine_custom._simulate = getattr(compiled, "py_func", compiled)
+    try:
+        yield
+    finally:
+        engine_custom._simulate = compiled
+
+
+def parity(n_bars):
+    ok = True
+    df = make_frame(n_bars, gap=GAP)
+    for name, cls, cfg in CASES:
+        signals, _ = _timed(lambda: cls(df, cfg).generate_signals())
+        ref_trades, ref_equity = reference(df, list(signals), cfg)
+        for label, ctx in (("compiled", contextlib.nullcontext), ("python", _python_simulation)):
+            with ctx():
+                (_, trades, report), t = _timed(lambda: CustomEngine(df, cls, cfg).run())
+            same = trades.to_records() == ref_trades and report["equity"].equals(ref_equity)
+            ok &= same
+            reasons = pd.Series([tr["exit_reason"] for tr in trades]).value_counts().to_dict()
+            print(f"  {name:22s} {label:8s} trades={len(trades):6,} {reasons}  identical={same}  ({t * 1000:7.1f} ms)")
+    return ok
+
+
+def _engines():
+    engines = [("custom", CustomEngine)]
+    for name, module, attr in (("vectorbt", "backtest.engine_vectorbt", "VectorBTEngine"),
+                               ("backtestingpy", "backtest.engine_backtestingpy", "BacktestingPyEngine")):
+        try:
+            engines.append((name, getattr(__import__(module, fromlist=[attr]), attr)))
+        except ImportError as exc:
+            print(f"  {name}: skipped ({exc})")
+    return engines
+
+
+def timing(small_bars, runs, sizes):
+    _, cls, cfg = CASES[0]
+    engines = _engines()
+    df = make_frame(small_bars, gap=GAP)
+    for name, engine in engines:
+        _timed(lambda: engine(df, cls, cfg).run())                  # imports, compilation
+        _, t = _timed(lambda: [engine(df, cls, cfg).run() for _ in range(runs)])
+        print(f"{small_bars:>12,} bars  {name:14s} {t / runs * 1000:8.2f} ms per run ({runs} runs)")
+    for n in sizes:
+        df = make_frame(n, gap=GAP)
+        for name, engine in engines:
+            (_, trades, _), t = _timed(lambda: engine(df, cls, cfg).run())
+            print(f"{n:>12,} bars  {name:14s} {t:8.2f} s   {n / t / 1e6:6.2f} M bars/s  ({len(trades):,} trades)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parity-bars", type=int, default=50_000)
+    parser.add_argument("--small-bars", type=int, default=1_000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--bars", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"Numba: {'yes' if NUMBA_AVAILABLE else 'no (pure-Python simulation)'}")
+    print(f"Golden output, {args.parity_bars:,} bars:")
+    ok = parity(args.parity_bars)
+    print("✅ identical to the reference simulation" if ok else "❌ output differs")
+    timing(args.small_bars, args.runs, args.bars)
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,104 @@
+# benchmarks/indicator_cache.py
+"""Indicator memoization in a parameter sweep.
+
+Runs a fast/slow grid of EMACrossoverTALib and EMACrossover plus a few
+VWAPBreakout configs over the same data twice, with the indicator cache
+off and on, and checks the signals are identical. Each (indicator, period)
+pair recurs across the grid, so with the cache on it is computed once.
+
+Usage:
+    python -m benchmarks.indicator_cache --bars 1000000
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks._data import make_frame
+from strategies.ema_crossover import EMACrossover
+from strategies.ema_crossover_talib import EMACrossoverTALib
+from strategies.vwap_breakout import VWAPBreakout
+from utils import indicators
+from utils.indicator_cache import fingerprint
+
+
+def runs():
+    for fast, slow in itertools.product((5, 9, 13, 21), (21, 34, 55, 89)):
+        for stop_loss in (0.005, 0.01):
+            yield EMACrossoverTALib, {"fast": fast, "slow": slow, "stop_loss": stop_loss, "target_profit": 0.02}
+        yield EMACrossover, {"fast_period": fast, "slow_period": slow}
+    for session, mult in itertools.product(("D", "W"), (1.0, 2.0)):
+        for stop_loss in (0.005, 0.01):
+            yield VWAPBreakout, {"session": session, "mult": mult, "stop_loss": stop_loss}
+
+
+def sweep(df):
+    out = []
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for cls, config in runs():
+            signals = cls(df, config).generate_signals()
+            out.append((signals.pos, signals.side))
+    return out, time.perf_counter() - t0
+
+
+def fingerprint_collisions():
+    """Inputs that differ only in sign or in one bit (any position, any word) must not share a fingerprint."""
+    x = np.arange(1, 41, dtype=float)
+    variants = [x]
+    flipped = x.copy()
+    flipped[[0, 4]] *= -1                    # high bits in two lanes
+    variants.append(flipped)
+    words = x.view(np.uint64)
+    for i in (0, 1, 4, 39):
+        for bit in (0, 31, 52, 63):
+            v = words.copy()
+            v[i] ^= np.uint64(1) << np.uint64(bit)
+            variants.append(v.view(float))
+    fps = {fingerprint(v) for v in variants}
+    ok = len(fps) == len(variants)
+
+    # The memoized indicator sees the difference too
+    ok &= indicators.ewm_mean(pd.Series(flipped), 9).iloc[0] == -1.0 != indicators.ewm_mean(pd.Series(x), 9).iloc[0]
+    print(f"  {len(variants)} sign/bit-flipped inputs, {len(fps)} distinct fingerprints, memoized values distinct={ok}")
+    return ok
+
+
+def run(n_bars):
+    df = make_frame(n_bars)
+    budget = indicators.indicator_cache.max_bytes
+    indicators.set_cache_budget(0)
+    sweep(df.iloc[:1000])                     # compile kernels
+
+    uncached, t_off = sweep(df)
+    indicators.set_cache_budget(budget)
+    indicators.clear_cache()
+    cached, t_on = sweep(df)
+    stats = indicators.cache_stats()
+    _, t_warm = sweep(df)
+
+    n_runs = len(uncached)
+    same = all(np.array_equal(a[0], b[0]) and np.array_equal(a[1], b[1]) for a, b in zip(uncached, cached))
+    print(f"{n_runs} strategy runs over {n_bars:,} bars")
+    print(f"  cache off          {t_off:7.2f}s")
+    print(f"  cache on (cold)    {t_on:7.2f}s   hits={stats['hits']} misses={stats['misses']} "
+          f"hit rate={stats['hit_rate']:.0%}  held={stats['bytes'] / 1e6:.0f} MB")
+    print(f"  cache on (warm)    {t_warm:7.2f}s   hit rate={indicators.cache_stats()['hit_rate']:.0%}")
+    readonly = not indicators.ema(df["close"], 9).to_numpy().flags.writeable
+    print(f"  identical signals={same}  results read-only={readonly}")
+    ok = same and readonly and fingerprint_collisions()
+    print("✅ ok" if ok else "❌ failed")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, default=1_000_000)
+    args = parser.parse_args()
+    if not run(args.bars):
+        sys.exit(1)
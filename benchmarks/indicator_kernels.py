@@ -0,0 +1,225 @@
+# benchmarks/indicator_kernels.py
+"""Parity and timing of the multi-period indicator kernels.
+
+Every column of ema_multi / sma_multi / atr_multi / rsi_multi /
+rolling_vwap_multi from the compiled kernels is compared with a plain
+Python reference of the same algorithm (TA-Lib's, kept below), with TA-Lib
+itself when it is installed, and with a single-period call. Inputs have
+leading NaNs, a flat stretch and zero-volume bars. Then one multi-period
+pass is timed against one call per period, and a fast/slow sweep is timed
+with and without precompute_ema().
+
+Usage:
+    python -m benchmarks.indicator_kernels --parity-bars 20000 --bars 1000000 10000000 --periods 20
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import _data
+from strategies.ema_crossover_talib import EMACrossoverTALib
+from utils import indicators
+from utils.jit import NUMBA_AVAILABLE
+
+PARITY_PERIODS = [1, 2, 5, 9, 14, 21, 50, 200]
+
+
+def make_frame(n_bars, seed=0):
+    df = _data.make_frame(n_bars, seed, spread=0.002)
+    df.iloc[500:560, :4] = df.iloc[500, :4].to_numpy()     # flat stretch: zero gains and losses
+    df.iloc[2000:2300, 4] = 0.0              # no volume for longer than most windows
+    df.iloc[:3] = np.nan                     # leading NaNs, skipped as TA-Lib skips them
+    return df
+
+
+# ---------------------------------------------------------------
+# Reference implementations, one period at a time
+# ---------------------------------------------------------------
+def _skip_nan(fn):
+    def wrapped(*arrays, period):
+        start = next((i for i in range(len(arrays[0])) if not any(np.isnan(a[i]) for a in arrays)), len(arrays[0]))
+        out = np.full(len(arrays[0]), np.nan)
+        out[start:] = fn(*(a[start:].tolist() for a in arrays), period=period)
+        return out
+    return wrapped
+
+
+@_skip_nan
+def reference_sma(x, period):
+    out = [np.nan] * len(x)
+    for i in range(period - 1, len(x)):
+        out[i] = sum(x[i - period + 1:i + 1]) / period
+    return out
+
+
+@_skip_nan
+def reference_ema(x, period):
+    out = [np.nan] * len(x)
+    if len(x) < period:
+        return out
+    k = 2.0 / (period + 1)
+    value = sum(x[:period]) / period
+    out[period - 1] = value
+    for i in range(period, len(x)):
+        value = (x[i] - value) * k + value
+        out[i] = value
+    return out
+
+
+@_skip_nan
+def reference_atr(high, low, close, period):
+    tr = [np.nan] + [max(high[i] - low[i], abs(close[i - 1] - high[i]), abs(close[i - 1] - low[i]))
+                     for i in range(1, len(close))]
+    if period <= 1:
+        return tr
+    out = [np.nan] * len(close)
+    if len(close) <= period:
+        return out
+    value = sum(tr[1:period + 1]) / period
+    out[period] = value
+    for i in range(period + 1, len(close)):
+        value = (value * (period - 1) + tr[i]) / period
+        out[i] = value
+    return out
+
+
+@_skip_nan
+def reference_rsi(x, period):
+    out = [np.nan] * len(x)
+    diffs = [x[i] - x[i - 1] for i in range(1, len(x))]
+    if len(diffs) < period:
+        return out
+    gain = sum(d for d in diffs[:period] if d > 0) / period
+    loss = sum(-d for d in diffs[:period] if d < 0) / period
+    for i in range(period, len(x)):
+        if i > period:
+            d = diffs[i - 1]
+            gain = (gain * (period - 1) + max(d, 0.0)) / period
+            loss = (loss * (period - 1) + max(-d, 0.0)) / period
+        total = gain + loss
+        out[i] = 100.0 * gain / total if abs(total) >= 1e-8 else 0.0
+    return out
+
+
+def reference_rolling_vwap(df, period):
+    hlc3 = (df["high"] + df["low"] + df["close"]) / 3
+    pv = (hlc3 * df["volume"]).rolling(period).sum()
+    vol = df["volume"].rolling(period).sum()
+    traded = (df["volume"] > 0).rolling(period).sum()
+    return (pv / vol).where(traded > 0).to_numpy()
+
+
+# ---------------------------------------------------------------
+def _cases(df):
+    close, high, low, volume = df["close"], df["high"], df["low"], df["volume"]
+    c, h, l = close.to_numpy(), high.to_numpy(), low.to_numpy()
+    return [
+        ("EMA", lambda p, **kw: indicators.ema_multi(close, p, **kw),
+         lambda p: reference_ema(c, period=p), lambda p: indicators.ta.EMA(c, timeperiod=p)),
+        ("SMA", lambda p, **kw: indicators.sma_multi(close, p, **kw),
+         lambda p: reference_sma(c, period=p), lambda p: indicators.ta.SMA(c, timeperiod=p)),
+        ("ATR", lambda p, **kw: indicators.atr_multi(high, low, close, p, **kw),
+         lambda p: reference_atr(h, l, c, period=p), lambda p: indicators.ta.ATR(h, l, c, timeperiod=p)),
+        ("RSI", lambda p, **kw: indicators.rsi_multi(close, p, **kw),
+         lambda p: reference_rsi(c, period=p), lambda p: indicators.ta.RSI(c, timeperiod=p)),
+        ("VWAP", lambda p, **kw: indicators.rolling_vwap_multi(high, low, close, volume, p),
+         lambda p: reference_rolling_vwap(df, p), None),
+    ]
+
+
+def _close(a, b, rtol):
+    return bool(np.array_equal(np.isnan(a), np.isnan(b)) and np.allclose(a, b, rtol=rtol, atol=1e-12, equal_nan=True))
+
+
+def parity(n_bars):
+    ok = True
+    df = make_frame(n_bars)
+    for name, multi, reference, talib_fn in _cases(df):
+        got = multi(PARITY_PERIODS, backend="kernel").to_numpy()
+        checks = {"reference": True, "single": True}
+        if talib_fn is not None and indicators.ta is not None:
+            checks["TA-Lib"] = True
+        for j, p in enumerate(PARITY_PERIODS):
+            checks["reference"] &= _close(got[:, j], reference(p), rtol=1e-9)
+            checks["single"] &= np.array_equal(got[:, j], multi([p], backend="kernel").to_numpy()[:, 0], equal_nan=True)
+            if "TA-Lib" in checks and p >= indicators._TALIB_MIN_PERIOD:   # period 1: kernel only
+                checks["TA-Lib"] &= _close(got[:, j], talib_fn(p), rtol=1e-12)
+        ok &= all(checks.values())
+        print(f"  {name:5s} periods={PARITY_PERIODS}  " + "  ".join(f"{k}={v}" for k, v in checks.items()))
+    return ok
+
+
+# ---------------------------------------------------------------
+def _timed(fn, repeat=1):
+    best = float("inf")
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            out = fn()
+            best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def timing(sizes, n_periods):
+    periods = list(range(5, 5 + 5 * n_periods, 5))
+    backends = ["kernel"] + (["talib"] if indicators.ta is not None else [])
+    budget = indicators.cache_stats()["max_bytes"]
+    indicators.set_cache_budget(0)
+    try:
+        for n in sizes:
+            df = make_frame(n)
+            for (name, multi, _, _), backend in itertools.product(_cases(df), backends):
+                if name == "VWAP" and backend == "talib":
+                    continue
+                _, t_multi = _timed(lambda: multi(periods, backend=backend))
+                _, t_loop = _timed(lambda: [multi([p], backend=backend) for p in periods])
+                print(f"{n:>12,} bars  {name:5s} x{len(periods)} periods [{backend:6s}]  "
+                      f"one pass {t_multi * 1000:8.1f} ms   per period {t_loop * 1000:8.1f} ms   ({t_loop / t_multi:4.1f}x)")
+    finally:
+        indicators.set_cache_budget(budget)
+
+
+def sweep(n_bars):
+    """fast/slow EMACrossoverTALib grid: each EMA computed on first use vs. all in one precompute_ema() pass."""
+    df = make_frame(n_bars).iloc[3:]
+    fasts, slows = (5, 8, 9, 12, 13, 21), (21, 34, 50, 55, 89, 100, 144, 200)
+    configs = [{"fast": f, "slow": s, "stop_loss": 0.005, "target_profit": 0.01}
+               for f, s in itertools.product(fasts, slows)]
+
+    def run(precompute):
+        indicators.clear_cache()
+        if precompute:
+            indicators.precompute_ema(df["close"], sorted(set(fasts + slows)))
+        out = [EMACrossoverTALib(df, c).generate_signals() for c in configs]
+        return [(s.pos.tobytes(), s.side.tobytes()) for s in out]
+
+    run(True)                                 # compile
+    base, t_base = _timed(lambda: run(False))
+    pre, t_pre = _timed(lambda: run(True))
+    print(f"{n_bars:>12,} bars  sweep of {len(configs)} EMACrossoverTALib runs: ema() on demand {t_base:6.2f} s, "
+          f"precompute_ema() {t_pre:6.2f} s  identical={base == pre}  cache={indicators.cache_stats()}")
+    return base == pre
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parity-bars", type=int, default=20_000)
+    parser.add_argument("--bars", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--periods", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Numba: {'yes' if NUMBA_AVAILABLE else 'no (pure-Python kernels)'}, "
+          f"TA-Lib: {'yes' if indicators.ta is not None else 'no (kernels only)'}")
+    print(f"Parity, {args.parity_bars:,} bars:")
+    ok = parity(args.parity_bars)
+    print("✅ kernels match the references" if ok else "❌ output differs")
+    timing(args.bars, args.periods)
+    ok &= sweep(args.bars[0])
+    print("✅ sweep signals identical" if ok else "❌ output differs")
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,74 @@
+# benchmarks/kline_parse.py
+"""Kline parsing throughput: per-candle dict path vs columnar KlineBuffer.
+
+Usage:
+    python -m benchmarks.kline_parse --rows 1000000
+"""
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from markets.crypto.data.kline_parser import KlineBuffer
+from markets.crypto.data.stub_server import synthetic_kline
+
+
+def make_pages(n_rows, tf_ms=60_000, page_size=1000, start_ms=1_600_000_000_000):
+    pages = []
+    for first in range(0, n_rows, page_size):
+        count = min(page_size, n_rows - first)
+        pages.append([synthetic_kline(start_ms + (first + i) * tf_ms, tf_ms) for i in range(count)])
+    return pages
+
+
+def parse_dicts(pages):
+    """Previous path: one dict + Timestamp per candle, frame built at the end."""
+    all_rows = []
+    for data in pages:
+        for r in data:
+            all_rows.append({
+                "timestamp": pd.to_datetime(r[0], unit="ms", utc=True),
+                "open": float(r[1]),
+                "high": float(r[2]),
+                "low": float(r[3]),
+                "close": float(r[4]),
+                "volume": float(r[5])
+            })
+    return pd.DataFrame(all_rows).set_index("timestamp")
+
+
+def parse_columnar(pages):
+    buf = KlineBuffer()
+    for data in pages:
+        buf.append_page(data)
+    return buf.to_frame()
+
+
+def measure(fn, pages):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    df = fn(pages)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, elapsed, peak
+
+
+def run(n_rows):
+    pages = make_pages(n_rows)
+    results = {}
+    for name, fn in (("dicts", parse_dicts), ("columnar", parse_columnar)):
+        df, elapsed, peak = measure(fn, pages)
+        results[name] = df
+        print(f"{name:10s} rows={len(df):>9d}  {len(df) / elapsed:>12,.0f} rows/s  peak={peak / 2**20:8.1f} MiB")
+
+    pd.testing.assert_frame_equal(results["dicts"], results["columnar"], check_names=False, check_freq=False)
+    print("✅ outputs identical")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.rows)
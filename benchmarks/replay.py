@@ -0,0 +1,66 @@
+# benchmarks/replay.py
+"""Incremental on_bar() vs batch generate_signals() for every strategy.
+
+Replays synthetic data bar by bar through each strategy and checks the
+signals equal the batch output, then reports per-bar latency.
+
+Usage:
+    python -m benchmarks.replay --bars 200000
+"""
+import argparse
+import contextlib
+import io
+import sys
+
+import numpy as np
+
+from benchmarks import _data
+from strategies.ema_crossover import EMACrossover
+from strategies.ema_crossover_talib import EMACrossoverTALib
+from strategies.replay import check_replay
+from strategies.vwap_breakout import VWAPBreakout
+
+CASES = [
+    (EMACrossover, {"fast_period": 9, "slow_period": 21, "qty": 0.01, "symbol": "ETHUSDT"}),
+    (EMACrossoverTALib, {"fast": 9, "slow": 21, "qty": 1, "stop_loss": 0.002, "target_profit": 0.004,
+                         "symbol": "ETHUSDT"}),
+] + [
+    (VWAPBreakout, {"session": session, "mult": 1.0, "stop_loss": 0.002, "target_profit": 0.01, "qty": 1,
+                    "symbol": "ETHUSDT"})
+    for session in ("D", "W", "M")
+]
+
+
+def make_frame(n_bars, seed=0, missing=True):
+    df = _data.make_frame(n_bars, seed, freq="5min", start="2020-12-01")
+    df.iloc[500:560, :4] = df.iloc[500, :4].to_numpy()     # flat stretch
+    if missing:
+        df.iloc[3000:3005, :4] = np.nan      # missing prices (TA-Lib EMAs stay NaN after them)
+    df.loc[np.random.default_rng(seed).random(n_bars) < 0.01, "volume"] = 0.0
+    return df
+
+
+def run(n_bars):
+    ok = True
+    frames = [("with NaNs", make_frame(n_bars)), ("clean", make_frame(n_bars, seed=1, missing=False))]
+    for data_label, df in frames:
+        for cls, config in CASES:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = check_replay(cls, df, config)
+            ok &= result["identical"]
+            lat = result["latency_us"]
+            label = f"{cls.__name__} {config.get('session', '')}"
+            print(f"{data_label:9s} {label:20s} bars={result['bars']:,} signals={result['signals']:,} "
+                  f"identical={result['identical']}  on_bar mean {lat['mean']:.2f} us  p50 {lat['p50']:.2f} us  "
+                  f"p99 {lat['p99']:.2f} us")
+            if not result["identical"]:
+                print("   first mismatch:", result["first_mismatch"])
+    print("✅ replay matches batch" if ok else "❌ replay differs from batch")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, default=200_000)
+    args = parser.parse_args()
+    if not run(args.bars):
+        sys.exit(1)
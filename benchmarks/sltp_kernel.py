@@ -0,0 +1,222 @@
+# benchmarks/sltp_kernel.py
+"""Golden-output check and timing of the SL/TP signal kernel.
+
+EMACrossoverTALib and VWAPBreakout are compared signal-for-signal against
+their previous iterrows implementations (kept below as references) on
+synthetic data, with both the compiled kernel and its pure-Python fallback.
+Then signal generation is timed at larger sizes.
+
+Usage:
+    python -m benchmarks.sltp_kernel --parity-bars 100000 --bars 1000000 10000000
+"""
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import _data
+from strategies import sltp_kernel
+from strategies.ema_crossover_talib import EMACrossoverTALib
+from strategies.vwap_breakout import VWAPBreakout
+from utils import indicators
+from utils.indicators import ema
+from utils.jit import NUMBA_AVAILABLE
+
+EMA_CONFIG = {"fast": 9, "slow": 21, "qty": 1, "stop_loss": 0.002, "target_profit": 0.004, "symbol": "ETHUSDT"}
+VWAP_CONFIG = {"session": "W", "mult": 1.0, "stop_loss": 0.002, "target_profit": 0.01, "qty": 1, "symbol": "ETHUSDT"}
+
+
+def make_frame(n_bars, seed=0):
+    df = _data.make_frame(n_bars, seed)
+    df.iloc[500:560, :4] = df.iloc[500, :4].to_numpy()     # flat stretch: equal EMAs, zero-width bands
+    df.iloc[2000:2010, 4] = 0.0              # zero volume
+    return df
+
+
+# ---------------------------------------------------------------
+# Previous implementations (golden reference)
+# ---------------------------------------------------------------
+def reference_ema_talib(data, config):
+    df = data.copy()
+    df["EMA_FAST"] = ema(df["close"], config.get("fast", 9))
+    df["EMA_SLOW"] = ema(df["close"], config.get("slow", 21))
+    symbol, qty = config.get("symbol", "BTCUSDT"), config.get("qty", 0.01)
+    SL, TP = config.get("stop_loss", 0.1), config.get("target_profit", 0.5)
+
+    def sig(ts, side):
+        return {"timestamp": ts, "symbol": symbol, "side": side, "qty": qty}
+
+    signals, position, entry_price = [], 0, None
+    for ts, row in df.iterrows():
+        if pd.isna(row["EMA_FAST"]) or pd.isna(row["EMA_SLOW"]):
+            continue
+        price, ema_fast, ema_slow = row["close"], row["EMA_FAST"], row["EMA_SLOW"]
+        if position == 1:
+            if price <= entry_price * (1 - SL) or price >= entry_price * (1 + TP):
+                signals.append(sig(ts, "sell"))
+                position, entry_price = 0, None
+                continue
+        elif position == -1:
+            if price >= entry_price * (1 + SL) or price <= entry_price * (1 - TP):
+                signals.append(sig(ts, "buy"))
+                position, entry_price = 0, None
+                continue
+        if ema_fast > ema_slow:
+            if position == 1:
+                continue
+            if position == -1:
+                signals.append(sig(ts, "buy"))
+            signals.append(sig(ts, "buy"))
+            position, entry_price = 1, price
+            continue
+        if ema_fast < ema_slow:
+            if position == -1:
+                continue
+            if position == 1:
+                signals.append(sig(ts, "sell"))
+            signals.append(sig(ts, "sell"))
+            position, entry_price = -1, price
+    return signals
+
+
+def reference_vwap(data, config):
+    df = data.copy()
+    session, mult = config.get("session", "W"), float(config.get("mult", 2.0))
+    stop_loss, target_profit = float(config.get("stop_loss", 0.01)), float(config.get("target_profit", 0.04))
+    symbol, qty = config.get("symbol", "BTCUSDT"), config.get("qty", 1)
+
+    def new_session(ts, last):
+        if session == "D":
+            return ts.date() != last.date()
+        if session == "W":
+            return ts.isocalendar().week != last.isocalendar().week
+        if session == "M":
+            return ts.year != last.year or ts.month != last.month
+        return False
+
+    hlc3 = (df["high"] + df["low"] + df["close"]) / 3
+    upper, lower = [], []
+    cum_pv = cum_vol = sum_sq = 0.0
+    last = df.index[0]
+    for ts, vol_i, h3 in zip(df.index, df["volume"], hlc3):
+        if new_session(ts, last):
+            cum_pv = cum_vol = sum_sq = 0.0
+        last = ts
+        cum_pv += h3 * vol_i
+        cum_vol += vol_i
+        cur_vwap = cum_pv / cum_vol if cum_vol > 0 else np.nan
+        sum_sq += (h3 - cur_vwap) ** 2 * vol_i
+        stdev = np.sqrt(sum_sq / cum_vol if cum_vol > 0 else 0.0)
+        upper.append(cur_vwap + mult * stdev)
+        lower.append(cur_vwap - mult * stdev)
+    df["UPPER"], df["LOWER"] = upper, lower
+
+    def sig(ts, side):
+        return {"timestamp": ts, "symbol": symbol, "side": side, "qty": qty}
+
+    signals, position, entry_price = [], 0, None
+    prev_close = prev_upper = prev_lower = None
+    for ts, row in df.iterrows():
+        close, up, lo = row["close"], row["UPPER"], row["LOWER"]
+        if prev_close is None:
+            prev_close, prev_upper, prev_lower = close, up, lo
+            continue
+        if position == 1:
+            if close <= entry_price * (1 - stop_loss) or close >= entry_price * (1 + target_profit):
+                signals.append(sig(ts, "sell"))
+                position, entry_price = 0, None
+        elif position == -1:
+            if close >= entry_price * (1 + stop_loss) or close <= entry_price * (1 - target_profit):
+                signals.append(sig(ts, "buy"))
+                position, entry_price = 0, None
+        if prev_close < prev_upper and close > up:
+            if position == -1:
+                signals.append(sig(ts, "buy"))
+            if position <= 0:
+                signals.append(sig(ts, "buy"))
+                position, entry_price = 1, close
+        if prev_close > prev_lower and close < lo:
+            if position == 1:
+                signals.append(sig(ts, "sell"))
+            if position >= 0:
+                signals.append(sig(ts, "sell"))
+                position, entry_price = -1, close
+        prev_close, prev_upper, prev_lower = close, up, lo
+    return signals
+
+
+# ---------------------------------------------------------------
+def _timed(fn):
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        out = fn()
+        return out, time.perf_counter() - t0
+
+
+@contextlib.contextmanager
+def _python_kernel():
+    """Run sltp_signals on the uncompiled Python function."""
+    compiled = sltp_kernel._sltp_kernel
+    sltp_kernel._sltp_kernel = getattr(compiled, "py_func", compiled)
+    try:
+        yield
+    finally:
+        sltp_kernel._sltp_kernel = compiled
+
+
+def parity(n_bars):
+    ok = True
+    cases = [("EMACrossoverTALib", EMACrossoverTALib, EMA_CONFIG, reference_ema_talib)]
+    for session in ("D", "W", "M"):
+        cases.append((f"VWAPBreakout {session}", VWAPBreakout, {**VWAP_CONFIG, "session": session}, reference_vwap))
+    for seed in range(2):
+        df = make_frame(n_bars, seed)
+        for name, cls, config, reference in cases:
+            ref, t_ref = _timed(lambda: reference(df, config))
+            for label, ctx in (("compiled", contextlib.nullcontext), ("python", _python_kernel)):
+                with ctx():
+                    got, t_got = _timed(lambda: cls(df, config).generate_signals())
+                same = ref == got.to_records()
+                ok &= same
+                print(f"  seed {seed} {name:20s} {label:8s} signals={len(ref):6,}  identical={same}  "
+                      f"({t_got * 1000:8.1f} ms vs iterrows {t_ref * 1000:9.1f} ms)")
+    if indicators.ta is not None:
+        close = make_frame(n_bars)["close"].to_numpy()
+        close[:5] = np.nan
+        for period in (9, 21, 200):
+            same = np.allclose(indicators.ta.EMA(close, timeperiod=period),
+                               indicators.ema_multi(pd.Series(close), [period], backend="kernel").iloc[:, 0],
+                               equal_nan=True, rtol=0, atol=1e-9)
+            ok &= same
+            print(f"  EMA({period}) fallback matches TA-Lib: {same}")
+    return ok
+
+
+def timing(sizes):
+    for n in sizes:
+        df = make_frame(n)
+        _, t_ema = _timed(lambda: EMACrossoverTALib(df, EMA_CONFIG).generate_signals())
+
+        vwap, t_vwap = _timed(lambda: VWAPBreakout(df, VWAP_CONFIG).generate_signals())
+        print(f"{n:>12,} bars  EMACrossoverTALib.generate_signals {t_ema * 1000:8.1f} ms   "
+              f"VWAPBreakout.generate_signals {t_vwap * 1000:8.1f} ms ({len(vwap):,} signals)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parity-bars", type=int, default=100_000)
+    parser.add_argument("--bars", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"Numba: {'yes' if NUMBA_AVAILABLE else 'no (pure-Python kernel)'}, "
+          f"TA-Lib: {'yes' if indicators.ta is not None else 'no (NumPy EMA fallback)'}")
+    _timed(lambda: sltp_kernel.sltp_signals(np.ones(2), np.zeros(2), np.zeros(2), 0.1, 0.1))    # compile
+    print(f"Golden output, {args.parity_bars:,} bars:")
+    ok = parity(args.parity_bars)
+    print("✅ identical to previous implementations" if ok else "❌ output differs")
+    timing(args.bars)
+    if not ok:
+        sys.exit(1)
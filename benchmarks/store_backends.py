@@ -0,0 +1,122 @@
+# benchmarks/store_backends.py
+"""DataStore load latency and memory: parquet vs memory-mapped Arrow IPC backend.
+
+Writes the same synthetic 1m dataset with both backends, times load() and
+load_arrays() in this process, then starts several worker processes that each
+load the same range and report RSS and PSS (proportional set size: shared
+pages are split between the processes mapping them). PSS needs Linux.
+
+Arrow load_arrays() of a range inside one month partition is zero-copy, so its
+workers only map shared pages; longer ranges are concatenated into private
+arrays.
+
+Usage:
+    python -m benchmarks.store_backends --rows 2000000 --workers 4
+"""
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks._data import make_frame
+from markets.common.data_store import DataStore
+
+SYMBOL, TIMEFRAME = "BENCHUSDT", "1m"
+
+
+def _memory_kb():
+    """(RSS, PSS) of this process in kB; PSS is None where /proc/self/smaps_rollup is missing."""
+    rss = pss = None
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Rss:"):
+                    rss = int(line.split()[1])
+                elif line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss, pss
+
+
+def _worker(args):
+    base_path, backend, arrays, date_range, barrier = args
+    store = DataStore(base_path, backend=backend)
+    before, _ = _memory_kb()
+    t0 = time.perf_counter()
+    data = (store.load_arrays if arrays else store.load)(SYMBOL, TIMEFRAME, *date_range)
+    # Touch every value so mapped pages are actually faulted in
+    total = sum(float(np.asarray(v, dtype=float).sum()) for k, v in data.items() if k != "timestamp") \
+        if arrays else float(data.to_numpy().sum())
+    elapsed = time.perf_counter() - t0
+    barrier.wait()                          # all workers hold their data while memory is measured
+    rss, pss = _memory_kb()
+    barrier.wait()
+    return elapsed, rss - before, pss, total
+
+
+def time_loads(store, repeat=5):
+    out = {}
+    month = ("01-03-2020", "31-03-2020")
+    for label, fn in [
+        ("load full", lambda: store.load(SYMBOL, TIMEFRAME)),
+        ("load month", lambda: store.load(SYMBOL, TIMEFRAME, *month)),
+        ("load_arrays full", lambda: store.load_arrays(SYMBOL, TIMEFRAME)),
+        ("load_arrays month", lambda: store.load_arrays(SYMBOL, TIMEFRAME, *month)),
+    ]:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+        out[label] = best
+    return out
+
+
+def run(n_rows, n_workers):
+    df = make_frame(n_rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {}
+        for backend in ("parquet", "arrow"):
+            store = DataStore(os.path.join(tmp, backend), backend=backend)
+            t0 = time.perf_counter()
+            store.save(df, SYMBOL, TIMEFRAME)
+            size = sum(os.path.getsize(os.path.join(d, f))
+                       for d, _, files in os.walk(store.base_path) for f in files)
+            print(f"{backend:8s} save {time.perf_counter() - t0:6.2f}s  on disk {size / 1e6:8.1f} MB")
+            stores[backend] = store
+
+        print(f"\nBest of 5, {n_rows:,} rows:")
+        for backend, store in stores.items():
+            for label, secs in time_loads(store).items():
+                print(f"  {backend:8s} {label:18s} {secs * 1000:9.2f} ms")
+
+        ctx = mp.get_context("spawn")
+        for range_label, date_range in (("full dataset", (None, None)), ("one month", ("01-03-2020", "31-03-2020"))):
+            print(f"\n{n_workers} processes each loading the {range_label} (per-process averages):")
+            for backend, store in stores.items():
+                for arrays in (False, True):
+                    with ctx.Manager() as manager:
+                        barrier = manager.Barrier(n_workers)
+                        with ctx.Pool(n_workers) as pool:
+                            results = pool.map(_worker, [(store.base_path, backend, arrays, date_range, barrier)]
+                                               * n_workers)
+                    secs = np.mean([r[0] for r in results])
+                    rss = np.mean([r[1] for r in results]) / 1024
+                    pss = [r[2] for r in results]
+                    pss_txt = f"{np.mean(pss) / 1024:8.1f} MB" if None not in pss else "     n/a"
+                    label = "load_arrays" if arrays else "load"
+                    print(f"  {backend:8s} {label:12s} {secs * 1000:9.1f} ms   "
+                          f"RSS +{rss:8.1f} MB   PSS {pss_txt}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    run(args.rows, args.workers)
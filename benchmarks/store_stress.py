@@ -0,0 +1,132 @@
+# benchmarks/store_stress.py
+"""Concurrent DataStore writers and readers in separate processes.
+
+Writers append overlapping random slices of one synthetic 1m series to the
+same dataset; readers load random ranges meanwhile. Every bar's close is a
+function of its timestamp, so any torn read shows up as a wrong value, and a
+lost update as a missing bar in the final dataset.
+
+Usage:
+    python -m benchmarks.store_stress --writers 4 --readers 4 --appends 25
+    python -m benchmarks.store_stress --unlocked    # same run without the advisory lock
+"""
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from markets.common import data_store
+from markets.common.data_store import DataStore
+
+SYMBOL, TIMEFRAME = "STRESSUSDT", "1m"
+START = pd.Timestamp("2024-01-01", tz="UTC")
+N_BARS = 4 * 31 * 1440     # ~4 month partitions
+
+
+def bars(lo, hi):
+    idx = pd.date_range(START + pd.Timedelta(minutes=lo), periods=hi - lo, freq="1min", name="timestamp")
+    close = np.arange(lo, hi, dtype=float)
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0},
+                        index=idx)
+
+
+def _check(df):
+    """Errors in a loaded frame: unsorted/duplicate index or values not matching their timestamps."""
+    if df is None or df.empty:
+        return []
+    errors = []
+    if not df.index.is_monotonic_increasing or not df.index.is_unique:
+        errors.append("index not sorted/unique")
+    minute = ((df.index - START) // pd.Timedelta(minutes=1)).to_numpy()
+    if not np.array_equal(df["close"].to_numpy(), minute.astype(float)):
+        errors.append("close does not match timestamp")
+    return errors
+
+
+def _writer(args):
+    base_path, seed, n_appends, locked = args
+    if not locked:
+        data_store.fcntl = None
+    rng = np.random.default_rng(seed)
+    store = DataStore(base_path)
+    written = []
+    for _ in range(n_appends):
+        lo = int(rng.integers(0, N_BARS - 1))
+        hi = min(N_BARS, lo + int(rng.integers(1, 20_000)))
+        store.append(bars(lo, hi), SYMBOL, TIMEFRAME)
+        written.append((lo, hi))
+    return written
+
+
+def _reader(args):
+    base_path, seed, deadline, locked = args
+    if not locked:
+        data_store.fcntl = None
+    rng = np.random.default_rng(seed)
+    store = DataStore(base_path)
+    loads, errors = 0, []
+    while time.time() < deadline:
+        lo = int(rng.integers(0, N_BARS))
+        start = START + pd.Timedelta(minutes=lo)
+        end = start + pd.Timedelta(minutes=int(rng.integers(1, 60_000)))
+        try:
+            errors += _check(store.load(SYMBOL, TIMEFRAME, start, end))
+        except Exception as e:          # a half-written parquet file fails to open
+            errors.append(f"{type(e).__name__}: {e}")
+        loads += 1
+    return loads, errors
+
+
+def run(n_writers, n_readers, n_appends, locked=True):
+    """Writers and readers together; readers stop once the writers are done."""
+    with tempfile.TemporaryDirectory() as base_path:
+        ctx = mp.get_context("spawn")
+        t0 = time.time()
+        with ctx.Pool(n_writers) as wpool, ctx.Pool(n_readers) as rpool:
+            writers = wpool.map_async(_writer, [(base_path, i, n_appends, locked) for i in range(n_writers)])
+            readers = []
+            while not writers.ready():
+                # Readers run in 1s rounds until the writers are done
+                readers += [rpool.apply_async(_reader, ((base_path, len(readers) + i, time.time() + 1.0, locked),))
+                            for i in range(n_readers)]
+                writers.wait(1.0)
+            written = writers.get()
+            reads = [r.get() for r in readers]
+        elapsed = time.time() - t0
+
+        store = DataStore(base_path)
+        final = store.load(SYMBOL, TIMEFRAME)
+        expected = np.zeros(N_BARS, dtype=bool)
+        for lo, hi in (span for spans in written for span in spans):
+            expected[lo:hi] = True
+        got = np.zeros(N_BARS, dtype=bool)
+        if final is not None:
+            got[((final.index - START) // pd.Timedelta(minutes=1)).to_numpy()] = True
+        manifest = store.manifest(SYMBOL, TIMEFRAME)
+        read_errors = [e for _, errors in reads for e in errors]
+
+        print(f"{'locked' if locked else 'UNLOCKED'}: {n_writers} writers x {n_appends} appends, "
+              f"{n_readers} readers, {elapsed:.1f}s")
+        print(f"  reads={sum(n for n, _ in reads):,}  read errors={len(read_errors)}"
+              + (f"  e.g. {read_errors[0]}" if read_errors else ""))
+        print(f"  final rows={0 if final is None else len(final):,}  expected={int(expected.sum()):,}  "
+              f"lost={int((expected & ~got).sum()):,}  final frame errors={_check(final)}")
+        print(f"  manifest rows={manifest['rows'] if manifest else None}")
+        return not read_errors and not (expected & ~got).any() and manifest and manifest["rows"] == len(final)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--appends", type=int, default=25)
+    parser.add_argument("--unlocked", action="store_true", help="disable the advisory lock (expect failures)")
+    args = parser.parse_args()
+    ok = run(args.writers, args.readers, args.appends, locked=not args.unlocked)
+    print("✅ consistent" if ok else "❌ inconsistent")
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,89 @@
+# benchmarks/sweep.py
+"""Parameter-sweep throughput and core utilisation.
+
+Runs a fast/slow/stop_loss/target_profit grid of EMACrossoverTALib on
+CustomEngine with backtest.sweep, in-process and on a pool of every core,
+and checks both give the same rows. Utilisation is the time spent inside
+runs over wall time x processes; the rest is per-task overhead (dispatch,
+result pickling, pool start-up).
+
+Usage:
+    python -m benchmarks.sweep --bars 2000 --grid-size 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest.sweep import STAT_COLUMNS, SharedFrame, iter_sweep, sweep
+from benchmarks._data import make_frame
+from strategies.ema_crossover_talib import EMACrossoverTALib
+
+BASE = {"symbol": "ETHUSDT", "qty": 1, "cash": 100000.0, "commission": 0.0005}
+
+
+def make_grid(size):
+    """About `size` combinations, 10 values per parameter axis at 10k."""
+    per_axis = max(2, round(size ** 0.25))
+    return {
+        "fast": list(range(3, 3 + 2 * per_axis, 2)),
+        "slow": list(range(30, 30 + 5 * per_axis, 5)),
+        "stop_loss": np.round(np.linspace(0.002, 0.02, per_axis), 4).tolist(),
+        "target_profit": np.round(np.linspace(0.004, 0.05, per_axis), 4).tolist(),
+    }
+
+
+def _rows(rows):
+    return pd.DataFrame(rows).drop(columns="seconds").sort_values("task").reset_index(drop=True)
+
+
+def shared_frame_roundtrip(df):
+    with SharedFrame(df) as shared:
+        frame, shm = SharedFrame.attach(shared.spec)
+        same = frame.equals(df) and frame.index.equals(df.index)
+        del frame
+        shm.close()
+    return same
+
+
+def run(n_bars, grid_size, processes):
+    df = make_frame(n_bars, freq="5min")
+    grid = make_grid(grid_size)
+    n = int(np.prod([len(v) for v in grid.values()]))
+    ok = shared_frame_roundtrip(df)
+    print(f"SharedFrame round trip identical: {ok}")
+
+    # Same rows in-process and on the pool (first 200 combinations)
+    subset = [dict(zip(grid, combo)) for combo in pd.MultiIndex.from_product(list(grid.values()))[:200]]
+    same = _rows(iter_sweep(df, EMACrossoverTALib, subset, BASE, processes=1)).equals(
+        _rows(iter_sweep(df, EMACrossoverTALib, subset, BASE, processes=processes)))
+    ok &= same
+    print(f"pool rows identical to in-process rows: {same}")
+
+    for label, procs in (("in-process", 1), (f"{processes} processes", processes)):
+        t0 = time.perf_counter()
+        table = sweep(df, EMACrossoverTALib, grid, BASE, processes=procs, progress=False)
+        wall = time.perf_counter() - t0
+        frame = table.to_frame()
+        busy = frame["seconds"].sum()
+        ok &= len(table) == n and "error" not in frame
+        print(f"{n_bars:>9,} bars  {n:,} runs  {label:14s} {wall:7.2f} s  {n / wall:8.1f} runs/s  "
+              f"utilisation {busy / (wall * procs):6.1%}  overhead {(wall * procs - busy) / n * 1e3:6.3f} ms/run")
+    print(table.top(5)[["fast", "slow", "stop_loss", "target_profit"] + STAT_COLUMNS].to_string(index=False))
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, default=2_000)
+    parser.add_argument("--grid-size", type=int, default=10_000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    ok = run(args.bars, args.grid_size, args.processes)
+    print("✅ ok" if ok else "❌ failed")
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,89 @@
+# benchmarks/tick_store.py
+"""TickStore ingest rate on one thread, then durability/compaction round trip.
+
+Usage:
+    python -m benchmarks.tick_store --ticks 2000000 --instruments 50
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from markets.common.tick_store import TickStore
+
+
+def run(n_ticks, n_instruments, segment_mb):
+    rng = np.random.default_rng(0)
+    names = [f"SYM{i}" for i in range(n_instruments)]
+    which = rng.integers(0, n_instruments, n_ticks)
+    ts = 1_700_000_000_000_000 + np.cumsum(rng.integers(1, 2_000, n_ticks))    # ~1 day of microseconds
+    price = np.round(100 + np.cumsum(rng.normal(0, 0.01, n_ticks)), 2)
+    size = np.round(rng.exponential(1, n_ticks), 4)
+
+    # Plain Python values, as a websocket callback would have them
+    ticks = list(zip(ts.tolist(), [names[i] for i in which], price.tolist(), size.tolist()))
+
+    with tempfile.TemporaryDirectory() as base_path:
+        store = TickStore(base_path, segment_bytes=segment_mb << 20, compact_interval=1.0)
+        record = store.record
+        t0 = time.perf_counter()
+        for t, name, p, s in ticks:
+            record(t, name, p, s)
+        elapsed = time.perf_counter() - t0
+        print(f"record():      {n_ticks:,} ticks in {elapsed:.2f}s = {n_ticks / elapsed:,.0f} ticks/s")
+
+        t0 = time.perf_counter()
+        for i, name in enumerate(names):
+            mask = which == i
+            store.record_many(ts[mask], name, price[mask], size[mask])
+        elapsed = time.perf_counter() - t0
+        print(f"record_many(): {n_ticks:,} ticks in {elapsed:.2f}s = {n_ticks / elapsed:,.0f} ticks/s")
+
+        t0 = time.perf_counter()
+        store.close()
+        print(f"close (flush + fsync + compact): {time.perf_counter() - t0:.2f}s, "
+              f"fsyncs={store.fsyncs}, segments compacted={store.compacted_segments}")
+
+        stored = sum(len(store.store.load_ticks(name)) for name in names)
+        sample = store.store.load_ticks(names[0])
+        mask = which == 0
+        expected = np.sort(np.concatenate([price[mask], price[mask]]))
+        prices_match = np.array_equal(np.sort(sample["price"].to_numpy()), expected)
+        print(f"rows in DataStore: {stored:,} (expected {2 * n_ticks:,}); {names[0]} prices match: {prices_match}")
+    return stored == 2 * n_ticks and prices_match
+
+
+def shared_base(n_ticks=20_000):
+    """Two stores on one base path (as the socket clients run them), compacting while both write."""
+    with tempfile.TemporaryDirectory() as base_path:
+        stores = [TickStore(base_path, segment_bytes=16 << 10, flush_interval=0.01, compact_interval=0.05)
+                  for _ in range(2)]
+        expected = {"BTCUSD": n_ticks, "NIFTY": n_ticks // 2}
+        for i in range(n_ticks):
+            stores[0].record(1_700_000_000_000_000 + i, "BTCUSD", 100.0 + i)
+            if i < n_ticks // 2:
+                stores[1].record(1_700_000_000_000_000 + i, "NIFTY", 200.0 + i)
+            if i % 500 == 0:
+                for store in stores:
+                    store.compact()
+        for store in stores:
+            store.close()
+        stored = {name: len(stores[0].store.load_ticks(name)) for name in expected}
+    ok = stored == expected
+    print(f"two stores on one base path: stored {stored} (expected {expected})")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=2_000_000)
+    parser.add_argument("--instruments", type=int, default=50)
+    parser.add_argument("--segment-mb", type=int, default=16)
+    args = parser.parse_args()
+    ok = run(args.ticks, args.instruments, args.segment_mb)
+    ok &= shared_base()
+    print("✅ ok" if ok else "❌ failed")
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,89 @@
+# benchmarks/vwap_bands.py
+"""utils.indicators.anchored_vwap vs the per-bar VWAPBreakout loop it replaced.
+
+The bands must match bit for bit (NaNs included) for D/W/M sessions, on data
+with gaps across year ends and zero-volume stretches. Then both are timed.
+
+Usage:
+    python -m benchmarks.vwap_bands --bars 1000000 --max-reference 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import _data
+from utils.indicators import anchored_vwap
+
+
+def make_frame(n_bars, seed=0, freq="5min"):
+    df = _data.make_frame(n_bars, seed, freq=freq, start="2019-12-20").drop(columns="open")
+    rng = np.random.default_rng(seed)
+    # Drop random stretches, including whole weeks around year ends, to exercise session changes across gaps
+    keep = np.ones(n_bars, dtype=bool)
+    for lo in rng.integers(0, n_bars, max(1, n_bars // 20_000)):
+        keep[lo:lo + int(rng.integers(1, 5_000))] = False
+    df.loc[rng.random(n_bars) < 0.01, "volume"] = 0.0
+    return df[keep]
+
+
+def reference_bands(df, session, mult):
+    """The previous VWAPBreakout loop."""
+    def new_session(ts, last):
+        if session == "D":
+            return ts.date() != last.date()
+        if session == "W":
+            return ts.isocalendar().week != last.isocalendar().week
+        if session == "M":
+            return ts.year != last.year or ts.month != last.month
+        return False
+
+    hlc3 = (df["high"] + df["low"] + df["close"]) / 3
+    vwap, upper, lower = [], [], []
+    cum_pv = cum_vol = sum_sq = 0.0
+    last = df.index[0]
+    for ts, vol_i, h3 in zip(df.index, df["volume"], hlc3):
+        if new_session(ts, last):
+            cum_pv = cum_vol = sum_sq = 0.0
+        last = ts
+        cum_pv += h3 * vol_i
+        cum_vol += vol_i
+        cur_vwap = cum_pv / cum_vol if cum_vol > 0 else np.nan
+        sum_sq += (h3 - cur_vwap) ** 2 * vol_i
+        stdev = np.sqrt(sum_sq / cum_vol if cum_vol > 0 else 0.0)
+        vwap.append(cur_vwap)
+        upper.append(cur_vwap + mult * stdev)
+        lower.append(cur_vwap - mult * stdev)
+    return pd.DataFrame({"VWAP": vwap, "UPPER": upper, "LOWER": lower}, index=df.index)
+
+
+def run(n_bars, max_reference, mult=2.0):
+    ok = True
+    df = make_frame(n_bars)
+    for tz in ("UTC", "America/New_York"):
+        frame = df.tz_convert(tz)
+        for session in ("D", "W", "M", "none"):
+            t0 = time.perf_counter()
+            got = anchored_vwap(frame["high"], frame["low"], frame["close"], frame["volume"], session, mult)
+            t_fast = time.perf_counter() - t0
+            line = f"{tz:17s} {session:5s} {len(frame):>10,} bars  vectorized {t_fast * 1000:8.1f} ms"
+            if len(frame) <= max_reference:
+                t0 = time.perf_counter()
+                ref = reference_bands(frame, session, mult)
+                t_ref = time.perf_counter() - t0
+                same = all(np.array_equal(ref[c].to_numpy(), got[c].to_numpy(), equal_nan=True) for c in ref)
+                ok &= same
+                line += f"  loop {t_ref * 1000:9.1f} ms  speedup {t_ref / t_fast:6.1f}x  identical={same}"
+            print(line)
+    print("✅ identical bands" if ok else "❌ bands differ")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, default=1_000_000)
+    parser.add_argument("--max-reference", type=int, default=1_000_000,
+                        help="largest size the per-bar loop is run at")
+    args = parser.parse_args()
+    run(args.bars, args.max_reference)
@@ -0,0 +1,45 @@
+# benchmarks/ws_stream.py
+"""Offline load test of BinanceData.subscribe_ticks against the local stream stand-in.
+
+Usage:
+    python -m benchmarks.ws_stream --symbols 50 --rate 5000 --seconds 5
+    python -m benchmarks.ws_stream --drop-after 2000     # exercise reconnects
+"""
+import argparse
+import time
+
+from markets.crypto.data.binance_data import BinanceData
+from markets.crypto.data.stub_server import StubStreamServer
+
+
+def run(n_symbols, rate, seconds, drop_after=None, channel="kline_1m"):
+    symbols = [f"SYM{i}USDT" for i in range(n_symbols)]
+    received = [0]
+
+    def on_batch(batch):
+        received[0] += len(batch)
+
+    with StubStreamServer(rate=rate, drop_after=drop_after) as server:
+        fetcher = BinanceData(stream_url=server.url)
+        stream = fetcher.subscribe_ticks(symbols, on_batch, channels=(channel,), blocking=False,
+                                         reconnect_delay=0.1)
+        time.sleep(seconds)
+        stream.stop()
+        stream.thread.join(timeout=5)
+
+        stats = stream.stats()
+        print(f"sent={server.sent}  received={received[0]}  "
+              f"throughput={received[0] / seconds:,.0f} msg/s  connections={server.connections}")
+        print(f"batches={stats['batches']}  reconnects={stats['reconnects']}  latency ms "
+              f"p50={stats['latency_ms_p50']:.2f}  p99={stats['latency_ms_p99']:.2f}  max={stats['latency_ms_max']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--rate", type=int, default=5000, help="messages per second")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--drop-after", type=int, default=None)
+    parser.add_argument("--channel", default="kline_1m")
+    args = parser.parse_args()
+    run(args.symbols, args.rate, args.seconds, args.drop_after, args.channel)
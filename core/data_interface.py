@@ -1,6 +1,45 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
 import pandas as pd
 
+
+@dataclass
+class MultiFetchResult:
+    """Outcome of fetch_ohlcv_many: frames for symbols that succeeded, exceptions for those that failed."""
+    frames: dict[str, pd.DataFrame] = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+
+    def to_long(self) -> pd.DataFrame:
+        """Stack all frames into one long-format frame with a `symbol` column."""
+        if not self.frames:
+            return pd.DataFrame(columns=["symbol", "open", "high", "low", "close", "volume"])
+        return pd.concat([df.assign(symbol=sym) for sym, df in self.frames.items()]).sort_index(kind="stable")
+
+
+def rechunk(frames: Iterable[pd.DataFrame], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Regroup a stream of time-ordered frames into chunks of exactly chunk_rows rows (the last may be shorter)."""
+    pending = []
+    pending_rows = 0
+    for frame in frames:
+        if frame is None or frame.empty:
+            continue
+        pending.append(frame)
+        pending_rows += len(frame)
+        if pending_rows < chunk_rows:
+            continue
+        merged = pd.concat(pending) if len(pending) > 1 else pending[0]
+        start = 0
+        while pending_rows - start >= chunk_rows:
+            yield merged.iloc[start:start + chunk_rows]
+            start += chunk_rows
+        rest = merged.iloc[start:]
+        pending = [rest] if len(rest) else []
+        pending_rows = len(rest)
+    if pending:
+        yield pd.concat(pending) if len(pending) > 1 else pending[0]
+
+
 class DataInterface(ABC):
     @abstractmethod
     def fetch_ohlcv(self, 
@@ -22,6 +61,39 @@ class DataInterface(ABC):
         """
         pass
 
+    def fetch_ohlcv_iter(self,
+                         symbol: str,
+                         timeframe: str = "1m",
+                         start_date: str | None = None,
+                         end_date: str | None = None,
+                         chunk_rows: int = 100_000) -> Iterator[pd.DataFrame]:
+        """Yield the same data as fetch_ohlcv as time-ordered chunks of at most chunk_rows rows.
+
+        This default still materializes the full frame; providers override it to
+        keep memory bounded by the chunk size.
+        """
+        df = self.fetch_ohlcv(symbol, timeframe, start_date, end_date)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+    def fetch_ohlcv_many(self,
+                         symbols: list[str],
+                         timeframe: str = "1m",
+                         start_date: str | None = None,
+                         end_date: str | None = None) -> MultiFetchResult:
+        """Fetch several symbols; a failing symbol is recorded in `errors` and does not stop the batch.
+
+        This default fetches one symbol after another; providers override it to run concurrently.
+        """
+        result = MultiFetchResult()
+        for symbol in symbols:
+            try:
+                result.frames[symbol] = self.fetch_ohlcv(symbol, timeframe, start_date, end_date)
+            except Exception as e:
+                print(f"❌ {symbol}: {e}")
+                result.errors[symbol] = e
+        return result
+
     @abstractmethod
     def subscribe_ticks(self, symbols: list[str], callback):
         pass
@@ -1,13 +1,266 @@
 # markets/common/data_store.py
+"""Parquet (or Arrow IPC) cache for OHLCV data.
+
+Each (symbol, timeframe) is one canonical dataset partitioned by month:
+
+    <base_path>/<symbol>/<timeframe>/year=YYYY/month=MM/data.parquet
+
+Appends rewrite only the partitions the new rows fall into, so their cost does
+not grow with history, and every requested date range is served from the same
+data instead of a file per range.
+
+Partitions are written time-sorted in row groups of _ROW_GROUP_ROWS rows, so
+load() can push the time range down to the parquet reader and skip whole
+row groups by their min/max statistics.
+
+Every dataset directory also holds a small `_manifest.json` describing the
+data: min/max timestamp, row count, covered intervals, schema, per-partition
+stats, a content hash and the last write time. It is replaced atomically on
+every save/append, so freshness and coverage questions are answered without
+opening any parquet file.
+
+With backend="arrow" partitions are uncompressed Arrow IPC files
+(`data.arrow`) read through memory maps instead: nothing is decompressed,
+processes loading the same data share its pages in the OS page cache, and
+load_arrays() returns columns of a single partition as NumPy views of the
+mapped file. The backend is per base_path; derived frames stay parquet.
+
+Writers take an exclusive advisory lock on `<dataset>/.lock` (flock, so it
+also holds across processes) for the whole read-modify-write of partitions
+and manifest, and every file is written to a temp name and renamed into
+place. Readers take the shared lock only while they open the partitions, so
+they see one consistent snapshot and never a half-written file.
+
+Storage profiles choose how parquet partitions are encoded (see PROFILES):
+"exact" keeps float64 with snappy, "compact" uses zstd plus the smallest
+exact encoding per column, and "fast" uses lz4 without dictionaries. Columns
+written in a compact encoding are tagged in the file's schema metadata, and
+reads decode them back to float64 whatever profile the reading store uses.
+
+With `cache_bytes` set, decoded load() results are also kept in an in-process
+LRU FrameCache (see frame_cache.py), keyed by dataset, range and columns.
+Entries are dropped on save/append, and when another process rewrites the
+dataset (detected from the manifest's mtime).
+"""
+import contextlib
+import glob
+import hashlib
+import json
 import os
+import re
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:     # Windows: no flock; atomic renames still keep files whole
+    fcntl = None
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from markets.common.frame_cache import FrameCache
+
+_PART_FILES = {"parquet": "data.parquet", "arrow": "data.arrow"}
+_MANIFEST_FILE = "_manifest.json"
+_LOCK_FILE = ".lock"
+_INDEX_COL = "timestamp"
+_ROW_GROUP_ROWS = 10_000     # ~1 week of 1m bars per row group
+_ENCODING_KEY = b"ohlcv_encoding"
+
+# Parquet write settings per storage profile.
+#   encode: try a scaled-integer encoding per float column: values x are stored
+#       as round(x * 10**d) for the smallest d <= max_decimals for which
+#       round(x * 10**d) / 10**d == x holds bit-for-bit for every value (and
+#       |x| * 10**d < 2**53). Exchange prices/sizes are short decimals, so this
+#       is lossless. Columns that fail (or contain NaN) fall back to float32
+#       if its largest relative error is <= float32_rel_error, else stay float64.
+PROFILES = {
+    "exact": {"compression": "snappy", "compression_level": None, "use_dictionary": True,
+              "row_group_rows": _ROW_GROUP_ROWS, "encode": False},
+    "compact": {"compression": "zstd", "compression_level": 9, "use_dictionary": True,
+                "row_group_rows": 50_000, "encode": True, "max_decimals": 8, "float32_rel_error": None},
+    "fast": {"compression": "lz4", "compression_level": None, "use_dictionary": False,
+             "row_group_rows": _ROW_GROUP_ROWS, "encode": False},
+}
+_LEGACY_FILE = re.compile(r"^(?P<sym>.+?)_(?P<tf>\d+[mhdw])(?:_.+)?\.parquet$")
+
+
+def _to_timestamp(value):
+    """dd-mm-YYYY string, datetime-like or None -> UTC Timestamp or None."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            return pd.Timestamp(datetime.strptime(value, "%d-%m-%Y"), tz="UTC")
+        except ValueError:
+            pass
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _ms(ts) -> int:
+    return int(pd.Timestamp(ts).value // 1_000_000)
+
+
+def _bar_ms(timeframe: str) -> int:
+    """Bar length in ms, or 1 for timeframes the resampler does not know (weekly/monthly)."""
+    from markets.common.resample import timeframe_ms
+
+    try:
+        return timeframe_ms(timeframe)
+    except ValueError:
+        return 1
+
+
+def _merge_intervals(intervals: list, bar_ms: int = 1) -> list:
+    """Union of [first_open_ms, last_open_ms] intervals, sorted.
+
+    Two intervals are joined when no bar can open between them.
+    """
+    merged = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] // bar_ms * bar_ms + bar_ms:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return merged
+
+
+def _runs(open_ms, bar_ms: int) -> list:
+    """Contiguous runs of bars in sorted open times, as [first_open_ms, last_open_ms] intervals."""
+    breaks = np.flatnonzero(np.diff(open_ms) > bar_ms)
+    return [[int(open_ms[a]), int(open_ms[b])]
+            for a, b in zip(np.r_[0, breaks + 1], np.r_[breaks, len(open_ms) - 1])]
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _tmp_path(path: str) -> str:
+    """Per-writer temp name next to `path`; never matches the partition glob."""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _scaled_decimals(x: np.ndarray, max_decimals: int):
+    """Smallest d such that x is exactly round(x * 10**d) / 10**d, or None."""
+    if not np.isfinite(x).all():
+        return None
+    peak = np.abs(x).max(initial=0.0)
+    for d in range(max_decimals + 1):
+        scale = 10.0 ** d
+        if peak * scale >= 2 ** 53:
+            return None
+        if np.array_equal(np.round(x * scale) / scale, x):
+            return d
+    return None
+
+
+def _encode(df: pd.DataFrame, profile: dict):
+    """Float columns in their most compact exact encoding, plus the {column: encoding} record."""
+    encoding = {}
+    if not profile["encode"]:
+        return df, encoding
+    columns = {}
+    for col in df.columns:
+        x = df[col].to_numpy()
+        if x.dtype != np.float64:
+            continue
+        d = _scaled_decimals(x, profile["max_decimals"])
+        if d is not None:
+            columns[col] = np.round(x * 10.0 ** d).astype(np.int64)
+            encoding[col] = {"scaled": d}
+            continue
+        tol = profile["float32_rel_error"]
+        if tol is not None:
+            x32 = x.astype(np.float32)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                err = np.abs(x32 - x) / np.abs(x)
+            if np.nanmax(np.where(x == 0, np.abs(x32), err), initial=0.0) <= tol:
+                columns[col] = x32
+                encoding[col] = {"float32": True}
+    return (df.assign(**columns) if columns else df), encoding
+
+
+def _decode(table: pa.Table, compact_dtypes: bool = False) -> pa.Table:
+    """Undo _encode using the encoding recorded in the table's schema metadata.
+
+    Columns come back as float64, or float32 if `compact_dtypes`.
+    """
+    metadata = table.schema.metadata or {}
+    if _ENCODING_KEY not in metadata:
+        return table
+    target = pa.float32() if compact_dtypes else pa.float64()
+    for col, enc in json.loads(metadata[_ENCODING_KEY]).items():
+        i = table.schema.get_field_index(col)
+        if i < 0:
+            continue
+        values = table.column(i)
+        if "scaled" in enc:
+            values = pc.divide(values.cast(pa.float64()), 10.0 ** enc["scaled"])
+        table = table.set_column(i, col, values.cast(target))
+    return table.replace_schema_metadata({k: v for k, v in metadata.items() if k != _ENCODING_KEY})
+
+
+def _map_ipc(path: str) -> pa.Table:
+    """Open an Arrow IPC file as a table backed by a memory map (no read, no copy)."""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def _slice_range(table: pa.Table, start, end) -> pa.Table:
+    """Zero-copy slice of a time-sorted table to index values within [start, end]."""
+    if start is None and end is None:
+        return table
+    ts = table.column(_INDEX_COL).to_numpy()
+    lo = 0 if start is None else ts.searchsorted(start.tz_convert(None).to_datetime64(), "left")
+    hi = len(ts) if end is None else ts.searchsorted(end.tz_convert(None).to_datetime64(), "right")
+    return table.slice(lo, max(hi - lo, 0))
+
+
+def _filter_range(df: pd.DataFrame, start, end) -> pd.DataFrame:
+    if start is not None:
+        df = df[df.index >= start]
+    if end is not None:
+        df = df[df.index <= end]
+    return df
+
 
 class DataStore:
-    def __init__(self, base_path: str = "data/parquet"):
+    def __init__(self, base_path: str = "data/parquet", cache_bytes: int = 0, backend: str = "parquet",
+                 profile: str | dict = "exact"):
+        """
+        cache_bytes: budget of the in-memory frame cache in front of load(); 0 disables it.
+        backend: "parquet" (compressed, row-group pruning) or "arrow" (memory-mapped IPC).
+        profile: storage profile for writes, a PROFILES name or a dict of the same keys.
+            The arrow backend always writes exact, uncompressed files.
+        """
+        if backend not in _PART_FILES:
+            raise ValueError(f"Unknown DataStore backend: {backend}")
+        if isinstance(profile, str):
+            if profile not in PROFILES:
+                raise ValueError(f"Unknown storage profile: {profile}")
+            profile = PROFILES[profile]
+        self.profile = profile
         self.base_path = base_path
+        self.backend = backend
+        self._part_file = _PART_FILES[backend]
         os.makedirs(self.base_path, exist_ok=True)
+        self.cache = FrameCache(cache_bytes) if cache_bytes else None
 
+    # -------------------------------------------------------------
+    # Layout
+    # -------------------------------------------------------------
     def _path(self, symbol: str, timeframe: str, start_date: str = None, end_date: str = None) -> str:
+        """Single-file path used before the partitioned layout; see import_legacy_files()."""
         safe_sym = symbol.replace("/", "_")
 
         # Default file name if no date range provided
@@ -20,44 +273,512 @@ class DataStore:
 
         return os.path.join(self.base_path, f"{safe_sym}_{timeframe}_{start}_{end}.parquet")
 
-    def save(self, df: pd.DataFrame, symbol: str, timeframe: str, start_date: str = None, end_date: str = None) -> str:
-        if not isinstance(df.index, pd.DatetimeIndex):
-            df.index = pd.to_datetime(df.index)
+    def _dataset_dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.base_path, symbol.replace("/", "_"), timeframe)
 
-        path = self._path(symbol, timeframe, start_date, end_date)
-        df.to_parquet(path)
-        return path
+    def _partition_path(self, symbol: str, timeframe: str, year: int, month: int) -> str:
+        return os.path.join(self._dataset_dir(symbol, timeframe), f"year={year:04d}", f"month={month:02d}", self._part_file)
 
-    def load(self, symbol: str, timeframe: str, start_date: str = None, end_date: str = None):
-        path = self._path(symbol, timeframe, start_date, end_date)
-        if not os.path.exists(path):
-            return None
+    @contextlib.contextmanager
+    def _locked(self, symbol: str, timeframe: str, exclusive: bool):
+        """Hold the dataset's advisory lock: exclusive for writers, shared for readers."""
+        dataset_dir = self._dataset_dir(symbol, timeframe)
+        if fcntl is None or (not exclusive and not os.path.isdir(dataset_dir)):
+            yield
+            return
+        os.makedirs(dataset_dir, exist_ok=True)
+        with open(os.path.join(dataset_dir, _LOCK_FILE), "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
 
-        df = pd.read_parquet(path)
+    def _partitions(self, symbol: str, timeframe: str, start=None, end=None) -> list[str]:
+        """Partition files in time order, limited to months overlapping [start, end]."""
+        pattern = os.path.join(self._dataset_dir(symbol, timeframe), "year=*", "month=*", self._part_file)
+        paths = sorted(glob.glob(pattern))
+        if start is None and end is None:
+            return paths
+
+        lo = (start.year, start.month) if start is not None else (0, 0)
+        hi = (end.year, end.month) if end is not None else (9999, 12)
+        selected = []
+        for path in paths:
+            month_dir = os.path.dirname(path)
+            key = (int(os.path.basename(os.path.dirname(month_dir))[5:]), int(os.path.basename(month_dir)[6:]))
+            if lo <= key <= hi:
+                selected.append(path)
+        return selected
+
+    @staticmethod
+    def _read_partition(path: str) -> pd.DataFrame:
+        df = (_map_ipc(path) if path.endswith(".arrow") else _decode(pq.read_table(path))).to_pandas()
+        if _INDEX_COL in df.columns:
+            df = df.set_index(_INDEX_COL)
         if not isinstance(df.index, pd.DatetimeIndex):
             df.index = pd.to_datetime(df.index)
+        return df
+
+    @staticmethod
+    def _by_month(df: pd.DataFrame):
+        idx = df.index
+        keys = idx.year * 100 + idx.month
+        for key in pd.unique(keys):
+            yield int(key) // 100, int(key) % 100, df[keys == key]
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        if not isinstance(df.index, pd.DatetimeIndex):
+            df = df.copy()
+            df.index = pd.to_datetime(df.index, utc=True)
+        elif df.index.tz is None:
+            df = df.tz_localize("UTC")
+        if df.index.name != _INDEX_COL:
+            df = df.rename_axis(_INDEX_COL)
+        return df
+
+    def _write_partition(self, df: pd.DataFrame, path: str):
+        """Write to a temp file and rename it over `path`, so readers only ever see whole files."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = _tmp_path(path)
+        if path.endswith(".arrow"):
+            # One uncompressed record batch, so every column maps to a single contiguous buffer
+            table = pa.Table.from_pandas(df.sort_index()).combine_chunks()
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            profile = self.profile
+            df, encoding = _encode(df.sort_index(), profile)
+            table = pa.Table.from_pandas(df)
+            if encoding:
+                table = table.replace_schema_metadata({**table.schema.metadata,
+                                                       _ENCODING_KEY: json.dumps(encoding).encode()})
+            pq.write_table(table, tmp, row_group_size=profile["row_group_rows"],
+                           compression=profile["compression"], compression_level=profile["compression_level"],
+                           use_dictionary=profile["use_dictionary"])
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _row_groups_in_range(pf: pq.ParquetFile, start, end) -> list[int]:
+        """Row groups of `pf` whose timestamp min/max statistics overlap [start, end]."""
+        meta = pf.metadata
+        col = pf.schema_arrow.get_field_index(_INDEX_COL)
+        selected = []
+        for i in range(meta.num_row_groups):
+            stats = meta.row_group(i).column(col).statistics
+            if stats is None or not stats.has_min_max:
+                selected.append(i)
+                continue
+            if start is not None and pd.Timestamp(stats.max) < start:
+                continue
+            if end is not None and pd.Timestamp(stats.min) > end:
+                break
+            selected.append(i)
+        return selected
+
+    # -------------------------------------------------------------
+    # Read / write
+    # -------------------------------------------------------------
+    def save(self, df: pd.DataFrame, symbol: str, timeframe: str, start_date: str = None, end_date: str = None) -> str:
+        """Overwrite the month partitions `df` spans with its rows; other months are untouched.
+
+        start_date/end_date are accepted for backwards compatibility; every range
+        now lives in the one canonical dataset.
+        """
+        df = self._normalize(df)
+        with self._locked(symbol, timeframe, exclusive=True):
+            written = {}
+            for year, month, part in self._by_month(df):
+                path = self._partition_path(symbol, timeframe, year, month)
+                self._write_partition(part, path)
+                written[path] = part
+            self._update_manifest(symbol, timeframe, written, self._covered(df, timeframe, None))
+        return self._dataset_dir(symbol, timeframe)
+
+    def load(self, symbol: str, timeframe: str, start_date: str = None, end_date: str = None,
+             columns: list[str] | None = None, compact_dtypes: bool = False):
+        """Rows of the (symbol, timeframe) dataset within [start_date, end_date], or None if nothing is cached.
+
+        Partitions outside the range are never opened; inside them the time
+        predicate and the `columns` projection are pushed down to pyarrow, which
+        skips row groups whose timestamp statistics fall outside the range.
+        With the frame cache enabled, repeated loads return read-only views of
+        the cached frame.
 
+        compact_dtypes: return columns stored in a compact encoding as float32
+            instead of the canonical float64.
+        """
+        start, end = _to_timestamp(start_date), _to_timestamp(end_date)
+        if self.cache is None:
+            return self._load(symbol, timeframe, start, end, columns, compact_dtypes)
+
+        key = (symbol, timeframe, start, end, None if columns is None else tuple(columns), compact_dtypes)
+        version = self._version(symbol, timeframe)
+        df = self.cache.get(key, version)
+        if df is None:
+            df = self._load(symbol, timeframe, start, end, columns, compact_dtypes)
+            if df is not None:
+                df = self.cache.put(key, df, version)
         return df
 
+    def _read_table(self, symbol: str, timeframe: str, start, end, columns,
+                    compact_dtypes: bool = False) -> pa.Table | None:
+        with self._locked(symbol, timeframe, exclusive=False):
+            paths = self._partitions(symbol, timeframe, start, end)
+            if not paths:
+                return None
+            return self._read_paths(paths, start, end, columns, compact_dtypes)
+
+    def _read_paths(self, paths: list[str], start, end, columns, compact_dtypes: bool = False) -> pa.Table:
+        read_cols = None if columns is None else [c for c in columns if c != _INDEX_COL] + [_INDEX_COL]
+
+        if self.backend == "arrow":
+            tables = [_slice_range(_map_ipc(path), start, end) for path in paths]
+            if read_cols is not None:
+                tables = [t.select(read_cols) for t in tables]
+            return pa.concat_tables(tables)
+
+        filters = []
+        if start is not None:
+            filters.append((_INDEX_COL, ">=", start))
+        if end is not None:
+            filters.append((_INDEX_COL, "<=", end))
+        # Read file by file: partitions written with different profiles/encodings have different schemas
+        return pa.concat_tables([
+            _decode(pq.read_table(path, columns=read_cols, filters=filters or None, partitioning=None), compact_dtypes)
+            for path in paths
+        ], promote_options="permissive")
+
+    def _load(self, symbol: str, timeframe: str, start, end, columns, compact_dtypes: bool = False):
+        table = self._read_table(symbol, timeframe, start, end, columns, compact_dtypes)
+        if table is None:
+            return None
+        df = table.to_pandas(split_blocks=self.backend == "arrow")
+        if _INDEX_COL in df.columns:
+            df = df.set_index(_INDEX_COL)
+        return df
+
+    def load_arrays(self, symbol: str, timeframe: str, start_date: str = None, end_date: str = None,
+                    columns: list[str] | None = None, compact_dtypes: bool = False) -> dict | None:
+        """Columns (plus "timestamp") within [start_date, end_date] as read-only NumPy arrays.
+
+        With the arrow backend, a range inside one partition comes back as views
+        of the memory-mapped file without any copy; ranges spanning several
+        partitions are concatenated.
+        """
+        table = self._read_table(symbol, timeframe, _to_timestamp(start_date), _to_timestamp(end_date), columns,
+                                 compact_dtypes)
+        if table is None:
+            return None
+        arrays = {}
+        for name, col in zip(table.column_names, table.columns):
+            arrays[name] = col.chunk(0).to_numpy() if col.num_chunks == 1 else col.to_numpy()
+            arrays[name].flags.writeable = False
+        return arrays
+
     def append(self, df: pd.DataFrame, symbol: str, timeframe: str,
-               start_date: str = None, end_date: str = None) -> str:
+               start_date: str = None, end_date: str = None, covered=None) -> str:
+        """Merge `df` into the dataset, rewriting only the month partitions it touches (new rows win).
+
+        covered: (start, end) ranges of open times that `df` is the complete answer
+            for, e.g. the downloaded windows. Recorded in the manifest even when
+            `df` is empty, so ranges with no candles are not downloaded again.
+            Without it only the contiguous runs of bars in `df` count as covered.
+        """
+        df = self._normalize(df)
+        with self._locked(symbol, timeframe, exclusive=True):
+            written = {}
+            for year, month, part in self._by_month(df):
+                path = self._partition_path(symbol, timeframe, year, month)
+                if os.path.exists(path):
+                    combined = pd.concat([self._read_partition(path), part])
+                    part = combined[~combined.index.duplicated(keep='last')]
+                self._write_partition(part, path)
+                written[path] = part
+            self._update_manifest(symbol, timeframe, written, self._covered(df, timeframe, covered))
+        return self._dataset_dir(symbol, timeframe)
+
+    def iter_chunks(self, symbol: str, timeframe: str, chunk_rows: int = 100_000,
+                    start=None, end=None):
+        """Stream the (symbol, timeframe) dataset in time order, chunk_rows rows at a time.
+
+        start/end: optional timestamps bounding the rows returned (inclusive).
+        Only one parquet batch (or slice of the mapped arrow file) is decoded at a time.
+        """
+        start, end = _to_timestamp(start), _to_timestamp(end)
 
-        existing = self.load(symbol, timeframe, start_date, end_date)
+        # Open every partition under the shared lock; the open handles/maps keep
+        # this snapshot readable even if a writer replaces the files meanwhile.
+        with self._locked(symbol, timeframe, exclusive=False):
+            paths = self._partitions(symbol, timeframe, start, end)
+            if self.backend == "arrow":
+                sources = [_slice_range(_map_ipc(path), start, end) for path in paths]
+            else:
+                sources = [pq.ParquetFile(path) for path in paths]
 
-        if existing is None:
-            return self.save(df, symbol, timeframe, start_date, end_date)
+        for source in sources:
+            if self.backend == "arrow":
+                for offset in range(0, source.num_rows, chunk_rows):
+                    df = source.slice(offset, chunk_rows).to_pandas()
+                    if _INDEX_COL in df.columns:
+                        df = df.set_index(_INDEX_COL)
+                    yield df
+                continue
 
-        combined = pd.concat([existing, df])
-        combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+            row_groups = self._row_groups_in_range(source, start, end)
+            if not row_groups:
+                continue
+            for batch in source.iter_batches(batch_size=chunk_rows, row_groups=row_groups):
+                df = _decode(pa.Table.from_batches([batch], source.schema_arrow)).to_pandas()
+                if not isinstance(df.index, pd.DatetimeIndex):
+                    df.index = pd.to_datetime(df.index)
+                if end is not None and len(df) and df.index[0] > end:
+                    return
+                df = _filter_range(df, start, end)
+                if len(df):
+                    yield df
 
-        return self.save(combined, symbol, timeframe, start_date, end_date)
+    def import_legacy_files(self) -> list[str]:
+        """Merge single-file caches written before the partitioned layout into their datasets.
+
+        Returns the imported file paths; the old files are left in place.
+        """
+        imported = []
+        for path in sorted(glob.glob(os.path.join(self.base_path, "*.parquet"))):
+            m = _LEGACY_FILE.match(os.path.basename(path))
+            if not m or "_from_" in path:
+                continue
+            self.append(self._read_partition(path), m.group("sym"), m.group("tf"))
+            imported.append(path)
+        return imported
+
+    # -------------------------------------------------------------
+    # Manifest
+    # -------------------------------------------------------------
+    def _manifest_path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self._dataset_dir(symbol, timeframe), _MANIFEST_FILE)
+
+    @staticmethod
+    def _covered(df: pd.DataFrame, timeframe: str, covered) -> list:
+        """Intervals a write makes known: the runs of bars in `df` plus the explicit `covered` ranges."""
+        intervals = _runs(df.index.as_unit("ms").asi8, _bar_ms(timeframe)) if len(df) else []
+        for lo, hi in covered or ():
+            intervals.append([_ms(_to_timestamp(lo)), _ms(_to_timestamp(hi))])
+        return intervals
+
+    @staticmethod
+    def _partition_key(path: str) -> str:
+        month_dir = os.path.dirname(path)
+        return f"{os.path.basename(os.path.dirname(month_dir))[5:]}-{os.path.basename(month_dir)[6:]}"
+
+    def _write_manifest(self, symbol: str, timeframe: str, manifest: dict):
+        path = self._manifest_path(symbol, timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = _tmp_path(path)
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, path)
+
+    def _update_manifest(self, symbol: str, timeframe: str, written: dict, covered: list):
+        """Fold freshly written partitions into the manifest; caller holds the exclusive lock."""
+        manifest = self._read_manifest(symbol, timeframe) or self._build_manifest(symbol, timeframe) or {
+            "symbol": symbol, "timeframe": timeframe, "partitions": {}, "intervals": [], "schema": {},
+        }
+        for path, part in written.items():
+            manifest["partitions"][self._partition_key(path)] = {
+                "rows": len(part),
+                "min_ts": _ms(part.index.min()),
+                "max_ts": _ms(part.index.max()),
+                "hash": _file_hash(path),
+            }
+            manifest["schema"] = {col: str(dtype) for col, dtype in part.dtypes.items()}
+        manifest["intervals"] = _merge_intervals(manifest["intervals"] + covered, _bar_ms(timeframe))
+        self._finish_manifest(manifest)
+        self._write_manifest(symbol, timeframe, manifest)
+        if self.cache is not None:
+            self.cache.invalidate((symbol, timeframe))
+
+    def _version(self, symbol: str, timeframe: str):
+        """Changes whenever the dataset is rewritten, by this or any other process."""
+        try:
+            return os.stat(self._manifest_path(symbol, timeframe)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def cache_stats(self) -> dict | None:
+        """Hit/miss/eviction counters of the frame cache, or None if it is disabled."""
+        return None if self.cache is None else self.cache.stats()
+
+    @staticmethod
+    def _finish_manifest(manifest: dict):
+        parts = [manifest["partitions"][k] for k in sorted(manifest["partitions"])]
+        manifest["rows"] = sum(p["rows"] for p in parts)
+        manifest["min_ts"] = min((p["min_ts"] for p in parts), default=None)
+        manifest["max_ts"] = max((p["max_ts"] for p in parts), default=None)
+        manifest["content_hash"] = hashlib.blake2b(
+            "".join(p["hash"] for p in parts).encode(), digest_size=16).hexdigest()
+        manifest["last_write"] = time.time()
+
+    def _read_manifest(self, symbol: str, timeframe: str):
+        try:
+            with open(self._manifest_path(symbol, timeframe)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _rebuild_manifest(self, symbol: str, timeframe: str):
+        """Build the manifest of a dataset written without one; its covered intervals are the runs of cached bars."""
+        with self._locked(symbol, timeframe, exclusive=True):
+            manifest = self._read_manifest(symbol, timeframe)      # another writer may have got here first
+            return manifest if manifest is not None else self._build_manifest(symbol, timeframe)
+
+    def _build_manifest(self, symbol: str, timeframe: str):
+        paths = self._partitions(symbol, timeframe)
+        if not paths:
+            return None
+        manifest = {"symbol": symbol, "timeframe": timeframe, "partitions": {}, "intervals": [], "schema": {}}
+        bar_ms = _bar_ms(timeframe)
+        for path in paths:
+            part = self._read_partition(path)
+            open_ms = part.index.as_unit("ms").asi8
+            manifest["partitions"][self._partition_key(path)] = {
+                "rows": len(part), "min_ts": int(open_ms.min()), "max_ts": int(open_ms.max()), "hash": _file_hash(path),
+            }
+            manifest["schema"] = {col: str(dtype) for col, dtype in part.dtypes.items()}
+            manifest["intervals"] += _runs(open_ms, bar_ms)
+        manifest["intervals"] = _merge_intervals(manifest["intervals"], bar_ms)
+        self._finish_manifest(manifest)
+        self._write_manifest(symbol, timeframe, manifest)
+        return manifest
+
+    def manifest(self, symbol: str, timeframe: str):
+        """The dataset's manifest dict, or None if nothing is cached. Timestamps are epoch milliseconds."""
+        manifest = self._read_manifest(symbol, timeframe)
+        if manifest is None and os.path.isdir(self._dataset_dir(symbol, timeframe)):
+            manifest = self._rebuild_manifest(symbol, timeframe)
+        return manifest
+
+    def coverage(self, symbol: str, timeframe: str) -> list:
+        """Merged [first_open_ms, last_open_ms] intervals for which every bar the exchange has is cached."""
+        manifest = self.manifest(symbol, timeframe)
+        return manifest["intervals"] if manifest else []
+
+    # -------------------------------------------------------------
+    # Derived timeframes (resampled from a finer base dataset)
+    # -------------------------------------------------------------
+    def _derived_path(self, symbol: str, timeframe: str, base_timeframe: str) -> str:
+        return os.path.join(self.base_path, symbol.replace("/", "_"), "_derived",
+                            f"{timeframe}_from_{base_timeframe}.parquet")
+
+    def _signature(self, symbol: str, timeframe: str):
+        """Identity of the (symbol, timeframe) dataset's current contents, from its manifest."""
+        manifest = self.manifest(symbol, timeframe)
+        return manifest["content_hash"] if manifest else None
+
+    def save_derived(self, df: pd.DataFrame, symbol: str, timeframe: str, base_timeframe: str,
+                     lineage: dict | None = None) -> str:
+        """Cache a frame resampled from the base dataset, recording which base contents it came from.
+
+        lineage: extra JSON-serializable facts about the base, returned with the frame in `df.attrs["lineage"]` by load_derived.
+        """
+        path = self._derived_path(symbol, timeframe, base_timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = _tmp_path(path)
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+        record = dict(lineage or {}, base_timeframe=base_timeframe, base=self._signature(symbol, base_timeframe))
+        tmp = _tmp_path(path + ".lineage.json")
+        with open(tmp, "w") as f:
+            json.dump(record, f)
+        os.replace(tmp, path + ".lineage.json")
+        return path
+
+    def load_derived(self, symbol: str, timeframe: str, base_timeframe: str):
+        """Return the cached derived frame, or None if missing or the base has changed since it was built.
+
+        Any append to the base dataset changes its signature and so invalidates
+        every frame derived from it.
+        """
+        path = self._derived_path(symbol, timeframe, base_timeframe)
+        try:
+            with open(path + ".lineage.json") as f:
+                lineage = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if lineage.get("base") != self._signature(symbol, base_timeframe):
+            return None
+        df = pd.read_parquet(path)
+        df.attrs["lineage"] = lineage
+        return df
+
+    # -------------------------------------------------------------
+    # Ticks (written by TickStore's compactor)
+    # -------------------------------------------------------------
+    def save_ticks(self, df: pd.DataFrame, symbol: str, part: str):
+        """Write tick rows as `part-<part>.parquet` in their per-day partitions, replacing a same-named part."""
+        df = self._normalize(df)
+        dataset_dir = self._dataset_dir(symbol, "tick")
+        days = df.index.as_unit("us").asi8 // 86_400_000_000
+        with self._locked(symbol, "tick", exclusive=True):
+            for day in np.unique(days):
+                date = pd.Timestamp(int(day) * 86_400, unit="s").strftime("%Y-%m-%d")
+                path = os.path.join(dataset_dir, f"date={date}", f"part-{part}.parquet")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = _tmp_path(path)
+                df[days == day].sort_index(kind="stable").to_parquet(tmp, row_group_size=100_000)
+                os.replace(tmp, path)
+
+    def load_ticks(self, symbol: str, start_date: str = None, end_date: str = None,
+                   columns: list[str] | None = None):
+        """Ticks of `symbol` within [start_date, end_date] in time order, or None if none are stored."""
+        start, end = _to_timestamp(start_date), _to_timestamp(end_date)
+        lo = start.strftime("%Y-%m-%d") if start is not None else ""
+        hi = end.strftime("%Y-%m-%d") if end is not None else "9999"
+        with self._locked(symbol, "tick", exclusive=False):
+            paths = [p for p in sorted(glob.glob(os.path.join(self._dataset_dir(symbol, "tick"), "date=*", "part-*.parquet")))
+                     if lo <= os.path.basename(os.path.dirname(p))[5:] <= hi]
+            if not paths:
+                return None
+            filters = []
+            if start is not None:
+                filters.append((_INDEX_COL, ">=", start))
+            if end is not None:
+                filters.append((_INDEX_COL, "<=", end))
+            read_cols = None if columns is None else [c for c in columns if c != _INDEX_COL] + [_INDEX_COL]
+            table = pq.read_table(paths, columns=read_cols, filters=filters or None, partitioning=None)
+        df = table.to_pandas()
+        if _INDEX_COL in df.columns:
+            df = df.set_index(_INDEX_COL)
+        # Parts from different log segments can interleave within a day
+        return df.sort_index(kind="stable")
+
+    # -------------------------------------------------------------
+    # Freshness
+    # -------------------------------------------------------------
+    def first_timestamp(self, symbol: str, timeframe: str):
+        """Earliest timestamp of the (symbol, timeframe) dataset, from the manifest."""
+        manifest = self.manifest(symbol, timeframe)
+        if not manifest or manifest["min_ts"] is None:
+            return None
+        return pd.to_datetime(manifest["min_ts"], unit="ms", utc=True)
 
     def last_timestamp(self, symbol: str, timeframe: str,
                        start_date: str = None, end_date: str = None):
-        df = self.load(symbol, timeframe, start_date, end_date)
-        if df is None or df.empty:
-            return None
-        return df.index.max()
+        """Latest cached timestamp, from the manifest; within [start_date, end_date] only the last partition is read."""
+        if start_date is None and end_date is None:
+            manifest = self.manifest(symbol, timeframe)
+            if not manifest or manifest["max_ts"] is None:
+                return None
+            return pd.to_datetime(manifest["max_ts"], unit="ms", utc=True)
+
+        start, end = _to_timestamp(start_date), _to_timestamp(end_date)
+        with self._locked(symbol, timeframe, exclusive=False):
+            for path in reversed(self._partitions(symbol, timeframe, start, end)):
+                df = _filter_range(self._read_partition(path), start, end)
+                if not df.empty:
+                    return df.index.max()
+        return None
 
     def is_stale(self, symbol: str, timeframe: str, max_age_seconds: int,
                  start_date: str = None, end_date: str = None) -> bool:
@@ -0,0 +1,105 @@
+# markets/common/frame_cache.py
+"""In-process LRU cache of decoded DataFrames, bounded by a byte budget.
+
+Frames are handed out as read-only views, as utils.indicator_cache does: the
+cached column arrays are made read-only and every caller gets a shallow copy
+over them. In-place writes then raise (or copy first, under pandas
+copy-on-write) instead of changing the cached frame. Frames with columns that
+are not plain NumPy arrays are returned as is and not cached.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def _freeze(df: pd.DataFrame) -> pd.DataFrame | None:
+    """`df` over read-only views of its column arrays, or None if a column is not a numeric NumPy array."""
+    if not df.columns.is_unique:
+        return None
+    columns = {}
+    for name in df.columns:
+        if not isinstance(df[name].dtype, np.dtype) or df[name].dtype.hasobject:
+            return None
+        values = df[name].to_numpy().view()
+        values.flags.writeable = False
+        columns[name] = values
+    return pd.DataFrame(columns, index=df.index, columns=df.columns, copy=False)
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class FrameCache:
+    def __init__(self, max_bytes: int):
+        """max_bytes: total decoded size the cache may hold; the least recently used frames are evicted first."""
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()     # key -> (frame, nbytes, version)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version=None):
+        """Cached frame for `key`, or None. An entry stored under a different `version` counts as a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] != version:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0].copy(deep=False)
+
+    def put(self, key, df: pd.DataFrame, version=None) -> pd.DataFrame:
+        """Cache `df` under `key` and return a view of it. Frames larger than the whole budget are not kept."""
+        nbytes = frame_nbytes(df)
+        if nbytes > self.max_bytes:
+            return df
+        stored = _freeze(df)
+        if stored is None:
+            return df
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (stored, nbytes, version)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            return stored.copy(deep=False)
+
+    def _drop(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    def invalidate(self, prefix: tuple):
+        """Drop every entry whose key starts with `prefix`."""
+        n = len(prefix)
+        with self._lock:
+            for key in [k for k in self._entries if k[:n] == prefix]:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,248 @@
+# markets/common/request_scheduler.py
+"""Client-side rate limiting for exchange REST APIs.
+
+A RequestScheduler keeps a token bucket sized to the exchange's request-weight
+budget. Every call reserves its endpoint weight before it is sent. Reservations
+are first come, first served, so concurrent callers queue instead of bursting.
+The bucket is resynced from the used-weight headers the exchange returns, and
+429/418 responses pause every caller for the Retry-After period (or a jittered
+exponential backoff) before retrying.
+
+Schedulers are meant to be shared by every fetcher hitting the same API from
+one process; `get_scheduler(name)` returns a process-wide instance per name.
+"""
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+# Binance spot: 6000 request weight per minute per IP
+_BINANCE_WEIGHT_LIMIT = 6000
+_BINANCE_ENDPOINT_WEIGHTS = {"/api/v3/klines": 2}
+
+_RETRY_STATUSES = {429, 418, 500, 502, 503, 504}
+
+
+class RequestScheduler:
+    def __init__(self,
+                 weight_limit: int = _BINANCE_WEIGHT_LIMIT,
+                 interval_seconds: float = 60.0,
+                 safety: float = 0.9,
+                 endpoint_weights: dict | None = None,
+                 default_weight: int = 1,
+                 used_weight_header: str = "X-MBX-USED-WEIGHT-1M",
+                 max_retries: int = 5,
+                 backoff_base: float = 0.5,
+                 backoff_cap: float = 60.0):
+        """
+        weight_limit: exchange weight budget per `interval_seconds`.
+        safety: fraction of the budget this process allows itself.
+        endpoint_weights: URL path -> request weight; others cost `default_weight`.
+        used_weight_header: response header reporting weight used in the window.
+        """
+        self.capacity = weight_limit * safety
+        self.interval_seconds = interval_seconds
+        self.rate = self.capacity / interval_seconds
+        self.endpoint_weights = dict(_BINANCE_ENDPOINT_WEIGHTS if endpoint_weights is None else endpoint_weights)
+        self.default_weight = default_weight
+        self.used_weight_header = used_weight_header
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+        self._requests = 0
+        self._retries = 0
+        self._throttled = 0
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._total_wait = 0.0
+        self._used_weight = None
+
+    # -------------------------------------------------------------
+    # Token bucket
+    # -------------------------------------------------------------
+    def weight_for(self, url: str) -> int:
+        return self.endpoint_weights.get(urlparse(url).path, self.default_weight)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self, weight: int) -> float:
+        """Take `weight` tokens now and return how long the caller must wait before sending."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= weight
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            delay = max(delay, self._blocked_until - now)
+            if delay > 0:
+                self._queue_depth += 1
+                self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+            return delay
+
+    def _release_wait(self, delay: float):
+        with self._lock:
+            self._queue_depth -= 1
+            self._total_wait += delay
+
+    def acquire(self, weight: int = 1):
+        """Block until a request of `weight` may be sent."""
+        delay = self._reserve(weight)
+        if delay > 0:
+            time.sleep(delay)
+            self._release_wait(delay)
+
+    async def acquire_async(self, weight: int = 1):
+        """asyncio counterpart of acquire(); shares the same bucket."""
+        delay = self._reserve(weight)
+        if delay > 0:
+            await asyncio.sleep(delay)
+            self._release_wait(delay)
+
+    # -------------------------------------------------------------
+    # Feedback from the exchange
+    # -------------------------------------------------------------
+    def update_from_headers(self, headers):
+        used = headers.get(self.used_weight_header)
+        if used is None:
+            return
+        used = int(used)
+        with self._lock:
+            self._used_weight = used
+            self._refill(time.monotonic())
+            # Other processes on the same IP count too: never assume more headroom than the exchange reports
+            self._tokens = min(self._tokens, self.capacity - used)
+
+    def backoff_delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """Full-jitter exponential backoff, never shorter than a Retry-After header."""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+
+    def block_for(self, seconds: float):
+        """Hold back every caller of this scheduler for `seconds`."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    # -------------------------------------------------------------
+    # Requests
+    # -------------------------------------------------------------
+    def request(self, session, method: str, url: str, weight: int | None = None, **kwargs):
+        """Send `method url` through `session` within the rate limit, retrying throttled and 5xx responses.
+
+        The last response is returned as-is once retries are exhausted, so callers
+        keep using `raise_for_status()`.
+        """
+        weight = self.weight_for(url) if weight is None else weight
+
+        for attempt in range(self.max_retries + 1):
+            self.acquire(weight)
+            with self._lock:
+                self._requests += 1
+                if attempt:
+                    self._retries += 1
+
+            try:
+                resp = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff_delay(attempt))
+                continue
+
+            self.update_from_headers(resp.headers)
+            if resp.status_code not in _RETRY_STATUSES or attempt == self.max_retries:
+                return resp
+
+            delay = self.backoff_delay(attempt, resp.headers.get("Retry-After"))
+            if resp.status_code in (429, 418):
+                # Rate limited (418 = IP banned): everyone sharing the budget backs off
+                with self._lock:
+                    self._throttled += 1
+                self.block_for(delay)
+            else:
+                time.sleep(delay)
+
+        return resp
+
+    def get(self, session, url: str, weight: int | None = None, **kwargs):
+        return self.request(session, "GET", url, weight=weight, **kwargs)
+
+    async def arequest(self, session, method: str, url: str, weight: int | None = None, **kwargs):
+        """request() for an aiohttp.ClientSession. The body is read before returning."""
+        import aiohttp
+
+        weight = self.weight_for(url) if weight is None else weight
+
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(weight)
+            with self._lock:
+                self._requests += 1
+                if attempt:
+                    self._retries += 1
+
+            try:
+                async with session.request(method, url, **kwargs) as resp:
+                    await resp.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self.backoff_delay(attempt))
+                continue
+
+            self.update_from_headers(resp.headers)
+            if resp.status not in _RETRY_STATUSES or attempt == self.max_retries:
+                return resp
+
+            delay = self.backoff_delay(attempt, resp.headers.get("Retry-After"))
+            if resp.status in (429, 418):
+                with self._lock:
+                    self._throttled += 1
+                self.block_for(delay)
+            else:
+                await asyncio.sleep(delay)
+
+        return resp
+
+    async def aget(self, session, url: str, weight: int | None = None, **kwargs):
+        return await self.arequest(session, "GET", url, weight=weight, **kwargs)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "requests": self._requests,
+                "retries": self._retries,
+                "throttled": self._throttled,
+                "queue_depth": self._queue_depth,
+                "max_queue_depth": self._max_queue_depth,
+                "total_wait_seconds": self._total_wait,
+                "available_weight": self._tokens,
+                "used_weight": self._used_weight,
+            }
+
+
+_SCHEDULERS: dict[str, RequestScheduler] = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def get_scheduler(name: str, **kwargs) -> RequestScheduler:
+    """Process-wide scheduler per API name; kwargs only apply when it is first created."""
+    name = name.lower()
+    with _SCHEDULERS_LOCK:
+        if name not in _SCHEDULERS:
+            _SCHEDULERS[name] = RequestScheduler(**kwargs)
+        return _SCHEDULERS[name]
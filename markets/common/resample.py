@@ -0,0 +1,58 @@
+# markets/common/resample.py
+"""Build higher-timeframe OHLCV bars from a finer cached base.
+
+Bars follow Binance's alignment: every interval opens on a multiple of its
+length counted from the Unix epoch in UTC (4h bars open at 00/04/08.. UTC, 1d
+bars at 00:00 UTC), and a bar is labelled by its open time.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+_UNIT_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000}
+
+
+def timeframe_ms(timeframe: str) -> int:
+    """'15m' -> 900000, '4h' -> 14400000, '1d' -> 86400000."""
+    m = re.fullmatch(r"(\d+)([mhd])", timeframe)
+    if not m:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(m.group(1)) * _UNIT_MS[m.group(2)]
+
+
+def can_derive(timeframe: str, base_timeframe: str) -> bool:
+    """True if `timeframe` bars are whole multiples of `base_timeframe` bars."""
+    tf, base = timeframe_ms(timeframe), timeframe_ms(base_timeframe)
+    return tf > base and tf % base == 0
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str, base_timeframe: str) -> pd.DataFrame:
+    """Aggregate a time-sorted base OHLCV frame into `timeframe` bars.
+
+    A leading bar whose base candles start after its open time is dropped,
+    since the exchange's bar would include candles that are not in `df`.
+    """
+    if not can_derive(timeframe, base_timeframe):
+        raise ValueError(f"Cannot derive {timeframe} bars from {base_timeframe}")
+    if df.empty:
+        return df.copy()
+
+    tf_ms = timeframe_ms(timeframe)
+    open_ms = df.index.as_unit("ms").asi8
+    bucket = open_ms - open_ms % tf_ms
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(bucket)]
+
+    out = pd.DataFrame({
+        "open": df["open"].to_numpy()[starts],
+        "high": np.maximum.reduceat(df["high"].to_numpy(), starts),
+        "low": np.minimum.reduceat(df["low"].to_numpy(), starts),
+        "close": df["close"].to_numpy()[ends - 1],
+        "volume": np.add.reduceat(df["volume"].to_numpy(), starts),
+    }, index=pd.DatetimeIndex(pd.to_datetime(bucket[starts], unit="ms", utc=True), name=df.index.name))
+
+    if open_ms[0] != bucket[0]:
+        out = out.iloc[1:]
+    return out
@@ -0,0 +1,366 @@
+# markets/common/tick_store.py
+"""Durable capture of live ticks.
+
+record() writes a tick into an in-memory columnar ring buffer. A flusher
+thread appends the pending ticks to an append-only binary log and fsyncs it in
+batches (every `fsync_interval` seconds), so a crash loses at most that much.
+Log segments are sealed once they reach `segment_bytes`, and a compactor
+thread rolls sealed segments into per-day parquet partitions that
+DataStore.load_ticks() reads:
+
+    <base_path>/<instrument>/tick/date=YYYY-MM-DD/part-<segment>.parquet
+
+Log segments (<base_path>/_ticklog/ticks-<segment>.log) are a sequence of
+frames `[u32 payload length][u8 kind][payload]`:
+    kind 1: instrument definition, i32 id + utf-8 name
+    kind 2: tick batch, packed _TICK_DTYPE records
+Every segment starts with the full instrument table, so each one can be
+compacted on its own. A frame cut short by a crash is ignored.
+
+Several TickStores (threads or processes) may share a base path. Each writer
+holds an exclusive flock on its active segment, taken before the segment's
+name appears in the log directory, and segment numbers are claimed with an
+exclusive link, so writers never share a file. compact() only takes segments
+whose lock it can acquire: sealed ones, and those left behind by a crashed
+writer. Without flock (Windows) a store only compacts segments it sealed.
+"""
+import contextlib
+import glob
+import os
+import re
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:     # Windows: no flock; each store only compacts its own sealed segments
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from markets.common.data_store import DataStore
+
+_TICK_DTYPE = np.dtype([("ts", "<i8"), ("price", "<f8"), ("size", "<f8"), ("instrument", "<i4"), ("side", "i1")])
+_FRAME_HEADER = struct.Struct("<IB")
+_FRAME_INSTRUMENT = 1
+_FRAME_TICKS = 2
+_SEGMENT = re.compile(r"ticks-(\d+)\.log$")
+
+
+def read_segment(path: str):
+    """Instrument names by id and the tick records of one log segment."""
+    with open(path, "rb") as f:
+        return _parse_segment(f.read())
+
+
+def _parse_segment(data: bytes):
+    names = {}
+    batches = []
+    pos = 0
+    while pos + _FRAME_HEADER.size <= len(data):
+        length, kind = _FRAME_HEADER.unpack_from(data, pos)
+        start = pos + _FRAME_HEADER.size
+        if start + length > len(data):
+            break                            # torn final frame
+        if kind == _FRAME_INSTRUMENT:
+            names[struct.unpack_from("<i", data, start)[0]] = data[start + 4:start + length].decode()
+        elif kind == _FRAME_TICKS:
+            batches.append(np.frombuffer(data, _TICK_DTYPE, length // _TICK_DTYPE.itemsize, start))
+        pos = start + length
+    records = np.concatenate(batches) if batches else np.empty(0, _TICK_DTYPE)
+    return names, records
+
+
+class TickStore:
+    def __init__(self, base_path: str = "data/parquet", capacity: int = 1 << 20,
+                 flush_interval: float = 0.2, fsync_interval: float = 1.0,
+                 segment_bytes: int = 64 << 20, compact_interval: float = 60.0, start: bool = True):
+        """
+        capacity: ticks held in the ring buffer; record() flushes inline if the log falls this far behind.
+        flush_interval / fsync_interval: how often pending ticks are written / fsynced.
+        segment_bytes: log segment size at which it is sealed and handed to the compactor.
+        start: run the flusher and compactor threads (otherwise call flush()/sync()/compact()).
+        """
+        self.base_path = base_path
+        self.store = DataStore(base_path)
+        self.log_dir = os.path.join(base_path, "_ticklog")
+        os.makedirs(self.log_dir, exist_ok=True)
+
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.segment_bytes = segment_bytes
+        self.compact_interval = compact_interval
+
+        # Columnar ring buffer; slot = tick number % capacity
+        self._ts = np.empty(capacity, np.int64)
+        self._price = np.empty(capacity, np.float64)
+        self._size = np.empty(capacity, np.float64)
+        self._instrument = np.empty(capacity, np.int32)
+        self._side = np.empty(capacity, np.int8)
+        self._head = 0           # ticks recorded
+        self._flushed = 0        # ticks handed to the log
+        self._ids = {}
+        self._names = []
+        self._logged_names = 0
+
+        self._lock = threading.Lock()        # ring buffer
+        self._io_lock = threading.Lock()     # log file; taken before _lock
+        self._seq = 0
+        self._sealed = set()                 # segments this store sealed (compacted without flock)
+        self._log = None
+        self._log_bytes = 0
+        self._dirty = False
+        self._last_fsync = time.monotonic()
+        self._open_segment()
+
+        self.fsyncs = 0
+        self.compacted_segments = 0
+
+        self._stop = threading.Event()
+        self._threads = []
+        if start:
+            for target in (self._flush_loop, self._compact_loop):
+                t = threading.Thread(target=target, daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    # -------------------------------------------------------------
+    # Recording
+    # -------------------------------------------------------------
+    def _instrument_id(self, instrument: str) -> int:
+        iid = self._ids.get(instrument)
+        if iid is None:
+            iid = self._ids[instrument] = len(self._names)
+            self._names.append(instrument)
+        return iid
+
+    def record(self, ts_us: int, instrument: str, price: float, size: float = 0.0, side: int = 0):
+        """Record one tick. ts_us: exchange timestamp in microseconds since the epoch (UTC)."""
+        while True:
+            with self._lock:
+                n = self._head
+                if n - self._flushed < self.capacity:
+                    i = n % self.capacity
+                    self._ts[i] = ts_us
+                    self._price[i] = price
+                    self._size[i] = size
+                    self._instrument[i] = self._instrument_id(instrument)
+                    self._side[i] = side
+                    self._head = n + 1
+                    return
+            self.flush()         # ring full: the log has fallen a whole buffer behind
+
+    def record_many(self, ts_us, instrument: str, price, size=None, side=None):
+        """Record a batch of ticks of one instrument from array-likes."""
+        ts_us = np.asarray(ts_us, np.int64)
+        count = len(ts_us)
+        columns = (ts_us, np.asarray(price, np.float64),
+                   np.zeros(count) if size is None else np.asarray(size, np.float64),
+                   np.zeros(count, np.int8) if side is None else np.asarray(side, np.int8))
+        done = 0
+        while done < count:
+            with self._lock:
+                room = self.capacity - (self._head - self._flushed)
+                take = min(room, count - done, self.capacity - self._head % self.capacity)
+                if take > 0:
+                    i = self._head % self.capacity
+                    for ring, values in zip((self._ts, self._price, self._size, self._side), columns):
+                        ring[i:i + take] = values[done:done + take]
+                    self._instrument[i:i + take] = self._instrument_id(instrument)
+                    self._head += take
+                    done += take
+                    continue
+            self.flush()
+
+    def recent(self, n: int | None = None) -> pd.DataFrame:
+        """Up to the last `n` ticks still held in the ring buffer (all of them by default)."""
+        with self._lock:
+            held = min(self._head, self.capacity)
+            n = held if n is None else min(n, held)
+            idx = np.arange(self._head - n, self._head) % self.capacity
+            names = np.array(self._names, dtype=object)
+            return pd.DataFrame({
+                "instrument": names[self._instrument[idx]] if n else np.empty(0, object),
+                "price": self._price[idx],
+                "size": self._size[idx],
+                "side": self._side[idx],
+            }, index=pd.DatetimeIndex(pd.to_datetime(self._ts[idx], unit="us", utc=True), name="timestamp"))
+
+    # -------------------------------------------------------------
+    # Log
+    # -------------------------------------------------------------
+    def _segments(self) -> list[int]:
+        return [int(m.group(1)) for m in map(_SEGMENT.search, glob.glob(os.path.join(self.log_dir, "ticks-*.log")))
+                if m]
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.log_dir, f"ticks-{seq:08d}.log")
+
+    def _write_frame(self, kind: int, payload: bytes):
+        self._log.write(_FRAME_HEADER.pack(len(payload), kind))
+        self._log.write(payload)
+        self._log_bytes += _FRAME_HEADER.size + len(payload)
+        self._dirty = True
+
+    def _open_segment(self):
+        """Start a new segment under a fresh number, locked before its name is visible to compactors."""
+        tmp = os.path.join(self.log_dir, f".ticks-{os.getpid()}-{id(self)}.tmp")
+        log = open(tmp, "wb")
+        if fcntl is not None:
+            fcntl.flock(log, fcntl.LOCK_EX)
+        while True:
+            seq = max(self._segments(), default=0) + 1
+            try:
+                os.link(tmp, self._segment_path(seq))     # fails if another writer claimed the number
+                break
+            except FileExistsError:
+                continue
+        os.remove(tmp)
+        self._seq = seq
+        self._log = log
+        self._log_bytes = 0
+        for iid, name in enumerate(self._names[:self._logged_names]):
+            self._write_frame(_FRAME_INSTRUMENT, struct.pack("<i", iid) + name.encode())
+
+    def _take_pending(self):
+        """Copy the unflushed ticks (and new instrument names) out of the ring; caller holds _lock."""
+        names = list(enumerate(self._names))[self._logged_names:]
+        self._logged_names = len(self._names)
+        start, stop = self._flushed, self._head
+        if stop == start:
+            return names, None
+        idx = np.arange(start, stop) % self.capacity
+        records = np.empty(stop - start, _TICK_DTYPE)
+        records["ts"] = self._ts[idx]
+        records["price"] = self._price[idx]
+        records["size"] = self._size[idx]
+        records["instrument"] = self._instrument[idx]
+        records["side"] = self._side[idx]
+        self._flushed = stop
+        return names, records
+
+    def flush(self) -> int:
+        """Append pending ticks to the log (no fsync); returns how many were written."""
+        with self._io_lock:
+            with self._lock:
+                names, records = self._take_pending()
+            for iid, name in names:
+                self._write_frame(_FRAME_INSTRUMENT, struct.pack("<i", iid) + name.encode())
+            if records is not None:
+                self._write_frame(_FRAME_TICKS, records.tobytes())
+            if self._log_bytes >= self.segment_bytes:
+                self._roll()
+            return 0 if records is None else len(records)
+
+    def sync(self):
+        """Flush and fsync, making every tick recorded so far durable."""
+        self.flush()
+        with self._io_lock:
+            self._fsync()
+
+    def _fsync(self):
+        if self._dirty:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._dirty = False
+            self.fsyncs += 1
+        self._last_fsync = time.monotonic()
+
+    def _roll(self):
+        """Seal the current segment and start the next one; caller holds _io_lock."""
+        self._fsync()
+        self._log.close()
+        self._sealed.add(self._seq)
+        self._open_segment()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+            if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                with self._io_lock:
+                    self._fsync()
+
+    # -------------------------------------------------------------
+    # Compaction
+    # -------------------------------------------------------------
+    def compact(self) -> int:
+        """Roll every sealed log segment into per-day parquet partitions; returns rows compacted."""
+        with self._io_lock:
+            current = self._seq
+        rows = 0
+        for seq in sorted(self._segments()):
+            if seq == current or (fcntl is None and seq not in self._sealed):
+                continue
+            path = self._segment_path(seq)
+            with self._claim(path) as f:
+                if f is None:
+                    continue                 # another writer's active segment, or compacted meanwhile
+                rows += self._compact_segment(f, seq, path)
+        return rows
+
+    @contextlib.contextmanager
+    def _claim(self, path: str):
+        """The segment file opened under an exclusive lock, or None if it is live elsewhere or gone."""
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            yield None
+            return
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield None
+                    return
+                if os.fstat(f.fileno()).st_nlink == 0:
+                    yield None               # removed by the compactor that held the lock before us
+                    return
+            yield f
+        finally:
+            f.close()
+
+    def _compact_segment(self, f, seq: int, path: str) -> int:
+        names, records = _parse_segment(f.read())
+        records = records[np.argsort(records["instrument"], kind="stable")]
+        iids, starts = np.unique(records["instrument"], return_index=True)
+        for iid, ticks in zip(iids, np.split(records, starts[1:])):
+            df = pd.DataFrame({
+                "price": ticks["price"], "size": ticks["size"], "side": ticks["side"],
+            }, index=pd.DatetimeIndex(pd.to_datetime(ticks["ts"], unit="us", utc=True), name="timestamp"))
+            # Partition name = segment number, so re-compacting after a crash overwrites, never duplicates
+            self.store.save_ticks(df, names[int(iid)], f"{seq:08d}")
+        os.remove(path)
+        self._sealed.discard(seq)
+        self.compacted_segments += 1
+        return len(records)
+
+    def _compact_loop(self):
+        while not self._stop.wait(self.compact_interval):
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"❌ Tick compaction failed: {e}")
+
+    def close(self):
+        """Stop the background threads, make everything durable and compact it."""
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+        self.flush()
+        with self._io_lock:
+            self._roll()
+        self.compact()
+        with self._io_lock:
+            # Everything is compacted; the fresh segment only holds the instrument table
+            os.remove(self._segment_path(self._seq))     # before close() releases its lock
+            self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,10 +1,29 @@
+import asyncio
+import threading
 import requests
 import pandas as pd
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+
+from core.data_interface import DataInterface, MultiFetchResult, rechunk
+from markets.common.request_scheduler import get_scheduler
+from markets.common.resample import can_derive, resample_ohlcv
+from markets.crypto.data.binance_stream import BinanceStream
+from markets.crypto.data.kline_parser import KlineBuffer
 
 _KLINES_ENDPOINT = "https://api.binance.com/api/v3/klines"
+_STREAM_ENDPOINT = "wss://stream.binance.com:9443/stream"
 _TF_MAP = {"1m": "1m", "5m": "5m", "15m": "15m", "30m": "30m", "1h": "1h", "4h": "4h", "1d": "1d"}
 
+# Candle length per interval, used to compute page boundaries up front
+_TF_MS = {"1m": 60_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+          "1h": 3_600_000, "4h": 14_400_000, "1d": 86_400_000}
+
+_FETCH_LIMIT = 1000
+_BINANCE_LAUNCH_MS = 1502942400000
+
 def _to_ms(date_str):
     """Convert dd-mm-yyyy → milliseconds."""
     dt = datetime.strptime(date_str, "%d-%m-%Y")
@@ -13,97 +32,433 @@ def _to_ms(date_str):
 def _today_ms():
     return int(datetime.utcnow().timestamp() * 1000)
 
+def _page_shards(start_ms, end_ms, tf_ms, limit=_FETCH_LIMIT):
+    """Split [start_ms, end_ms] into shards holding at most `limit` candles each.
 
-class BinanceData:
-    def __init__(self, session=None, data_store=None):
-        self.session = session or requests.Session()
-        self.data_store = data_store
+    Binance aligns candle open times to multiples of the interval, so the first
+    shard starts at the first aligned open time >= start_ms and every shard spans
+    exactly `limit` candle slots. Shards never overlap.
+    """
+    first_open = -(-start_ms // tf_ms) * tf_ms
+    span = tf_ms * limit
 
-    def _fetch_from_api(self, symbol, timeframe="1m", start_date=None, end_date=None):
-        tf = _TF_MAP.get(timeframe, "1m")
+    shards = []
+    shard_start = first_open
+    while shard_start <= end_ms:
+        shards.append((shard_start, min(shard_start + span - 1, end_ms)))
+        shard_start += span
+    return shards
 
-        # Convert dates to ms
-        start_ms = _to_ms(start_date) if start_date else 1502942400000   # Binance launch
-        end_ms = _to_ms(end_date) if end_date else _today_ms()
+def _uncovered_ranges(intervals, start_ms, end_ms, tf_ms):
+    """Sub-ranges of [start_ms, end_ms] outside the covered [lo, hi] intervals that can hold a candle.
 
-        print(f"Fetching {symbol} {tf} from {start_date} to {end_date or 'today'}")
+    intervals: sorted, merged open-time intervals known to be complete (DataStore.coverage).
+    """
+    gaps = []
+    cursor = start_ms
+    for lo, hi in intervals:
+        if hi < cursor:
+            continue
+        if lo > end_ms:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo - 1))
+        cursor = hi + 1
+    if cursor <= end_ms:
+        gaps.append((cursor, end_ms))
+    # Drop slivers no candle opens in
+    return [(a, b) for a, b in gaps if -(-a // tf_ms) * tf_ms <= b]
 
-        all_rows = []
-        fetch_limit = 1000
+
+class BinanceData(DataInterface):
+    def __init__(self, session=None, data_store=None, max_workers=1, klines_url=_KLINES_ENDPOINT,
+                 incremental=False, scheduler=None, derive_from=None, stream_url=_STREAM_ENDPOINT):
+        """
+        max_workers: number of concurrent page requests. 1 keeps the serial
+            pagination; >1 downloads page-aligned shards on a thread pool that
+            shares `session`.
+        klines_url: klines endpoint, overridable to point at a local stub server.
+        incremental: only download the sub-ranges of a request that the data
+            store does not cover yet, instead of the whole range.
+        scheduler: RequestScheduler throttling REST calls; defaults to the
+            process-wide "binance" scheduler shared by all fetchers.
+        derive_from: base timeframe (e.g. "1m"). Coarser timeframes are built
+            by resampling the cached base dataset when it covers the request,
+            instead of being downloaded.
+        stream_url: combined websocket stream endpoint used by subscribe_ticks.
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.incremental = incremental
+        self.derive_from = derive_from
+        self.stream_url = stream_url
+        self.klines_url = klines_url
+        if session is None:
+            session = requests.Session()
+            # requests keeps 10 pooled connections per host by default
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(10, self.max_workers))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self.data_store = data_store
+        self.scheduler = scheduler or get_scheduler("binance")
+
+    def _fetch_page(self, symbol, tf, start_ms, end_ms, limit=_FETCH_LIMIT):
+        params = {
+            "symbol": symbol.upper(),
+            "interval": tf,
+            "limit": limit,
+            "startTime": start_ms,
+            "endTime": end_ms
+        }
+
+        resp = self.scheduler.get(self.session, self.klines_url, params=params, timeout=10)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _iter_pages_serial(self, symbol, tf, start_ms, end_ms):
         current_start = start_ms
 
         while True:
             print(f"Fetching data starting from {pd.to_datetime(current_start, unit='ms', utc=True)}")
-            params = {
-                "symbol": symbol.upper(),
-                "interval": tf,
-                "limit": fetch_limit,
-                "startTime": current_start,
-                "endTime": end_ms
-            }
-
-            resp = self.session.get(_KLINES_ENDPOINT, params=params, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
+            data = self._fetch_page(symbol, tf, current_start, end_ms)
 
             if not data:
                 break
 
-            # Parse candles
-            for r in data:
-                all_rows.append({
-                    "timestamp": pd.to_datetime(r[0], unit="ms", utc=True),
-                    "open": float(r[1]),
-                    "high": float(r[2]),
-                    "low": float(r[3]),
-                    "close": float(r[4]),
-                    "volume": float(r[5])
-                })
-
-            if len(data) < fetch_limit:
+            yield data
+
+            if len(data) < _FETCH_LIMIT:
                 break
 
             # Pagination using last open time
             last_open_time = data[-1][0]
             current_start = last_open_time + 1  # move forward
 
-        df = pd.DataFrame(all_rows).set_index("timestamp")
+    def _iter_pages_parallel(self, symbol, tf, start_ms, end_ms):
+        shards = _page_shards(start_ms, end_ms, _TF_MS[tf])
+        print(f"Fetching {len(shards)} shards with {self.max_workers} workers")
+
+        # A sliding window of 2 * max_workers requests: the next shard is only submitted once the oldest
+        # page has been yielded, so at most that many raw pages are in flight or buffered at a time.
+        # Pages are yielded in shard order regardless of completion order.
+        window = 2 * self.max_workers
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            try:
+                for shard_start, shard_end in shards:
+                    if len(pending) >= window:
+                        yield pending.popleft().result()
+                    pending.append(pool.submit(self._fetch_page, symbol, tf, shard_start, shard_end))
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:       # consumer stopped early: drop requests not started yet
+                    future.cancel()
+
+    def _iter_pages(self, symbol, tf, start_ms, end_ms):
+        if self.max_workers > 1:
+            return self._iter_pages_parallel(symbol, tf, start_ms, end_ms)
+        return self._iter_pages_serial(symbol, tf, start_ms, end_ms)
+
+    def _fetch_range(self, symbol, tf, start_ms, end_ms):
+        # Pages are parsed into typed columns as they arrive
+        buf = KlineBuffer()
+        for data in self._iter_pages(symbol, tf, start_ms, end_ms):
+            buf.append_page(data)
 
-        # ✅ Filter final DF inside range
-        df = df[(df.index >= pd.to_datetime(start_ms, unit="ms", utc=True)) &
-                (df.index <= pd.to_datetime(end_ms, unit="ms", utc=True))]
+        # ✅ De-duplicate and filter final DF inside range
+        return buf.to_frame(start_ms, end_ms)
+
+    def _fetch_from_api(self, symbol, timeframe="1m", start_date=None, end_date=None):
+        tf = _TF_MAP.get(timeframe, "1m")
+
+        # Convert dates to ms
+        start_ms = _to_ms(start_date) if start_date else _BINANCE_LAUNCH_MS
+        end_ms = _to_ms(end_date) if end_date else _today_ms()
+
+        print(f"Fetching {symbol} {tf} from {start_date} to {end_date or 'today'}")
+
+        df = self._fetch_range(symbol, tf, start_ms, end_ms)
 
         print(f"✅ Total rows fetched: {len(df)}")
 
         return df
 
+    def _plan_fetch(self, symbol, timeframe, start_date, end_date, max_cache_age_seconds):
+        """Load the cached part of a request and work out which sub-ranges still need downloading.
+
+        Returns (tf, start_ms, end_ms, cached, gaps). Gaps come from the store's
+        coverage manifest, so ranges already downloaded (even ones the exchange
+        has no candles for) are not requested again. Incremental mode downloads
+        only the gaps; otherwise any gap means the whole range is re-downloaded,
+        except for an open-ended request on a cached dataset, which downloads
+        one range from its first gap (usually just the stale tail) to now.
+        """
+        tf = _TF_MAP.get(timeframe, "1m")
+        tf_ms = _TF_MS[tf]
+
+        start_ms = _to_ms(start_date) if start_date else _BINANCE_LAUNCH_MS
+        end_ms = _to_ms(end_date) if end_date else _today_ms()
+
+        manifest = self.data_store.manifest(symbol, timeframe)
+        if manifest is None or manifest["max_ts"] is None:
+            gaps = [(start_ms, end_ms)]
+        elif end_date is not None:
+            gaps = _uncovered_ranges(manifest["intervals"], start_ms, end_ms, tf_ms)
+        else:
+            # An open-ended request only refreshes the tail once the cache is older than allowed.
+            # The tail starts at the last cached candle so one that was still open gets refreshed.
+            last_ms = manifest["max_ts"]
+            gaps = _uncovered_ranges(manifest["intervals"], start_ms, min(last_ms, end_ms), tf_ms)
+            if last_ms + tf_ms <= end_ms and self.data_store.is_stale(symbol, timeframe, max_cache_age_seconds):
+                gaps.append((max(last_ms, start_ms), end_ms))
+        if gaps and not self.incremental:
+            open_ended = end_date is None and manifest is not None and manifest["max_ts"] is not None
+            gaps = [(gaps[0][0] if open_ended else start_ms, end_ms)]
+
+        cached = self.data_store.load(symbol, timeframe,
+                                      pd.to_datetime(start_ms, unit="ms", utc=True),
+                                      pd.to_datetime(end_ms, unit="ms", utc=True))
+        if cached is None:
+            cached = pd.DataFrame(columns=["open", "high", "low", "close", "volume"],
+                                  index=pd.DatetimeIndex([], tz="UTC", name="timestamp"), dtype=float)
+        return tf, start_ms, end_ms, cached, gaps
+
+    @staticmethod
+    def _closed_range(gap_start, gap_end, tf_ms, now_ms):
+        """The part of a downloaded gap whose candles had all closed by `now_ms`, as covered by the download."""
+        hi = min(gap_end, now_ms // tf_ms * tf_ms - 1)
+        return [(pd.to_datetime(gap_start, unit="ms", utc=True), pd.to_datetime(hi, unit="ms", utc=True))] \
+            if hi >= gap_start else []
+
+    @staticmethod
+    def _merge(cached, parts, start_ms, end_ms):
+        parts = [p for p in parts if len(p)]
+        if parts:
+            combined = pd.concat(([cached] if len(cached) else []) + parts)
+            cached = combined[~combined.index.duplicated(keep="last")].sort_index()
+
+        lo = pd.to_datetime(start_ms, unit="ms", utc=True)
+        hi = pd.to_datetime(end_ms, unit="ms", utc=True)
+        return cached[(cached.index >= lo) & (cached.index <= hi)]
+
+    def _fetch_cached(self, symbol, timeframe, start_date, end_date, max_cache_age_seconds):
+        tf, start_ms, end_ms, cached, gaps = self._plan_fetch(
+            symbol, timeframe, start_date, end_date, max_cache_age_seconds)
+
+        parts = []
+        for gap_start, gap_end in gaps:
+            print(f"Filling {symbol} {tf} gap {pd.to_datetime(gap_start, unit='ms', utc=True)}"
+                  f" → {pd.to_datetime(gap_end, unit='ms', utc=True)}")
+            now_ms = _today_ms()
+            part = self._fetch_range(symbol, tf, gap_start, gap_end)
+            # Recorded even when empty, so ranges the exchange has no candles for are not re-requested
+            self.data_store.append(part, symbol, timeframe,
+                                   covered=self._closed_range(gap_start, gap_end, _TF_MS[tf], now_ms))
+            parts.append(part)
+
+        return self._merge(cached, parts, start_ms, end_ms)
+
+    def _fetch_derived(self, symbol, timeframe, start_date, end_date):
+        """Serve `timeframe` by resampling the cached `derive_from` dataset, or None if it does not cover the request."""
+        base = self.derive_from
+        if timeframe not in _TF_MS or not can_derive(timeframe, base):
+            return None
+        tf_ms, base_ms = _TF_MS[timeframe], _TF_MS[base]
+
+        spans = self.data_store.coverage(symbol, base)
+        if not spans:
+            return None
+        end_ms = _to_ms(end_date) if end_date else _today_ms()
+        # Every base candle of every derived bar in the range must be cached (up to the current candle)
+        need_lo = _to_ms(start_date) // tf_ms * tf_ms if start_date else spans[0][0]
+        need_hi = min(end_ms // tf_ms * tf_ms + tf_ms - base_ms, _today_ms() // base_ms * base_ms)
+        if not any(lo <= need_lo and hi >= need_hi for lo, hi in spans):
+            return None
+
+        derived = self.data_store.load_derived(symbol, timeframe, base)
+        if derived is None:
+            base_df = self.data_store.load(symbol, base)
+            if base_df is None or base_df.empty:
+                return None
+            derived = resample_ohlcv(base_df, timeframe, base)
+            self.data_store.save_derived(derived, symbol, timeframe, base)
+
+        print(f"Serving {symbol} {timeframe} from cached {base} data")
+        lo = pd.to_datetime(_to_ms(start_date) if start_date else need_lo, unit="ms", utc=True)
+        hi = pd.to_datetime(end_ms, unit="ms", utc=True)
+        return derived[(derived.index >= lo) & (derived.index <= hi)]
+
     def fetch_ohlcv(self, symbol, timeframe="1m", start_date=None, end_date=None, max_cache_age_seconds=3600):
-        if self.data_store:
-            try:
-                cached = self.data_store.load(symbol, timeframe, start_date, end_date)
-                if cached is not None:
-                    # Return only within requested date range
-                    if start_date:
-                        start_ts = _to_ms(start_date)
-                        cached = cached[cached.index >= pd.to_datetime(start_ts, unit="ms", utc=True)]
-                    if end_date:
-                        end_ts = _to_ms(end_date)
-                        cached = cached[cached.index <= pd.to_datetime(end_ts, unit="ms", utc=True)]
-                    return cached
-            except Exception:
-                pass
-
-        # Fetch fresh
-        df = self._fetch_from_api(symbol, timeframe, start_date, end_date)
+        if self.data_store and self.derive_from:
+            derived = self._fetch_derived(symbol, timeframe, start_date, end_date)
+            if derived is not None:
+                return derived
 
         if self.data_store:
-            print("Saving fetched data to data store...")
-            try:
-                self.data_store.append(df, symbol, timeframe,start_date, end_date)
-            except Exception:
-                pass
+            return self._fetch_cached(symbol, timeframe, start_date, end_date, max_cache_age_seconds)
 
-        return df
+        return self._fetch_from_api(symbol, timeframe, start_date, end_date)
+
+    def _iter_range(self, symbol, tf, start_ms, end_ms, chunk_rows):
+        """Download [start_ms, end_ms] page by page, yielding frames of about chunk_rows rows."""
+        buf = KlineBuffer(capacity=chunk_rows + _FETCH_LIMIT)
+        for data in self._iter_pages(symbol, tf, start_ms, end_ms):
+            buf.append_page(data)
+            if len(buf) >= chunk_rows:
+                yield buf.to_frame(start_ms, end_ms)
+                buf.clear()
+        if len(buf):
+            yield buf.to_frame(start_ms, end_ms)
+
+    def _iter_network(self, symbol, timeframe, tf, start_ms, end_ms, chunk_rows):
+        for frame in self._iter_range(symbol, tf, start_ms, end_ms, chunk_rows):
+            if self.data_store and not frame.empty:
+                # Persist as chunks arrive so the full history never has to be held
+                self.data_store.append(frame, symbol, timeframe)
+            yield frame
+
+    def fetch_ohlcv_iter(self, symbol, timeframe="1m", start_date=None, end_date=None, chunk_rows=100_000):
+        """Yield time-ordered OHLCV chunks of at most chunk_rows rows with bounded memory.
+
+        Uses the (symbol, timeframe) dataset of the data store first and the
+        network for whatever lies before or after it; downloaded chunks are
+        appended to the store as they arrive. Holes inside the cached span are
+        not filled here (use incremental fetch_ohlcv for that).
+        """
+        tf = _TF_MAP.get(timeframe, "1m")
+        tf_ms = _TF_MS[tf]
+
+        start_ms = _to_ms(start_date) if start_date else _BINANCE_LAUNCH_MS
+        end_ms = _to_ms(end_date) if end_date else _today_ms()
+
+        def sources():
+            cursor = start_ms
+            first = self.data_store.first_timestamp(symbol, timeframe) if self.data_store else None
+            if first is not None:
+                first_ms = first.value // 1_000_000
+                last_ms = self.data_store.last_timestamp(symbol, timeframe).value // 1_000_000
+
+                if first_ms > cursor:
+                    yield from self._iter_network(symbol, timeframe, tf, cursor, min(first_ms - 1, end_ms), chunk_rows)
+                yield from self.data_store.iter_chunks(
+                    symbol, timeframe, chunk_rows,
+                    pd.to_datetime(max(cursor, first_ms), unit="ms", utc=True),
+                    pd.to_datetime(end_ms, unit="ms", utc=True),
+                )
+                cursor = max(cursor, last_ms + tf_ms)
+
+            if cursor <= end_ms:
+                yield from self._iter_network(symbol, timeframe, tf, cursor, end_ms, chunk_rows)
+
+        yield from rechunk(sources(), chunk_rows)
+
+    async def _afetch_page(self, http, symbol, tf, start_ms, end_ms, limit=_FETCH_LIMIT):
+        params = {
+            "symbol": symbol.upper(),
+            "interval": tf,
+            "limit": limit,
+            "startTime": start_ms,
+            "endTime": end_ms
+        }
+
+        resp = await self.scheduler.aget(http, self.klines_url, params=params)
+        resp.raise_for_status()
+        return await resp.json()
+
+    async def _afetch_range(self, http, symbol, tf, start_ms, end_ms, buf):
+        current_start = start_ms
+        while True:
+            data = await self._afetch_page(http, symbol, tf, current_start, end_ms)
+            if not data:
+                break
+            buf.append_page(data)
+            if len(data) < _FETCH_LIMIT:
+                break
+            current_start = data[-1][0] + 1
+
+    async def _afetch_symbol(self, http, symbol, timeframe, start_date, end_date, max_cache_age_seconds):
+        if not self.data_store:
+            tf = _TF_MAP.get(timeframe, "1m")
+            start_ms = _to_ms(start_date) if start_date else _BINANCE_LAUNCH_MS
+            end_ms = _to_ms(end_date) if end_date else _today_ms()
+            buf = KlineBuffer()
+            await self._afetch_range(http, symbol, tf, start_ms, end_ms, buf)
+            return buf.to_frame(start_ms, end_ms)
+
+        tf, start_ms, end_ms, cached, gaps = await asyncio.to_thread(
+            self._plan_fetch, symbol, timeframe, start_date, end_date, max_cache_age_seconds)
+        if not gaps:
+            return self._merge(cached, [], start_ms, end_ms)
+
+        buf = KlineBuffer()
+        covered = []
+        for gap_start, gap_end in gaps:
+            now_ms = _today_ms()
+            await self._afetch_range(http, symbol, tf, gap_start, gap_end, buf)
+            covered += self._closed_range(gap_start, gap_end, _TF_MS[tf], now_ms)
+        df = buf.to_frame(start_ms, end_ms)
+
+        await asyncio.to_thread(self.data_store.append, df, symbol, timeframe, covered=covered)
+        return self._merge(cached, [df], start_ms, end_ms)
+
+    async def afetch_ohlcv_many(self, symbols, timeframe="1m", start_date=None, end_date=None,
+                                max_cache_age_seconds=3600, concurrency=16):
+        """Fetch many symbols concurrently on one aiohttp session.
+
+        Every request goes through the shared rate-limit scheduler, so
+        `concurrency` only bounds how many symbols are in flight. Cache use is the
+        same as fetch_ohlcv; each result is written to the data store as soon as
+        its symbol completes, and failures are collected per symbol without
+        cancelling the rest.
+        """
+        import aiohttp
+
+        result = MultiFetchResult()
+        sem = asyncio.Semaphore(concurrency)
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=10)
+
+        async with aiohttp.ClientSession(timeout=timeout) as http:
+            async def run(symbol):
+                async with sem:
+                    try:
+                        result.frames[symbol] = await self._afetch_symbol(
+                            http, symbol, timeframe, start_date, end_date, max_cache_age_seconds)
+                    except Exception as e:
+                        print(f"❌ {symbol}: {e}")
+                        result.errors[symbol] = e
+
+            await asyncio.gather(*(run(s) for s in symbols))
+
+        # Keep the caller's symbol order
+        result.frames = {s: result.frames[s] for s in symbols if s in result.frames}
+        return result
+
+    def fetch_ohlcv_many(self, symbols, timeframe="1m", start_date=None, end_date=None,
+                         max_cache_age_seconds=3600, concurrency=16):
+        """Blocking wrapper around afetch_ohlcv_many; inside a running event loop, await that instead."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("fetch_ohlcv_many() cannot run inside an event loop; "
+                               "use `await afetch_ohlcv_many(...)` instead")
+        return asyncio.run(self.afetch_ohlcv_many(symbols, timeframe, start_date, end_date,
+                                                  max_cache_age_seconds, concurrency))
+
+    def subscribe_ticks(self, symbols, callback, channels=("kline_1m",), blocking=True, **stream_kwargs):
+        """Stream live klines/trades for `symbols` over one websocket connection.
+
+        callback receives lists of KlineTick/TradeTick. With blocking=True this
+        runs until the stream is stopped; otherwise the stream runs on a daemon
+        thread and is returned so the caller can stop() it and read stats().
+        """
+        stream = BinanceStream(symbols, callback, channels, url=self.stream_url, **stream_kwargs)
+        if blocking:
+            asyncio.run(stream.run())
+            return stream
 
-    def subscribe_ticks(self, symbols, callback):
-        raise NotImplementedError("subscribe_ticks not implemented yet.")
+        stream.thread = threading.Thread(target=asyncio.run, args=(stream.run(),), daemon=True)
+        stream.thread.start()
+        return stream
@@ -0,0 +1,176 @@
+# markets/crypto/data/binance_stream.py
+"""Live Binance kline/trade stream over one combined websocket connection.
+
+All symbols are subscribed on a single connection to the combined-stream
+endpoint with SUBSCRIBE requests; the subscription is replayed after every
+reconnect. Messages are parsed into compact tuples and handed to the callback
+in batches (on `batch_size` ticks or every `flush_interval` seconds).
+"""
+import asyncio
+import collections
+import json
+import time
+from typing import NamedTuple
+
+_STREAM_URL = "wss://stream.binance.com:9443/stream"
+_SUBSCRIBE_CHUNK = 200      # stream names per SUBSCRIBE request
+
+
+class KlineTick(NamedTuple):
+    symbol: str
+    open_time: int          # ms
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    closed: bool
+    event_time: int         # ms
+
+
+class TradeTick(NamedTuple):
+    symbol: str
+    trade_time: int         # ms
+    price: float
+    qty: float
+    buyer_is_maker: bool
+    event_time: int         # ms
+
+
+def parse_message(raw):
+    """Parse one combined-stream message into a KlineTick/TradeTick, or None for anything else."""
+    msg = json.loads(raw)
+    data = msg.get("data")
+    if data is None:
+        return None                          # subscription acks: {"result": null, "id": 1}
+    event = data.get("e")
+    if event == "kline":
+        k = data["k"]
+        return KlineTick(data["s"], k["t"], float(k["o"]), float(k["h"]), float(k["l"]),
+                         float(k["c"]), float(k["v"]), k["x"], data["E"])
+    if event == "trade":
+        return TradeTick(data["s"], data["T"], float(data["p"]), float(data["q"]), data["m"], data["E"])
+    return None
+
+
+class BinanceStream:
+    def __init__(self, symbols, callback, channels=("kline_1m",), url=_STREAM_URL,
+                 batch_size=500, flush_interval=0.05, reconnect_delay=1.0, max_reconnect_delay=30.0):
+        """
+        callback: called with a list of KlineTick/TradeTick per batch.
+        channels: per-symbol streams, e.g. "kline_1m", "kline_5m", "trade".
+        """
+        self.streams = [f"{s.lower()}@{ch}" for s in symbols for ch in channels]
+        self.callback = callback
+        self.url = url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self._batch = []
+        self._stopping = False
+        self._ws = None
+        self._loop = None
+
+        self.messages = 0
+        self.batches = 0
+        self.reconnects = 0
+        self.callback_errors = 0
+        self._latency_ms = collections.deque(maxlen=100_000)
+
+    # -------------------------------------------------------------
+    # Delivery
+    # -------------------------------------------------------------
+    def _flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        now_ms = time.time() * 1000
+        self._latency_ms.extend(now_ms - t.event_time for t in batch)
+        self.batches += 1
+        try:
+            self.callback(batch)
+        except Exception as e:      # a failing callback must not end the flusher or the stream
+            self.callback_errors += 1
+            print(f"❌ Stream callback failed ({self.callback_errors} so far): {type(e).__name__}: {e}")
+
+    async def _flusher(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self._flush()
+
+    # -------------------------------------------------------------
+    # Connection
+    # -------------------------------------------------------------
+    async def _subscribe(self, ws):
+        for i in range(0, len(self.streams), _SUBSCRIBE_CHUNK):
+            await ws.send(json.dumps({
+                "method": "SUBSCRIBE",
+                "params": self.streams[i:i + _SUBSCRIBE_CHUNK],
+                "id": i // _SUBSCRIBE_CHUNK + 1,
+            }))
+
+    async def _consume(self, ws):
+        batch_size = self.batch_size
+        async for raw in ws:
+            tick = parse_message(raw)
+            if tick is None:
+                continue
+            self.messages += 1
+            self._batch.append(tick)
+            if len(self._batch) >= batch_size:
+                self._flush()
+
+    async def run(self):
+        """Stream until stop() is called, reconnecting with exponential backoff."""
+        from websockets.asyncio.client import connect
+        from websockets.exceptions import ConnectionClosed, InvalidHandshake, InvalidStatus
+
+        self._loop = asyncio.get_running_loop()
+        flusher = asyncio.create_task(self._flusher())
+        delay = self.reconnect_delay
+        try:
+            while not self._stopping:
+                try:
+                    async with connect(self.url, max_queue=None) as ws:
+                        self._ws = ws
+                        await self._subscribe(ws)
+                        delay = self.reconnect_delay
+                        await self._consume(ws)
+                # InvalidStatus: rejected handshake (e.g. HTTP 429/5xx while Binance is throttling or restarting)
+                except (ConnectionClosed, InvalidStatus, InvalidHandshake, OSError) as e:
+                    if self._stopping:
+                        break
+                    print(f"Stream disconnected ({e}); reconnecting in {delay:.1f}s")
+                finally:
+                    self._ws = None
+                    self._flush()
+
+                if self._stopping:
+                    break
+                self.reconnects += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            flusher.cancel()
+            self._flush()
+
+    def stop(self):
+        """Close the stream; safe to call from any thread."""
+        self._stopping = True
+        if self._ws is not None and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+
+    def stats(self) -> dict:
+        lat = sorted(self._latency_ms)
+        pct = (lambda q: lat[min(len(lat) - 1, int(q * len(lat)))]) if lat else (lambda q: None)
+        return {
+            "messages": self.messages,
+            "batches": self.batches,
+            "reconnects": self.reconnects,
+            "callback_errors": self.callback_errors,
+            "latency_ms_p50": pct(0.50),
+            "latency_ms_p99": pct(0.99),
+            "latency_ms_max": lat[-1] if lat else None,
+        }
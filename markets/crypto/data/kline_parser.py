@@ -0,0 +1,80 @@
+# markets/crypto/data/kline_parser.py
+"""Columnar parsing of Binance kline pages.
+
+Each JSON page (a list of 12-field kline rows) is converted straight into typed
+NumPy columns and appended to growable buffers, so no per-candle dict or
+Timestamp objects are created. The DataFrame is built once at the end with a
+single vectorized UTC conversion.
+"""
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+class KlineBuffer:
+    def __init__(self, capacity: int = 4096):
+        self._open_time = np.empty(capacity, dtype=np.int64)
+        self._ohlcv = np.empty((capacity, len(OHLCV_COLUMNS)), dtype=np.float64)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        capacity = len(self._open_time)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        open_time = np.empty(capacity, dtype=np.int64)
+        ohlcv = np.empty((capacity, len(OHLCV_COLUMNS)), dtype=np.float64)
+        open_time[:self._size] = self._open_time[:self._size]
+        ohlcv[:self._size] = self._ohlcv[:self._size]
+        self._open_time, self._ohlcv = open_time, ohlcv
+
+    def append_page(self, page) -> int:
+        """Append one klines response page. Returns the number of rows added."""
+        n = len(page)
+        if n == 0:
+            return 0
+        self._reserve(n)
+
+        # object view of the page: references only, no per-field copies
+        raw = np.array(page, dtype=object)
+        end = self._size + n
+        self._open_time[self._size:end] = raw[:, 0].astype(np.int64)
+        self._ohlcv[self._size:end] = raw[:, 1:6].astype(np.float64)
+        self._size = end
+        return n
+
+    def open_times(self) -> np.ndarray:
+        return self._open_time[:self._size]
+
+    def clear(self):
+        self._size = 0
+
+    def to_frame(self, start_ms: int | None = None, end_ms: int | None = None) -> pd.DataFrame:
+        """Build the OHLCV frame, dropping repeated open times and rows outside [start_ms, end_ms]."""
+        open_time = self._open_time[:self._size]
+        ohlcv = self._ohlcv[:self._size]
+
+        keep = np.ones(self._size, dtype=bool)
+        if self._size > 1:
+            # keep only rows strictly newer than everything before them
+            keep[1:] = open_time[1:] > np.maximum.accumulate(open_time)[:-1]
+        if start_ms is not None:
+            keep &= open_time >= start_ms
+        if end_ms is not None:
+            keep &= open_time <= end_ms
+
+        index = pd.DatetimeIndex(pd.to_datetime(open_time[keep], unit="ms", utc=True), name="timestamp")
+        return pd.DataFrame(ohlcv[keep], index=index, columns=OHLCV_COLUMNS)
+
+
+def parse_pages(pages, start_ms: int | None = None, end_ms: int | None = None) -> pd.DataFrame:
+    buf = KlineBuffer()
+    for page in pages:
+        buf.append_page(page)
+    return buf.to_frame(start_ms, end_ms)
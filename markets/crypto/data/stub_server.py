@@ -0,0 +1,244 @@
+# markets/crypto/data/stub_server.py
+"""Local stand-in for the Binance klines REST endpoint.
+
+Serves deterministic synthetic candles so the fetcher can be exercised and
+benchmarked offline:
+
+    with StubKlineServer(latency=0.05) as server:
+        fetcher = BinanceData(max_workers=8, klines_url=server.url)
+        df = fetcher.fetch_ohlcv("BTCUSDT", "1m", "01-01-2024", "01-02-2024")
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from markets.crypto.data.binance_data import _TF_MS
+
+
+def synthetic_kline(open_ms, tf_ms):
+    """Deterministic Binance-shaped kline row for a given open time."""
+    base = 100.0 + (open_ms // tf_ms) % 1000 * 0.01
+    return [
+        open_ms,
+        f"{base:.2f}", f"{base + 0.5:.2f}", f"{base - 0.5:.2f}", f"{base + 0.1:.2f}",
+        "10.00000000",
+        open_ms + tf_ms - 1,
+        "1000.0", 10, "5.0", "500.0", "0",
+    ]
+
+
+class StubKlineServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, listed_from_ms=0,
+                 weight_limit=None, request_weight=2, window_seconds=60.0, retry_after=1):
+        """
+        latency: seconds slept per request, to simulate network round-trips.
+        listed_from_ms: no candles are returned before this open time.
+        weight_limit: if set, request weight allowed per `window_seconds`;
+            requests over it get HTTP 429 with a Retry-After header.
+        """
+        self.latency = latency
+        self.listed_from_ms = listed_from_ms
+        self.weight_limit = weight_limit
+        self.request_weight = request_weight
+        self.window_seconds = window_seconds
+        self.retry_after = retry_after
+        self.request_count = 0
+        self.rejected_count = 0
+        self._window_start = time.monotonic()
+        self._used_weight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/v3/klines"
+
+    def klines(self, interval, start_ms, end_ms, limit):
+        tf_ms = _TF_MS[interval]
+        open_ms = max(start_ms, self.listed_from_ms)
+        open_ms = -(-open_ms // tf_ms) * tf_ms
+        rows = []
+        while open_ms <= end_ms and len(rows) < limit:
+            rows.append(synthetic_kline(open_ms, tf_ms))
+            open_ms += tf_ms
+        return rows
+
+    def _charge(self):
+        """Account one request against the weight window; returns (allowed, used_weight)."""
+        with self._lock:
+            self.request_count += 1
+            now = time.monotonic()
+            if now - self._window_start >= self.window_seconds:
+                self._window_start = now
+                self._used_weight = 0
+            self._used_weight += self.request_weight
+            allowed = self.weight_limit is None or self._used_weight <= self.weight_limit
+            if not allowed:
+                self.rejected_count += 1
+            return allowed, self._used_weight
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                allowed, used = server._charge()
+                weight_header = {"X-MBX-USED-WEIGHT-1M": used}
+                if not allowed:
+                    self._send(429, {"code": -1003, "msg": "Too many requests"},
+                               {**weight_header, "Retry-After": server.retry_after})
+                    return
+                if server.latency:
+                    time.sleep(server.latency)
+
+                q = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                rows = server.klines(
+                    q.get("interval", "1m"),
+                    int(q.get("startTime", 0)),
+                    int(q.get("endTime", int(time.time() * 1000))),
+                    int(q.get("limit", 500)),
+                )
+                self._send(200, rows, weight_header)
+
+            def _send(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, str(v))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubStreamServer:
+    """Local stand-in for the Binance combined websocket stream.
+
+    Accepts SUBSCRIBE requests and pushes synthetic kline/trade events for
+    the subscribed streams at `rate` messages per second per connection,
+    stamping each with the send time as the event time ("E") so receivers can
+    measure end-to-end latency. With drop_after=N the server closes each
+    connection after N messages, to exercise reconnects.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, rate=1000, drop_after=None):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.drop_after = drop_after
+        self.connections = 0
+        self.sent = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/stream"
+
+    @staticmethod
+    def _event(stream, seq, now_ms):
+        symbol, channel = stream.split("@")
+        price = f"{100 + seq % 1000 * 0.01:.2f}"
+        if channel == "trade":
+            data = {"e": "trade", "E": now_ms, "s": symbol.upper(), "t": seq, "p": price,
+                    "q": "0.010", "T": now_ms, "m": bool(seq & 1)}
+        else:
+            open_time = now_ms - now_ms % 60_000
+            data = {"e": "kline", "E": now_ms, "s": symbol.upper(),
+                    "k": {"t": open_time, "T": open_time + 59_999, "s": symbol.upper(), "i": channel[6:],
+                          "o": price, "h": price, "l": price, "c": price, "v": "1.0", "x": False}}
+        return json.dumps({"stream": stream, "data": data})
+
+    async def _handler(self, ws):
+        import asyncio
+
+        self.connections += 1
+        streams = []
+
+        async def reader():
+            async for raw in ws:
+                msg = json.loads(raw)
+                if msg.get("method") == "SUBSCRIBE":
+                    streams.extend(msg["params"])
+                    await ws.send(json.dumps({"result": None, "id": msg.get("id")}))
+
+        reader_task = asyncio.create_task(reader())
+        tick = 0.01
+        per_tick = max(1, int(self.rate * tick))
+        seq = 0
+        try:
+            while True:
+                started = time.monotonic()
+                if streams:
+                    now_ms = int(time.time() * 1000)
+                    for _ in range(per_tick):
+                        await ws.send(self._event(streams[seq % len(streams)], seq, now_ms))
+                        seq += 1
+                        self.sent += 1
+                        if self.drop_after and seq >= self.drop_after:
+                            await ws.close()
+                            return
+                await asyncio.sleep(max(0.0, tick - (time.monotonic() - started)))
+        except Exception:
+            pass
+        finally:
+            reader_task.cancel()
+
+    def _serve(self):
+        import asyncio
+        from websockets.asyncio.server import serve
+
+        async def main():
+            self._loop = asyncio.get_running_loop()
+            self._stop = self._loop.create_future()
+            async with serve(self._handler, self.host, self.port) as server:
+                self.port = server.sockets[0].getsockname()[1]
+                self._ready.set()
+                await self._stop
+
+        asyncio.run(main())
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._stop.set_result, None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
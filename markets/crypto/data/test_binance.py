@@ -1,12 +1,15 @@
 import requests
 import pandas as pd
-import time
+
+from markets.common.request_scheduler import get_scheduler
+from markets.crypto.data.kline_parser import KlineBuffer
 
 BASE_URL = "https://api.binance.com/api/v3/klines"
 
 class BinanceData:
     def __init__(self):
         self.session = requests.Session()
+        self.scheduler = get_scheduler("binance")
 
     def fetch_all_klines(self, symbol, interval, start_time=1502942400000):
         """
@@ -16,7 +19,7 @@ class BinanceData:
         print(f"Downloading {symbol} {interval} historical data...")
 
         limit = 1000
-        all_rows = []
+        buf = KlineBuffer()
 
         while True:
             print(f"Fetching data starting from {pd.to_datetime(start_time, unit='ms', utc=True)}")
@@ -27,7 +30,7 @@ class BinanceData:
                 "startTime": start_time
             }
 
-            r = self.session.get(BASE_URL, params=params)
+            r = self.scheduler.get(self.session, BASE_URL, params=params)
             r.raise_for_status()
             batch = r.json()
 
@@ -35,15 +38,7 @@ class BinanceData:
             if not batch:
                 break
 
-            for r in batch:
-                all_rows.append({
-                    "timestamp": pd.to_datetime(r[0], unit="ms", utc=True),
-                    "open": float(r[1]),
-                    "high": float(r[2]),
-                    "low": float(r[3]),
-                    "close": float(r[4]),
-                    "volume": float(r[5])
-                })
+            buf.append_page(batch)
 
             # Pagination: use last OPEN time
             last_open_time = batch[-1][0]
@@ -51,10 +46,7 @@ class BinanceData:
             # Move +1 ms forward
             start_time = last_open_time + 1
 
-            # Avoid hitting rate limit
-            time.sleep(0.1)
-
-        df = pd.DataFrame(all_rows).set_index("timestamp")
+        df = buf.to_frame()
         print(f"✅ Download complete: {len(df)} rows")
 
         return df
@@ -7,6 +7,8 @@ import os
 from dotenv import load_dotenv
 from datetime import datetime
 
+from markets.common.tick_store import TickStore
+
 # Load environment variables
 load_dotenv()
 
@@ -179,11 +181,18 @@ token_list = [
 correlation_id = "nifty_chain"
 mode = 1   # LTP mode
 
+# Every tick is kept under data/parquet/<token>/tick (see TickStore)
+tick_store = TickStore("data/parquet")
+
 
 ##############################################
 # STEP 6: CALLBACKS
 ##############################################
 def on_data(wsapp, message):
+    # SmartWebSocketV2 hands binary ticks over parsed: prices in paise, exchange_timestamp in ms
+    if isinstance(message, dict) and message.get("last_traded_price") is not None:
+        tick_store.record(int(message["exchange_timestamp"]) * 1000, str(message["token"]),
+                          message["last_traded_price"] / 100.0, float(message.get("last_traded_quantity") or 0))
     if isinstance(message, bytes):
         message = message.decode()
     # The real-time data comes in as a large JSON object or a series of updates.
@@ -241,4 +250,5 @@ except KeyboardInterrupt:
     print("Exiting application...")
     sws.close()
     thread.join()
+    tick_store.close()
     exit()
\ No newline at end of file
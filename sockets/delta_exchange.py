@@ -2,10 +2,15 @@ import websocket
 import json
 from datetime import datetime
 
+from markets.common.tick_store import TickStore
+
 
 # production websocket base url
 WEBSOCKET_URL = "wss://socket.india.delta.exchange"
 
+# Every update is kept under data/parquet/<symbol>/tick (see TickStore); set in __main__
+tick_store = None
+
 def on_error(ws, error):
     print(f"Socket Error: {error}")
 
@@ -45,6 +50,9 @@ def on_message(ws, message):
         ltp = data.get("close")
         iso_time = data.get("time")   # already human readable
 
+        if tick_store is not None and ltp is not None and data.get("timestamp"):
+            tick_store.record(int(data["timestamp"]), symbol, float(ltp))
+
         print(f"{symbol} | LTP: {ltp} | Time: {iso_time}")
     elif data.get("type") == "candlestick_1m":
         symbol = data["symbol"]
@@ -52,6 +60,8 @@ def on_message(ws, message):
 
         # convert microsecond timestamp to readable time
         ts_micro = data["timestamp"]
+        if tick_store is not None:
+            tick_store.record(int(ts_micro), symbol, float(ltp), float(data.get("volume") or 0.0))
         ts = datetime.fromtimestamp(ts_micro / 1e6)
         time_str = ts.strftime("%Y-%m-%d %H:%M:%S.%f")
 
@@ -59,6 +69,10 @@ def on_message(ws, message):
 
 
 if __name__ == "__main__":
+  tick_store = TickStore("data/parquet")
   ws = websocket.WebSocketApp(WEBSOCKET_URL, on_message=on_message, on_error=on_error, on_close=on_close)
   ws.on_open = on_open
-  ws.run_forever() # runs indefinitely
\ No newline at end of file
+  try:
+    ws.run_forever() # runs indefinitely
+  finally:
+    tick_store.close()
\ No newline at end of file
@@ -7,6 +7,8 @@ import os
 from dotenv import load_dotenv
 from datetime import datetime
 
+from markets.common.tick_store import TickStore
+
 # Load environment variables (NOTE: These must be configured in your local environment 
 # for the script to execute successfully, as the SDK requires them for connection.)
 load_dotenv()
@@ -195,6 +197,9 @@ token_list = [
 correlation_id = "nifty_chain"
 mode = 1   # LTP mode
 
+# Every tick is kept under data/parquet/<symbol>/tick (see TickStore)
+tick_store = TickStore("data/parquet")
+
 
 ##############################################
 # STEP 6: CALLBACKS and DISPLAY LOGIC
@@ -217,6 +222,7 @@ def on_data(wsapp, message):
                 # Update the global data store
                 OPTION_CHAIN_DATA[token]['ltp'] = ltp
                 OPTION_CHAIN_DATA[token]['timestamp'] = datetime.now()
+                tick_store.record(time.time_ns() // 1000, TOKEN_TO_INFO.get(token, {}).get('symbol', token), float(ltp))
         else:
             # Log non-tick data (like heartbeat, initial handshake, or error messages)
             logger.info(message)
@@ -333,4 +339,5 @@ except KeyboardInterrupt:
     print("Exiting application...")
     sws.close()
     thread.join()
+    tick_store.close()
     exit()
\ No newline at end of file
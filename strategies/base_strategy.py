@@ -1,3 +1,5 @@
+from strategies.signal_frame import SignalFrame
+
 
 class BaseStrategy:
     def __init__(self, data, config):
@@ -5,4 +7,29 @@ class BaseStrategy:
         self.config = config
 
     def generate_signals(self):
+        """Signals as a SignalFrame, or a list of {"timestamp", "symbol", "side", "qty"} dicts."""
+        raise NotImplementedError
+
+    def signal_frame(self, pos, side, qty=None) -> SignalFrame:
+        """SignalFrame over this strategy's bars; qty defaults to config["qty"]."""
+        if qty is None:
+            qty = getattr(self, "qty", self.config.get("qty", 0.01))
+        return SignalFrame(self.data.index, pos, side, qty, self.config.get("symbol", "BTCUSDT"))
+
+    # -------------------------------------------------------------
+    # Incremental API (live / streaming)
+    # -------------------------------------------------------------
+    def reset(self):
+        """Clear the state on_bar() keeps between bars."""
+
+    def on_bar(self, bar) -> list[dict]:
+        """
+        Feed one closed bar {"timestamp", "open", "high", "low", "close", "volume"} and return the signal
+        dicts it triggers. State is O(1) per bar; feeding self.data bar by bar yields the same signals as
+        generate_signals() (see strategies.replay).
+        """
         raise NotImplementedError
+
+    def _signal(self, ts, side: str) -> dict:
+        qty = getattr(self, "qty", self.config.get("qty", 0.01))
+        return {"timestamp": ts, "symbol": self.config.get("symbol", "BTCUSDT"), "side": side, "qty": float(qty)}
@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 from strategies.base_strategy import BaseStrategy
+from utils.indicators import EWMState, ewm_mean
 
 class EMACrossover(BaseStrategy):
     def __init__(self, data: pd.DataFrame, config: dict):
@@ -7,23 +9,37 @@ class EMACrossover(BaseStrategy):
         self.fast = config.get("fast_period", 9)
         self.slow = config.get("slow_period", 21)
         self.qty = config.get("qty", 0.01)
+        self.reset()
 
     def generate_signals(self):
-        df = self.data.copy()
-        df["ema_fast"] = df["close"].ewm(span=self.fast, adjust=False).mean()
-        df["ema_slow"] = df["close"].ewm(span=self.slow, adjust=False).mean()
-        df["signal"] = 0
-        df.loc[df["ema_fast"] > df["ema_slow"], "signal"] = 1
-        df.loc[df["ema_fast"] < df["ema_slow"], "signal"] = -1
+        close = self.data["close"]
+        ema_fast = ewm_mean(close, self.fast).to_numpy()
+        ema_slow = ewm_mean(close, self.slow).to_numpy()
+        signal = np.where(ema_fast > ema_slow, 1, np.where(ema_fast < ema_slow, -1, 0))
 
-        signals = []
-        last_signal = 0
-        for ts, row in df.iterrows():
-            if row["signal"] != last_signal:
-                last_signal = row["signal"]
-                if row["signal"] == 1:
-                    signals.append({"timestamp": ts, "symbol": self.config.get("symbol", "BTCUSDT"), "side": "buy", "qty": self.qty})
-                elif row["signal"] == -1:
-                    signals.append({"timestamp": ts, "symbol": self.config.get("symbol", "BTCUSDT"), "side": "sell", "qty": self.qty})
+        # A signal fires on every bar where the state changes to +1/-1 (starting from flat);
+        # changes back to 0 only reset the state.
+        prev = np.empty_like(signal)
+        prev[0:1] = 0
+        prev[1:] = signal[:-1]
+        idx = np.flatnonzero((signal != prev) & (signal != 0))
+
+        signals = self.signal_frame(idx, signal[idx])
         print("Total Generated Signals", len(signals))
         return signals
+
+    def reset(self):
+        self._ema_fast = EWMState(self.fast)
+        self._ema_slow = EWMState(self.slow)
+        self._last_signal = 0
+
+    def on_bar(self, bar):
+        ema_fast = self._ema_fast.update(bar["close"])
+        ema_slow = self._ema_slow.update(bar["close"])
+        signal = 1 if ema_fast > ema_slow else (-1 if ema_fast < ema_slow else 0)
+        if signal == self._last_signal:
+            return []
+        self._last_signal = signal
+        if signal == 0:
+            return []
+        return [self._signal(bar["timestamp"], "buy" if signal == 1 else "sell")]
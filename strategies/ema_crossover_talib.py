@@ -1,8 +1,9 @@
-
 # strategies/ema_crossover_talib.py
-import pandas as pd
-from utils.indicators import ema
+import numpy as np
+from utils.indicators import EMAState, ema
 from strategies.base_strategy import BaseStrategy
+from strategies.signal_frame import BUY
+from strategies.sltp_kernel import SLTPState, sltp_signals
 
 class EMACrossoverTALib(BaseStrategy):
     def __init__(self, data, config):
@@ -11,112 +12,40 @@ class EMACrossoverTALib(BaseStrategy):
         self.slow = config.get("slow", 21)
         self.qty = config.get("qty", 0.01)
         self.symbol = config.get("symbol", "BTCUSDT")
+        self.reset()
 
     def generate_signals(self):
-        df = self.data.copy()
-        df["EMA_FAST"] = ema(df["close"], self.fast)
-        df["EMA_SLOW"] = ema(df["close"], self.slow)
-
-        signals = []
-        position = 0                # +1 long, -1 short, 0 flat
-        entry_price = None
+        ema_fast = ema(self.data["close"], self.fast).to_numpy()
+        ema_slow = ema(self.data["close"], self.slow).to_numpy()
 
         SL = self.config.get("stop_loss", 0.1)        # 10% default
         TP = self.config.get("target_profit", 0.5)    # 50% default
 
-        for ts, row in df.iterrows():
-            if pd.isna(row["EMA_FAST"]) or pd.isna(row["EMA_SLOW"]):
-                continue
-
-            price = row["close"]
-            ema_fast = row["EMA_FAST"]
-            ema_slow = row["EMA_SLOW"]
-
-            # ----------------------------------------------------------
-            # 1. STOP LOSS / TAKE PROFIT
-            # ----------------------------------------------------------
-            if position == 1:   # long
-                if price <= entry_price * (1 - SL) or price >= entry_price * (1 + TP):
-                    # EXIT LONG
-                    signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "side": "sell",
-                        "qty": self.qty
-                    })
-                    position = 0
-                    entry_price = None
-                    continue     # do NOT flip immediately; wait for next EMA signal
-
-            elif position == -1:  # short
-                if price >= entry_price * (1 + SL) or price <= entry_price * (1 - TP):
-                    # EXIT SHORT
-                    signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "side": "buy",
-                        "qty": self.qty
-                    })
-                    position = 0
-                    entry_price = None
-                    continue
-
-            # ----------------------------------------------------------
-            # 2. BUY CONDITION → EMA crossover up
-            # ----------------------------------------------------------
-            if ema_fast > ema_slow:
-
-                # If already long → do nothing
-                if position == 1:
-                    continue
-
-                # If short → exit short first
-                if position == -1:
-                    signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "side": "buy",
-                        "qty": self.qty
-                    })
-                print("Generating BUY signal", ts, price)
-                # Enter long
-                signals.append({
-                    "timestamp": ts,
-                    "symbol": self.symbol,
-                    "side": "buy",
-                    "qty": self.qty
-                })
-                position = 1
-                entry_price = price
-                continue
-
-            # ----------------------------------------------------------
-            # 3. SELL CONDITION → EMA crossover down
-            # ----------------------------------------------------------
-            if ema_fast < ema_slow:
-
-                # If already short → do nothing
-                if position == -1:
-                    continue
-
-                # If long → exit long first
-                if position == 1:
-                    signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "side": "sell",
-                        "qty": self.qty
-                    })
-                print("Generating SELL signal", ts, price)
-                # Enter short
-                signals.append({
-                    "timestamp": ts,
-                    "symbol": self.symbol,
-                    "side": "sell",
-                    "qty": self.qty
-                })
-                position = -1
-                entry_price = price
-                continue
-
-        return signals
+        # Bars before both EMAs exist are skipped. Long while fast > slow, short while
+        # fast < slow (an opposite position is closed first); SL/TP exits wait for the
+        # next bar before entering again.
+        pos, side = sltp_signals(
+            self.data["close"].to_numpy(),
+            long_cond=ema_fast > ema_slow,
+            short_cond=ema_fast < ema_slow,
+            stop_loss=SL,
+            target_profit=TP,
+            active=~(np.isnan(ema_fast) | np.isnan(ema_slow)),
+            skip_after_exit=True,
+        )
+        return self.signal_frame(pos, side)
+
+    def reset(self):
+        self._ema_fast = EMAState(self.fast)
+        self._ema_slow = EMAState(self.slow)
+        self._state = SLTPState(self.config.get("stop_loss", 0.1), self.config.get("target_profit", 0.5),
+                                skip_after_exit=True)
+
+    def on_bar(self, bar):
+        close = bar["close"]
+        ema_fast = self._ema_fast.update(close)
+        ema_slow = self._ema_slow.update(close)
+        if ema_fast != ema_fast or ema_slow != ema_slow:      # EMAs not seeded yet
+            return []
+        sides = self._state.step(close, ema_fast > ema_slow, ema_fast < ema_slow)
+        return [self._signal(bar["timestamp"], "buy" if s == BUY else "sell") for s in sides]
@@ -0,0 +1,67 @@
+# strategies/replay.py
+"""Replay a frame through a strategy's incremental on_bar() API.
+
+replay() feeds every bar of `data` to a fresh strategy instance as a live
+feed would, timing each on_bar() call. check_replay() also runs the batch
+generate_signals() and reports whether both produced the same signals.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from strategies.signal_frame import as_signal_frame
+
+_BAR_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def iter_bars(data: pd.DataFrame):
+    """Bars of `data` as on_bar() dicts with plain Python values."""
+    fields = [f for f in _BAR_FIELDS if f in data.columns]
+    columns = [data[f].tolist() for f in fields]
+    for ts, *values in zip(data.index, *columns):
+        bar = dict(zip(fields, values))
+        bar["timestamp"] = ts
+        yield bar
+
+
+def replay(strategy_cls, data: pd.DataFrame, config: dict):
+    """Signals from feeding `data` bar by bar, plus the per-bar on_bar() latency in seconds."""
+    strategy = strategy_cls(data.iloc[:0], config)
+    on_bar = strategy.on_bar
+    clock = time.perf_counter
+    latency = np.empty(len(data))
+    signals = []
+    for i, bar in enumerate(iter_bars(data)):
+        t0 = clock()
+        out = on_bar(bar)
+        latency[i] = clock() - t0
+        signals += out
+    return signals, latency
+
+
+def check_replay(strategy_cls, data: pd.DataFrame, config: dict) -> dict:
+    """Compare replayed signals with the batch generate_signals() over the same data."""
+    batch = as_signal_frame(strategy_cls(data, config).generate_signals(), data.index).to_records()
+    live, latency = replay(strategy_cls, data, config)
+
+    mismatch = next((i for i, (a, b) in enumerate(zip(batch, live)) if a != b), None)
+    if mismatch is None and len(batch) != len(live):
+        mismatch = min(len(batch), len(live))
+    return {
+        "strategy": strategy_cls.__name__,
+        "bars": len(data),
+        "signals": len(batch),
+        "identical": mismatch is None,
+        "first_mismatch": None if mismatch is None else {
+            "index": mismatch,
+            "batch": batch[mismatch] if mismatch < len(batch) else None,
+            "replay": live[mismatch] if mismatch < len(live) else None,
+        },
+        "latency_us": {
+            "mean": float(latency.mean() * 1e6) if len(latency) else 0.0,
+            "p50": float(np.percentile(latency, 50) * 1e6) if len(latency) else 0.0,
+            "p99": float(np.percentile(latency, 99) * 1e6) if len(latency) else 0.0,
+            "max": float(latency.max() * 1e6) if len(latency) else 0.0,
+        },
+    }
@@ -0,0 +1,105 @@
+# strategies/signal_frame.py
+"""Columnar container for strategy signals.
+
+Signals refer to bars by position in the strategy's data index:
+    pos:  int64 bar positions, in chronological order
+    side: int8, BUY (+1) / SELL (-1)
+    qty:  float64
+Iterating a SignalFrame yields the classic signal dicts
+({"timestamp", "symbol", "side", "qty"}), so code written for list-of-dicts
+signals keeps working; as_signal_frame() converts the other way.
+"""
+import numpy as np
+import pandas as pd
+
+BUY = 1
+SELL = -1
+_SIDE_NAMES = {BUY: "buy", SELL: "sell"}
+
+
+class SignalFrame:
+    def __init__(self, index: pd.Index, pos, side, qty, symbol: str = "BTCUSDT"):
+        """
+        index: bar index of the data the positions refer to.
+        pos / side / qty: array-likes of equal length; a scalar qty applies to every signal.
+        """
+        self.index = index
+        self.pos = np.asarray(pos, dtype=np.int64)
+        self.side = np.asarray(side, dtype=np.int8)
+        self.qty = np.broadcast_to(np.asarray(qty, dtype=np.float64), self.pos.shape).copy()
+        self.symbol = symbol
+        if len(self.side) != len(self.pos):
+            raise ValueError("pos and side must have the same length")
+
+    @classmethod
+    def empty(cls, index: pd.Index, symbol: str = "BTCUSDT") -> "SignalFrame":
+        return cls(index, np.empty(0, np.int64), np.empty(0, np.int8), np.empty(0), symbol)
+
+    @classmethod
+    def from_records(cls, records, index: pd.Index, symbol: str | None = None) -> "SignalFrame":
+        """Build from signal dicts, sorted chronologically (stable). Signals not on a bar of `index` are dropped."""
+        records = list(records)
+        if symbol is None:
+            symbol = records[0].get("symbol", "BTCUSDT") if records else "BTCUSDT"
+        if not records:
+            return cls.empty(index, symbol)
+        timestamps = pd.Index([r["timestamp"] for r in records])
+        if isinstance(index, pd.DatetimeIndex):
+            timestamps = pd.DatetimeIndex(timestamps)
+            if timestamps.tz is None and index.tz is not None:
+                timestamps = timestamps.tz_localize(index.tz)
+        pos = index.get_indexer(timestamps)
+        side = np.array([BUY if r["side"].lower() == "buy" else SELL for r in records], dtype=np.int8)
+        qty = np.array([r.get("qty", 0.0) for r in records], dtype=np.float64)
+        keep = np.flatnonzero(pos >= 0)
+        keep = keep[np.argsort(pos[keep], kind="stable")]
+        return cls(index, pos[keep], side[keep], qty[keep], symbol)
+
+    # -------------------------------------------------------------
+    # Views
+    # -------------------------------------------------------------
+    @property
+    def timestamps(self) -> pd.Index:
+        return self.index[self.pos]
+
+    def masks(self) -> tuple[np.ndarray, np.ndarray]:
+        """Boolean (buy, sell) arrays over the bars of `index`."""
+        buy = np.zeros(len(self.index), dtype=bool)
+        sell = np.zeros(len(self.index), dtype=bool)
+        buy[self.pos[self.side == BUY]] = True
+        sell[self.pos[self.side == SELL]] = True
+        return buy, sell
+
+    def to_records(self) -> list[dict]:
+        return [{"timestamp": ts, "symbol": self.symbol, "side": _SIDE_NAMES[s], "qty": q}
+                for ts, s, q in zip(self.timestamps, self.side.tolist(), self.qty.tolist())]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "symbol": self.symbol,
+            "side": np.where(self.side == BUY, "buy", "sell"),
+            "qty": self.qty,
+        }, index=self.timestamps)
+
+    def __len__(self):
+        return len(self.pos)
+
+    def __iter__(self):
+        return iter(self.to_records())
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return SignalFrame(self.index, self.pos[item], self.side[item], self.qty[item], self.symbol)
+        i = range(len(self))[item]
+        return {"timestamp": self.index[self.pos[i]], "symbol": self.symbol,
+                "side": _SIDE_NAMES[int(self.side[i])], "qty": float(self.qty[i])}
+
+    def __repr__(self):
+        return f"SignalFrame({len(self)} signals, symbol={self.symbol!r})"
+
+
+def as_signal_frame(signals, index: pd.Index, symbol: str | None = None) -> SignalFrame:
+    """Signals as a SignalFrame over `index`, whether given as one or as a list of dicts."""
+    if isinstance(signals, SignalFrame):
+        return signals
+    return SignalFrame.from_records(signals or [], index, symbol)
@@ -0,0 +1,166 @@
+# strategies/sltp_kernel.py
+"""Stateful entry / stop-loss / take-profit signal state machine.
+
+Shared by strategies whose signals depend on the open position (entry price,
+SL/TP exits, flips), so they cannot be found with a plain vectorized diff.
+Per active bar, in order:
+
+1. SL/TP: a long exits (SELL) when close <= entry*(1-SL) or >= entry*(1+TP),
+   a short (BUY) when close >= entry*(1+SL) or <= entry*(1-TP). With
+   skip_after_exit the bar ends there.
+2. long_cond: a short is closed (BUY), then a long opened (BUY) unless
+   already long.
+3. short_cond: a long is closed (SELL), then a short opened (SELL) unless
+   already short.
+
+Compiled with Numba when available (utils.jit), plain Python otherwise.
+"""
+import numpy as np
+
+from strategies.signal_frame import BUY, SELL
+from utils.jit import njit
+
+
+_MAX_PER_BAR = 4     # SL/TP exit + entry + close-and-reverse
+
+
+@njit
+def _sltp_kernel(close, long_cond, short_cond, active, stop_loss, target_profit, skip_after_exit):
+    n_bars = len(close)
+    pos = np.empty(max(64, n_bars // 16), np.int64)
+    side = np.empty(len(pos), np.int8)
+    n = 0
+    position = 0            # +1 long, -1 short, 0 flat
+    entry = 0.0
+
+    start = 0
+    while start < n_bars:
+        # Run until the output buffer might overflow on the next bar, then grow it.
+        # Growing outside the bar loop keeps the loop free of array reassignments.
+        stop = n_bars
+        for i in range(start, n_bars):
+            if n > len(pos) - _MAX_PER_BAR:
+                stop = i
+                break
+            if not active[i]:
+                continue
+            price = close[i]
+
+            if position == 1:
+                if price <= entry * (1 - stop_loss) or price >= entry * (1 + target_profit):
+                    pos[n] = i
+                    side[n] = SELL
+                    n += 1
+                    position = 0
+                    if skip_after_exit:
+                        continue
+            elif position == -1:
+                if price >= entry * (1 + stop_loss) or price <= entry * (1 - target_profit):
+                    pos[n] = i
+                    side[n] = BUY
+                    n += 1
+                    position = 0
+                    if skip_after_exit:
+                        continue
+
+            if long_cond[i]:
+                if position == -1:
+                    pos[n] = i
+                    side[n] = BUY
+                    n += 1
+                if position <= 0:
+                    pos[n] = i
+                    side[n] = BUY
+                    n += 1
+                    position = 1
+                    entry = price
+
+            if short_cond[i]:
+                if position == 1:
+                    pos[n] = i
+                    side[n] = SELL
+                    n += 1
+                if position >= 0:
+                    pos[n] = i
+                    side[n] = SELL
+                    n += 1
+                    position = -1
+                    entry = price
+
+        if stop < n_bars:
+            grown_pos = np.empty(2 * len(pos), np.int64)
+            grown_side = np.empty(2 * len(pos), np.int8)
+            grown_pos[:n] = pos[:n]
+            grown_side[:n] = side[:n]
+            pos, side = grown_pos, grown_side
+        start = stop
+
+    return pos[:n].copy(), side[:n].copy()
+
+
+def sltp_signals(close, long_cond, short_cond, stop_loss: float, target_profit: float,
+                 active=None, skip_after_exit: bool = False):
+    """
+    Run the state machine over one series of bars.
+
+    close: float array; long_cond / short_cond: bool arrays of entry conditions.
+    active: bool array of bars to process (others are skipped entirely); all bars by default.
+    skip_after_exit: no entries on a bar that closed a position by SL/TP.
+    Returns (pos, side): int64 bar positions and int8 BUY/SELL, in order.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    long_cond = np.ascontiguousarray(long_cond, dtype=np.bool_)
+    short_cond = np.ascontiguousarray(short_cond, dtype=np.bool_)
+    active = np.ones(len(close), np.bool_) if active is None else np.ascontiguousarray(active, dtype=np.bool_)
+    return _sltp_kernel(close, long_cond, short_cond, active, float(stop_loss), float(target_profit),
+                        bool(skip_after_exit))
+
+
+class SLTPState:
+    """The same state machine one bar at a time, for incremental use (strategy on_bar)."""
+
+    def __init__(self, stop_loss: float, target_profit: float, skip_after_exit: bool = False):
+        self.stop_loss = float(stop_loss)
+        self.target_profit = float(target_profit)
+        self.skip_after_exit = skip_after_exit
+        self.position = 0        # +1 long, -1 short, 0 flat
+        self.entry = 0.0
+
+    def step(self, price, long_cond, short_cond) -> list[int]:
+        """Sides (BUY/SELL) signalled on one active bar, in order."""
+        sides = []
+        position, entry = self.position, self.entry
+
+        if position == 1:
+            if price <= entry * (1 - self.stop_loss) or price >= entry * (1 + self.target_profit):
+                sides.append(SELL)
+                position = 0
+                if self.skip_after_exit:
+                    self.position = position
+                    return sides
+        elif position == -1:
+            if price >= entry * (1 + self.stop_loss) or price <= entry * (1 - self.target_profit):
+                sides.append(BUY)
+                position = 0
+                if self.skip_after_exit:
+                    self.position = position
+                    return sides
+
+        if long_cond:
+            if position == -1:
+                sides.append(BUY)
+            if position <= 0:
+                sides.append(BUY)
+                position = 1
+                entry = price
+
+        if short_cond:
+            if position == 1:
+                sides.append(SELL)
+            if position >= 0:
+                sides.append(SELL)
+                position = -1
+                entry = price
+
+        self.position, self.entry = position, entry
+        return sides
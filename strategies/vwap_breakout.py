@@ -1,7 +1,9 @@
 # strategies/vwap_breakout.py
-import pandas as pd
 import numpy as np
 from strategies.base_strategy import BaseStrategy
+from strategies.signal_frame import BUY
+from strategies.sltp_kernel import SLTPState, sltp_signals
+from utils.indicators import AnchoredVWAPState, anchored_vwap
 
 
 class VWAPBreakout(BaseStrategy):
@@ -16,167 +18,54 @@ class VWAPBreakout(BaseStrategy):
 
         self.symbol = config.get("symbol", "BTCUSDT")
         self.qty = config.get("qty", 1)
-
-    # -------------------------------------------------------------
-    # Helper: detect new session depending on D/W/M
-    # -------------------------------------------------------------
-    def _is_new_session(self, ts):
-        if self.session == "D":
-            return ts.date() != self._last_session.date()
-
-        elif self.session == "W":
-            return ts.isocalendar().week != self._last_session.isocalendar().week
-
-        elif self.session == "M":
-            return (ts.year != self._last_session.year) or (ts.month != self._last_session.month)
-
-        return False
+        self.reset()
 
     # -------------------------------------------------------------
     # Core signal generator
     # -------------------------------------------------------------
     def generate_signals(self):
-        df = self.data.copy()
-
-        hlc3 = (df["high"] + df["low"] + df["close"]) / 3
-        vol = df["volume"]
-
-        # Containers
-        vwap = []
-        upper = []
-        lower = []
-
-        cum_pv = 0.0
-        cum_vol = 0.0
-        sum_sq = 0.0
-
-        self._last_session = df.index[0]
+        df = self.data
 
         # ---------------------------------------------------------
         # 1. Create Anchored VWAP + Bands
         # ---------------------------------------------------------
-        for ts, price, vol_i, h3 in zip(df.index, df["close"], vol, hlc3):
-
-            # Session reset
-            if self._is_new_session(ts):
-                cum_pv = 0.0
-                cum_vol = 0.0
-                sum_sq = 0.0
-
-            self._last_session = ts
-
-            # VWAP core
-            cum_pv += h3 * vol_i
-            cum_vol += vol_i
-            cur_vwap = cum_pv / cum_vol if cum_vol > 0 else np.nan
-
-            # Std deviation
-            sum_sq += (h3 - cur_vwap) ** 2 * vol_i
-            var = sum_sq / cum_vol if cum_vol > 0 else 0.0
-            stdev = np.sqrt(var)
-
-            vwap.append(cur_vwap)
-            upper.append(cur_vwap + self.mult * stdev)
-            lower.append(cur_vwap - self.mult * stdev)
-
-        df["VWAP"] = vwap
-        df["UPPER"] = upper
-        df["LOWER"] = lower
+        bands = anchored_vwap(df["high"], df["low"], df["close"], df["volume"], self.session, self.mult)
 
         # ---------------------------------------------------------
         # 2. Generate buy/sell signals (stateful)
         # ---------------------------------------------------------
-        signals = []
-        position = 0     # +1 long, -1 short, 0 flat
-        entry_price = None
-
-        prev_close = None
-        prev_upper = None
-        prev_lower = None
-
-        for ts, row in df.iterrows():
-            close = row["close"]
-            up = row["UPPER"]
-            lo = row["LOWER"]
-
-            # Need previous values for crossover
-            if prev_close is None:
-                prev_close = close
-                prev_upper = up
-                prev_lower = lo
-                continue
+        close = df["close"].to_numpy(dtype=float)
+        up = bands["UPPER"].to_numpy()
+        lo = bands["LOWER"].to_numpy()
 
-            # --------------------------
-            # STOP LOSS / TAKE PROFIT
-            # --------------------------
-            if position == 1:  # long
-                if close <= entry_price * (1 - self.stop_loss) or close >= entry_price * (1 + self.target_profit):
-                    signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "side": "sell",
-                        "qty": self.qty
-                    })
-                    position = 0
-                    entry_price = None
+        # Crossovers against the previous bar; the first bar only seeds them
+        cross_up = np.zeros(len(df), dtype=bool)
+        cross_down = np.zeros(len(df), dtype=bool)
+        cross_up[1:] = (close[:-1] < up[:-1]) & (close[1:] > up[1:])          # BUY: crosses ABOVE upper band
+        cross_down[1:] = (close[:-1] > lo[:-1]) & (close[1:] < lo[1:])        # SELL: crosses BELOW lower band
 
-            elif position == -1:  # short
-                if close >= entry_price * (1 + self.stop_loss) or close <= entry_price * (1 - self.target_profit):
-                    signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "side": "buy",
-                        "qty": self.qty
-                    })
-                    position = 0
-                    entry_price = None
+        active = np.ones(len(df), dtype=bool)
+        active[:1] = False
 
-            # --------------------------
-            # BUY — price crosses ABOVE upper band
-            # --------------------------
-            if prev_close < prev_upper and close > up:
-                if position == -1:
-                    signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "side": "buy",
-                        "qty": self.qty
-                    })
+        pos, side = sltp_signals(close, cross_up, cross_down, self.stop_loss, self.target_profit, active=active)
+        return self.signal_frame(pos, side)
 
-                if position <= 0:
-                    signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "side": "buy",
-                        "qty": self.qty
-                    })
-                    position = 1
-                    entry_price = close
-
-            # --------------------------
-            # SELL — price crosses BELOW lower band
-            # --------------------------
-            if prev_close > prev_lower and close < lo:
-                if position == 1:
-                    signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "side": "sell",
-                        "qty": self.qty
-                    })
-
-                if position >= 0:
-                    signals.append({
-                        "timestamp": ts,
-                        "symbol": self.symbol,
-                        "side": "sell",
-                        "qty": self.qty
-                    })
-                    position = -1
-                    entry_price = close
-
-            prev_close = close
-            prev_upper = up
-            prev_lower = lo
-
-        return signals
+    # -------------------------------------------------------------
+    # Incremental version of generate_signals
+    # -------------------------------------------------------------
+    def reset(self):
+        self._bands = AnchoredVWAPState(self.session, self.mult)
+        self._state = SLTPState(self.stop_loss, self.target_profit)
+        self._prev = None        # (close, upper, lower) of the previous bar
+
+    def on_bar(self, bar):
+        close = bar["close"]
+        _, up, lo = self._bands.update(bar["timestamp"], bar["high"], bar["low"], close, bar["volume"])
+        prev, self._prev = self._prev, (close, up, lo)
+        if prev is None:
+            return []
+        prev_close, prev_upper, prev_lower = prev
+        sides = self._state.step(close,
+                                 prev_close < prev_upper and close > up,
+                                 prev_close > prev_lower and close < lo)
+        return [self._signal(bar["timestamp"], "buy" if s == BUY else "sell") for s in sides]
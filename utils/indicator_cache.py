@@ -0,0 +1,294 @@
+# utils/indicator_cache.py
+"""Memoization of indicator functions.
+
+@memoize keys a call on the function, its bound arguments and a content
+fingerprint of every array argument (Series values and index, DataFrame
+columns, ndarrays), so identical requests from different strategies,
+engines or sweep runs compute once. Results live in an LRU bounded by a
+byte budget and are stored read-only: hits hand out shallow pandas copies
+(copy-on-write protects the cache) and read-only ndarrays.
+
+Fingerprints are a compiled XXH64 hash over the raw bytes (blake2b
+without Numba); pandas Index objects are immutable, so theirs are kept per
+object and computed once.
+"""
+import functools
+import hashlib
+import inspect
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.jit import NUMBA_AVAILABLE, njit
+
+DEFAULT_MAX_BYTES = 256 << 20
+
+
+class _Uncacheable(Exception):
+    pass
+
+
+# -----------------------------------------------------------------
+# Fingerprints
+# -----------------------------------------------------------------
+_P1 = np.uint64(0x9E3779B185EBCA87)
+_P2 = np.uint64(0xC2B2AE3D27D4EB4F)
+_P3 = np.uint64(0x165667B19E3779F9)
+_P4 = np.uint64(0x85EBCA77C2B2AE63)
+_P5 = np.uint64(0x27D4EB2F165667C5)
+
+
+@njit
+def _rotl(x, r):
+    return (x << np.uint64(r)) | (x >> np.uint64(64 - r))
+
+
+@njit
+def _round(acc, word):
+    return _rotl(acc + word * _P2, 31) * _P1
+
+
+@njit
+def _merge(acc, lane):
+    return (acc ^ _round(np.uint64(0), lane)) * _P1 + _P4
+
+
+@njit
+def _hash_words(words):
+    """XXH64 over 64-bit words: four rotate-multiply lanes (instruction-level parallelism), merged, then a
+    final avalanche so every input bit reaches every output bit."""
+    n = len(words)
+    i = 0
+    if n >= 4:
+        v1 = _P1 + _P2
+        v2 = _P2
+        v3 = np.uint64(0)
+        v4 = np.uint64(0) - _P1
+        while i + 4 <= n:
+            v1 = _round(v1, words[i])
+            v2 = _round(v2, words[i + 1])
+            v3 = _round(v3, words[i + 2])
+            v4 = _round(v4, words[i + 3])
+            i += 4
+        h = _rotl(v1, 1) + _rotl(v2, 7) + _rotl(v3, 12) + _rotl(v4, 18)
+        h = _merge(h, v1)
+        h = _merge(h, v2)
+        h = _merge(h, v3)
+        h = _merge(h, v4)
+    else:
+        h = _P5
+    h += np.uint64(n * 8)
+    while i < n:
+        h = _rotl(h ^ _round(np.uint64(0), words[i]), 27) * _P1 + _P4
+        i += 1
+    h ^= h >> np.uint64(33)
+    h *= _P2
+    h ^= h >> np.uint64(29)
+    h *= _P3
+    h ^= h >> np.uint64(32)
+    return h
+
+
+def _array_fingerprint(values: np.ndarray):
+    if values.dtype.hasobject:
+        raise _Uncacheable
+    data = np.ascontiguousarray(values).reshape(-1).view(np.uint8)
+    head = len(data) - len(data) % 8
+    if NUMBA_AVAILABLE:
+        digest = int(_hash_words(data[:head].view(np.uint64)))
+    else:
+        digest = hashlib.blake2b(data[:head], digest_size=16).digest()
+    return values.dtype.str, values.shape, digest, data[head:].tobytes()
+
+
+_index_fingerprints = {}         # id(index) -> fingerprint, dropped when the index is collected
+_index_lock = threading.Lock()
+
+
+def _index_fingerprint(index: pd.Index):
+    key = id(index)
+    with _index_lock:
+        hit = _index_fingerprints.get(key)
+    if hit is not None and hit[0]() is index:
+        return hit[1]
+    fp = ("I", type(index).__name__, str(getattr(index, "tz", None)), index.name,
+          _array_fingerprint(np.asarray(index.asi8 if hasattr(index, "asi8") else index.to_numpy())))
+    try:
+        ref = weakref.ref(index, lambda _, key=key: _index_fingerprints.pop(key, None))
+    except TypeError:
+        return fp
+    with _index_lock:
+        _index_fingerprints[key] = (ref, fp)
+    return fp
+
+
+def fingerprint(obj):
+    """Hashable content key for an indicator argument; raises _Uncacheable for unsupported objects."""
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes, np.generic)):
+        return obj
+    if isinstance(obj, pd.Series):
+        return "S", obj.name, _array_fingerprint(obj.to_numpy()), _index_fingerprint(obj.index)
+    if isinstance(obj, pd.DataFrame):
+        return ("F", tuple(obj.columns), _index_fingerprint(obj.index),
+                tuple(_array_fingerprint(obj[c].to_numpy()) for c in obj.columns))
+    if isinstance(obj, pd.Index):
+        return _index_fingerprint(obj)
+    if isinstance(obj, np.ndarray):
+        return _array_fingerprint(obj)
+    if isinstance(obj, (tuple, list)):
+        return type(obj).__name__, tuple(fingerprint(v) for v in obj)
+    raise _Uncacheable
+
+
+# -----------------------------------------------------------------
+# Read-only results
+# -----------------------------------------------------------------
+def _freeze(result):
+    """(stored result, nbytes); the stored arrays are made read-only."""
+    if isinstance(result, np.ndarray):
+        result = result.view()
+        result.flags.writeable = False
+        return result, result.nbytes
+    if isinstance(result, pd.Series):
+        values = result.to_numpy()
+        if values.dtype.hasobject:
+            raise _Uncacheable
+        values = values.view()
+        values.flags.writeable = False
+        return pd.Series(values, index=result.index, name=result.name, copy=False), values.nbytes
+    if isinstance(result, pd.DataFrame):
+        values = result.to_numpy()          # one 2D array, consolidating the frame if it had several blocks
+        if values.dtype.hasobject:
+            raise _Uncacheable
+        values = values.view()
+        values.flags.writeable = False
+        return pd.DataFrame(values, index=result.index, columns=result.columns, copy=False), values.nbytes
+    if isinstance(result, tuple):
+        parts = [_freeze(r) for r in result]
+        return tuple(p for p, _ in parts), sum(n for _, n in parts)
+    raise _Uncacheable
+
+
+def _view(result):
+    if isinstance(result, (pd.Series, pd.DataFrame)):
+        return result.copy(deep=False)
+    if isinstance(result, np.ndarray):
+        return result.view()
+    if isinstance(result, tuple):
+        return tuple(_view(r) for r in result)
+    return result
+
+
+# -----------------------------------------------------------------
+# Cache
+# -----------------------------------------------------------------
+class IndicatorCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """max_bytes: total size of cached results; least recently used first out. 0 disables caching."""
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()     # key -> (result, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _view(entry[0])
+
+    def put(self, key, result):
+        """Store `result` and return a view of it. Results larger than the whole budget are not kept."""
+        stored, nbytes = _freeze(result)
+        if nbytes > self.max_bytes:
+            return _view(stored)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (stored, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self._bytes -= dropped
+                self.evictions += 1
+        return _view(stored)
+
+    def resize(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self._entries and self._bytes > max_bytes:
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self._bytes -= dropped
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+indicator_cache = IndicatorCache()
+
+
+def memoize(fn):
+    """Cache fn's results in indicator_cache, keyed on its arguments' contents."""
+    signature = inspect.signature(fn)
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        cache = indicator_cache
+        if cache.max_bytes <= 0:
+            return fn(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        try:
+            key = (name, tuple((k, fingerprint(v)) for k, v in bound.arguments.items()))
+        except _Uncacheable:
+            return fn(*args, **kwargs)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+        result = fn(*args, **kwargs)
+        try:
+            return cache.put(key, result)
+        except _Uncacheable:
+            return result
+
+    def prime(result, *args, **kwargs):
+        """Store `result` as the value of fn(*args, **kwargs) without calling fn."""
+        if indicator_cache.max_bytes <= 0:
+            return
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        try:
+            indicator_cache.put((name, tuple((k, fingerprint(v)) for k, v in bound.arguments.items())), result)
+        except _Uncacheable:
+            pass
+
+    wrapper.uncached = fn
+    wrapper.prime = prime
+    return wrapper
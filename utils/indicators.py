@@ -1,10 +1,319 @@
 
+import math
+import numpy as np
 import pandas as pd
+from utils.indicator_cache import indicator_cache, memoize
+from utils import kernels
+from utils.jit import njit
+
 try:
     import talib as ta
-except:
-    raise ImportError("Install TA-Lib first: pip install TA-Lib")
+except ImportError:
+    ta = None       # compiled fallbacks (utils.kernels) reproduce TA-Lib's output
+
+
+# -----------------------------------------------------------------
+# Indicator cache: @memoize'd indicators compute once per distinct input and parameters
+# -----------------------------------------------------------------
+def cache_stats() -> dict:
+    return indicator_cache.stats()
+
+
+def clear_cache():
+    indicator_cache.clear()
+
+
+def set_cache_budget(max_bytes: int):
+    """Bytes of indicator results to keep (0 turns memoization off)."""
+    indicator_cache.resize(max_bytes)
+
 
+@memoize
 def ema(series, period):
-    values = ta.EMA(series.values.astype(float), timeperiod=period)
+    values = series.values.astype(float)
+    if ta is not None and period >= _TALIB_MIN_PERIOD:
+        values = ta.EMA(values, timeperiod=period)
+    else:
+        values = _run_kernel(kernels.ema_multi_kernel, (values,), _as_periods([period]))[:, 0]
     return pd.Series(values, index=series.index, name=f"EMA_{period}")
+
+
+@memoize
+def ewm_mean(series, span):
+    """pandas series.ewm(span=span, adjust=False).mean()."""
+    return series.ewm(span=span, adjust=False).mean()
+
+
+# -----------------------------------------------------------------
+# Multi-period indicators: one (bars x periods) array per call, columns <NAME>_<period>.
+# backend: "talib" (one TA-Lib call per period), "kernel" (one compiled pass over the bars for all
+# periods) or None for TA-Lib when it is installed. Both give the same values. TA-Lib's EMA, SMA
+# and RSI need periods >= 2: None falls back to the kernel for shorter ones, "talib" rejects them.
+# -----------------------------------------------------------------
+_TALIB_MIN_PERIOD = 2
+
+
+def _as_periods(periods) -> np.ndarray:
+    periods = np.atleast_1d(np.asarray(periods, dtype=np.int64))
+    if len(periods) == 0 or (periods < 1).any():
+        raise ValueError(f"periods must be positive integers, got {periods.tolist()}")
+    return periods
+
+
+def _use_talib(backend, periods, min_period=1) -> bool:
+    if backend is None:
+        return ta is not None and periods.min() >= min_period
+    if backend not in ("talib", "kernel"):
+        raise ValueError(f"Unknown indicator backend: {backend}. Supported: talib, kernel")
+    if backend == "talib" and ta is None:
+        raise ImportError("Install TA-Lib first: pip install TA-Lib")
+    if backend == "talib" and periods.min() < min_period:
+        raise ValueError(f"TA-Lib needs periods >= {min_period}, got {periods.tolist()}")
+    return backend == "talib"
+
+
+def _run_kernel(kernel, arrays, periods):
+    """Kernel output over all bars; leading bars where any input is NaN stay NaN (as in TA-Lib)."""
+    start = kernels.first_valid(*arrays)
+    if start == 0:
+        return kernel(*arrays, periods)
+    out = np.full((len(arrays[0]), len(periods)), np.nan)
+    if start < len(arrays[0]):
+        out[start:] = kernel(*(a[start:] for a in arrays), periods)
+    return out
+
+
+def _frame(values, index, name, periods) -> pd.DataFrame:
+    return pd.DataFrame(values, index=index, columns=[f"{name}_{p}" for p in periods.tolist()], copy=False)
+
+
+def _float(series) -> np.ndarray:
+    return np.ascontiguousarray(series.to_numpy(dtype=float))
+
+
+@memoize
+def ema_multi(series, periods, backend=None) -> pd.DataFrame:
+    x, periods = _float(series), _as_periods(periods)
+    if _use_talib(backend, periods, _TALIB_MIN_PERIOD):
+        out = np.column_stack([ta.EMA(x, timeperiod=int(p)) for p in periods])
+    else:
+        out = _run_kernel(kernels.ema_multi_kernel, (x,), periods)
+    return _frame(out, series.index, "EMA", periods)
+
+
+@memoize
+def sma_multi(series, periods, backend=None) -> pd.DataFrame:
+    x, periods = _float(series), _as_periods(periods)
+    if _use_talib(backend, periods, _TALIB_MIN_PERIOD):
+        out = np.column_stack([ta.SMA(x, timeperiod=int(p)) for p in periods])
+    else:
+        out = _run_kernel(kernels.sma_multi_kernel, (x,), periods)
+    return _frame(out, series.index, "SMA", periods)
+
+
+@memoize
+def atr_multi(high, low, close, periods, backend=None) -> pd.DataFrame:
+    h, l, c, periods = _float(high), _float(low), _float(close), _as_periods(periods)
+    if _use_talib(backend, periods):
+        out = np.column_stack([ta.ATR(h, l, c, timeperiod=int(p)) for p in periods])
+    else:
+        out = _run_kernel(kernels.atr_multi_kernel, (h, l, c), periods)
+    return _frame(out, close.index, "ATR", periods)
+
+
+@memoize
+def rsi_multi(series, periods, backend=None) -> pd.DataFrame:
+    x, periods = _float(series), _as_periods(periods)
+    if _use_talib(backend, periods, _TALIB_MIN_PERIOD):
+        out = np.column_stack([ta.RSI(x, timeperiod=int(p)) for p in periods])
+    else:
+        out = _run_kernel(kernels.rsi_multi_kernel, (x,), periods)
+    return _frame(out, series.index, "RSI", periods)
+
+
+@memoize
+def rolling_vwap_multi(high, low, close, volume, periods) -> pd.DataFrame:
+    """Rolling VWAP of hlc3 over each window (TA-Lib has none: always the compiled kernel)."""
+    hlc3 = _float((high + low + close) / 3)
+    periods = _as_periods(periods)
+    out = _run_kernel(kernels.rolling_vwap_multi_kernel, (hlc3, _float(volume)), periods)
+    return _frame(out, close.index, "VWAP", periods)
+
+
+def precompute_ema(series, periods, backend=None) -> pd.DataFrame:
+    """
+    ema_multi(), stored in ema()'s cache one period at a time so later ema(series, p) calls are hits
+    (sweeps: every EMA column in one pass up front). The frame itself is not cached.
+    """
+    frame = ema_multi.uncached(series, periods, backend)
+    for p, column in zip(_as_periods(periods).tolist(), frame.columns):
+        values = np.ascontiguousarray(frame[column].to_numpy())
+        ema.prime(pd.Series(values, index=series.index, name=f"EMA_{p}", copy=False), series, p)
+    return frame
+
+
+# -----------------------------------------------------------------
+# Session-anchored VWAP
+# -----------------------------------------------------------------
+def session_keys(index: pd.DatetimeIndex, session: str) -> np.ndarray:
+    """
+    Per-bar session key; a new session starts wherever the key changes from the previous bar.
+    D: calendar day, W: ISO week number (the week number alone, not the ISO year), M: calendar month,
+    all in the index's own timezone. Any other session: one session over all bars.
+    """
+    if session not in ("D", "W", "M"):
+        return np.zeros(len(index), dtype=np.int64)
+    wall = index.tz_localize(None) if index.tz is not None else index
+    days = wall.values.astype("datetime64[D]")
+    if session == "D":
+        return days.astype(np.int64)
+    if session == "M":
+        return days.astype("datetime64[M]").astype(np.int64)
+    # ISO week number: the week belongs to the year of its Thursday. Worked out once per run of bars on
+    # the same day, then repeated over the run.
+    day_num = days.astype(np.int64)
+    if len(day_num) == 0:
+        return day_num
+    starts = np.flatnonzero(np.r_[True, day_num[1:] != day_num[:-1]])
+    thursday = day_num[starts] - (day_num[starts] + 3) % 7 + 3          # 1970-01-01 was a Thursday
+    jan1 = thursday.astype("datetime64[D]").astype("datetime64[Y]").astype("datetime64[D]").astype(np.int64)
+    return np.repeat((thursday - jan1) // 7 + 1, np.diff(np.append(starts, len(day_num))))
+
+
+@njit
+def _pow(values, exponent):
+    """values ** exponent through libm pow, elementwise. Unlike array ** 2 (x * x) this rounds exactly like
+    squaring one NumPy/Python float at a time; the exponent is a runtime argument so it is never folded."""
+    out = np.empty_like(values)
+    for i in range(len(values)):
+        out[i] = values[i] ** exponent
+    return out
+
+
+def _session_cumsum(values, starts):
+    """Running sum restarting at each session start, accumulated in bar order."""
+    out = np.empty_like(values)
+    for a, b in zip(starts, np.append(starts[1:], len(values))):
+        np.cumsum(values[a:b], out=out[a:b])
+    return out
+
+
+@memoize
+def anchored_vwap(high, low, close, volume, session: str = "W", mult: float = 2.0) -> pd.DataFrame:
+    """
+    VWAP of hlc3 anchored to D/W/M sessions, with bands at `mult` volume-weighted standard deviations.
+    The deviation is a running one: each bar adds (hlc3 - VWAP so far)^2 * volume. VWAP is NaN until the
+    session has volume. Returns a DataFrame with VWAP, UPPER and LOWER columns.
+    """
+    index = close.index
+    hlc3 = ((high + low + close) / 3).to_numpy(dtype=float)
+    vol = volume.to_numpy(dtype=float)
+
+    keys = session_keys(index, session)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, np.int64)
+
+    cum_pv = _session_cumsum(hlc3 * vol, starts)
+    cum_vol = _session_cumsum(vol, starts)
+    has_vol = cum_vol > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = np.where(has_vol, cum_pv / cum_vol, np.nan)
+        sum_sq = _session_cumsum(_pow(hlc3 - vwap, 2.0) * vol, starts)
+        stdev = np.sqrt(np.where(has_vol, sum_sq / cum_vol, 0.0))
+
+    return pd.DataFrame({
+        "VWAP": vwap,
+        "UPPER": vwap + mult * stdev,
+        "LOWER": vwap - mult * stdev,
+    }, index=index)
+
+
+# -----------------------------------------------------------------
+# Incremental (one bar at a time) versions, O(1) state. Each update(...) returns the value for the
+# new bar, equal to the batch indicator's value at that bar.
+# -----------------------------------------------------------------
+class EWMState:
+    """pandas Series.ewm(span=span, adjust=False).mean(), including its NaN handling."""
+
+    def __init__(self, span):
+        com = (span - 1) / 2
+        alpha = 1.0 / (1.0 + com)
+        self._old_wt_factor = 1.0 - alpha
+        self._new_wt = alpha
+        self._old_wt = 1.0
+        self.value = np.nan
+
+    def update(self, x):
+        weighted = self.value
+        if weighted == weighted:
+            self._old_wt *= self._old_wt_factor
+            if x == x:
+                if weighted != x:
+                    weighted = (self._old_wt * weighted + self._new_wt * x) / (self._old_wt + self._new_wt)
+                self._old_wt = 1.0
+        elif x == x:
+            weighted = x
+        self.value = weighted
+        return weighted
+
+
+class EMAState:
+    """ema(): TA-Lib EMA seeded with the SMA of the first `period` values (leading NaNs skipped)."""
+
+    def __init__(self, period):
+        self.period = int(period)
+        self._k = 2.0 / (self.period + 1)
+        self._count = 0
+        self._total = 0.0
+        self.value = np.nan
+
+    def update(self, x):
+        if self._count >= self.period:
+            self.value = (x - self.value) * self._k + self.value
+        elif self._count or x == x:
+            self._total += x
+            self._count += 1
+            if self._count == self.period:
+                self.value = self._total / self.period
+        return self.value
+
+
+def session_key(ts: pd.Timestamp, session: str):
+    """Scalar session_keys(): bars with equal keys belong to the same session."""
+    if session == "D":
+        return ts.date()
+    if session == "W":
+        return ts.isocalendar()[1]
+    if session == "M":
+        return ts.year, ts.month
+    return None
+
+
+class AnchoredVWAPState:
+    """anchored_vwap(); update() returns (VWAP, UPPER, LOWER)."""
+
+    def __init__(self, session="W", mult=2.0):
+        self.session = session
+        self.mult = mult
+        self._key = None
+        self._started = False
+        self._cum_pv = self._cum_vol = self._sum_sq = 0.0
+
+    def update(self, ts, high, low, close, volume):
+        key = session_key(ts, self.session)
+        if self._started and key != self._key:
+            self._cum_pv = self._cum_vol = self._sum_sq = 0.0
+        self._key = key
+        self._started = True
+
+        h3 = (high + low + close) / 3
+        self._cum_pv += h3 * volume
+        self._cum_vol += volume
+        if self._cum_vol > 0:
+            vwap = self._cum_pv / self._cum_vol
+            self._sum_sq += (h3 - vwap) ** 2 * volume
+            stdev = math.sqrt(self._sum_sq / self._cum_vol)
+        else:
+            vwap = math.nan
+            self._sum_sq += (h3 - vwap) ** 2 * volume
+            stdev = 0.0
+        return vwap, vwap + self.mult * stdev, vwap - self.mult * stdev
@@ -0,0 +1,23 @@
+# utils/jit.py
+"""Optional Numba compilation for hot loops.
+
+njit() compiles with Numba when it is installed (vectorbt already pulls it
+in) and otherwise returns the plain Python function, so kernels decorated
+with it always work, just slower. NUMBA_AVAILABLE tells which one you got.
+"""
+try:
+    from numba import njit as _numba_njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    _numba_njit = None
+    NUMBA_AVAILABLE = False
+
+
+def njit(*args, **kwargs):
+    """numba.njit(cache=True, ...) or a no-op decorator; usable as @njit and @njit(...)."""
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return njit()(args[0])
+    if _numba_njit is None:
+        return lambda fn: fn
+    kwargs.setdefault("cache", True)
+    return _numba_njit(*args, **kwargs)
@@ -0,0 +1,152 @@
+# utils/kernels.py
+"""Compiled multi-period indicator kernels (see utils.jit).
+
+Each kernel makes one pass over the bars and updates every requested
+period at each bar, writing a (bars x periods) array. EMA, SMA, ATR and RSI
+follow TA-Lib's algorithms operation for operation (running-sum SMA, EMA
+seeded with an SMA, Wilder smoothing), so the output matches TA-Lib's, with
+leading NaNs skipped the way the TA-Lib wrapper skips them. Inputs are
+float64 arrays starting at the first bar where every input is valid.
+"""
+import numpy as np
+
+from utils.jit import njit
+
+
+def first_valid(*arrays) -> int:
+    """Index of the first bar where none of `arrays` is NaN (len if there is none)."""
+    valid = np.ones(len(arrays[0]), dtype=bool)
+    for a in arrays:
+        valid &= ~np.isnan(a)
+    hits = np.flatnonzero(valid)
+    return int(hits[0]) if len(hits) else len(valid)
+
+
+@njit
+def ema_multi_kernel(x, periods):
+    n, m = len(x), len(periods)
+    out = np.full((n, m), np.nan)
+    total = np.zeros(m)
+    prev = np.zeros(m)
+    k = np.empty(m)
+    for j in range(m):
+        k[j] = 2.0 / (periods[j] + 1)
+    for i in range(n):
+        v = x[i]
+        for j in range(m):
+            p = periods[j]
+            if i < p:
+                total[j] += v
+                if i == p - 1:
+                    prev[j] = total[j] / p
+                    out[i, j] = prev[j]
+            else:
+                prev[j] = (v - prev[j]) * k[j] + prev[j]
+                out[i, j] = prev[j]
+    return out
+
+
+@njit
+def sma_multi_kernel(x, periods):
+    n, m = len(x), len(periods)
+    out = np.full((n, m), np.nan)
+    total = np.zeros(m)
+    for i in range(n):
+        v = x[i]
+        for j in range(m):
+            p = periods[j]
+            total[j] += v
+            if i >= p - 1:
+                out[i, j] = total[j] / p
+                total[j] -= x[i - p + 1]
+    return out
+
+
+@njit
+def atr_multi_kernel(high, low, close, periods):
+    n, m = len(close), len(periods)
+    out = np.full((n, m), np.nan)
+    total = np.zeros(m)
+    prev = np.zeros(m)
+    for i in range(1, n):
+        # True range (TA-Lib TRANGE)
+        tr = high[i] - low[i]
+        d = abs(close[i - 1] - high[i])
+        if d > tr:
+            tr = d
+        d = abs(close[i - 1] - low[i])
+        if d > tr:
+            tr = d
+        for j in range(m):
+            p = periods[j]
+            if p <= 1:
+                out[i, j] = tr
+            elif i <= p:
+                total[j] += tr
+                if i == p:
+                    prev[j] = total[j] / p
+                    out[i, j] = prev[j]
+            else:
+                prev[j] *= p - 1
+                prev[j] += tr
+                prev[j] /= p
+                out[i, j] = prev[j]
+    return out
+
+
+@njit
+def rsi_multi_kernel(x, periods):
+    n, m = len(x), len(periods)
+    out = np.full((n, m), np.nan)
+    gain = np.zeros(m)
+    loss = np.zeros(m)
+    for i in range(1, n):
+        diff = x[i] - x[i - 1]
+        for j in range(m):
+            p = periods[j]
+            if i <= p:
+                if diff < 0:
+                    loss[j] -= diff
+                else:
+                    gain[j] += diff
+                if i < p:
+                    continue
+                loss[j] /= p
+                gain[j] /= p
+            else:
+                loss[j] *= p - 1
+                gain[j] *= p - 1
+                if diff < 0:
+                    loss[j] -= diff
+                else:
+                    gain[j] += diff
+                loss[j] /= p
+                gain[j] /= p
+            total = gain[j] + loss[j]
+            out[i, j] = 100.0 * (gain[j] / total) if not (-1e-8 < total < 1e-8) else 0.0
+    return out
+
+
+@njit
+def rolling_vwap_multi_kernel(hlc3, volume, periods):
+    """sum(hlc3 * volume) / sum(volume) over each window; NaN while the window has no volume."""
+    n, m = len(hlc3), len(periods)
+    out = np.full((n, m), np.nan)
+    pv_sum = np.zeros(m)
+    vol_sum = np.zeros(m)
+    traded = np.zeros(m, np.int64)      # bars with volume in the window: running sums may not return to exactly 0
+    for i in range(n):
+        pv = hlc3[i] * volume[i]
+        for j in range(m):
+            p = periods[j]
+            pv_sum[j] += pv
+            vol_sum[j] += volume[i]
+            traded[j] += volume[i] > 0
+            if i >= p - 1:
+                if traded[j] > 0 and vol_sum[j] > 0:
+                    out[i, j] = pv_sum[j] / vol_sum[j]
+                k = i - p + 1
+                pv_sum[j] -= hlc3[k] * volume[k]
+                vol_sum[j] -= volume[k]
+                traded[j] -= volume[k] > 0
+    return out
@@ -5,6 +5,8 @@ from plotly.subplots import make_subplots
 import pandas as pd
 from pathlib import Path
 
+from strategies.signal_frame import BUY, SELL, as_signal_frame
+
 
 def save_full_html_report(df, trades, stats, equity, outfile, meta=None):
     """Generate a full HTML backtest report and save it under backtest/reports.
@@ -13,8 +15,9 @@ def save_full_html_report(df, trades, stats, equity, outfile, meta=None):
     ----------
     df : pd.DataFrame
         Price/indicator DataFrame (expects open/high/low/close and optional EMA columns).
-    trades : list[dict]
-        List of trade dictionaries with at least keys: side (buy/sell), timestamp.
+    trades : list[dict] or SignalFrame
+        Trade dictionaries with at least keys: side (buy/sell), timestamp; or a SignalFrame
+        over df's bars.
     stats : dict
         Mapping of metric name -> value for the stats table.
     equity : pd.Series
@@ -54,22 +57,24 @@ def save_full_html_report(df, trades, stats, equity, outfile, meta=None):
         ), row=1, col=1)
 
     # --- Trades
-    buys  = [t for t in trades if t["side"] == "buy"]
-    sells = [t for t in trades if t["side"] == "sell"]
+    marks = as_signal_frame(trades, df.index)
+    close = df["close"].to_numpy()
+    buys = marks.pos[marks.side == BUY]
+    sells = marks.pos[marks.side == SELL]
 
-    if buys:
+    if len(buys):
         fig.add_trace(go.Scatter(
-            x=[pd.Timestamp(t["timestamp"]) for t in buys],
-            y=[df.loc[pd.Timestamp(t["timestamp"]), "close"] for t in buys],
+            x=df.index[buys],
+            y=close[buys],
             mode="markers",
             marker=dict(size=10, symbol="triangle-up", color="green"),
             name="Buys"
         ), row=1, col=1)
 
-    if sells:
+    if len(sells):
         fig.add_trace(go.Scatter(
-            x=[pd.Timestamp(t["timestamp"]) for t in sells],
-            y=[df.loc[pd.Timestamp(t["timestamp"]), "close"] for t in sells],
+            x=df.index[sells],
+            y=close[sells],
             mode="markers",
             marker=dict(size=10, symbol="triangle-down", color="red"),
             name="Sells"
@@ -2,6 +2,8 @@
 
 import plotly.graph_objects as go
 
+from strategies.signal_frame import BUY, SELL, as_signal_frame
+
 def plot_candles_with_indicators(df, indicators=None, trades=None, title="Backtest Chart"):
     fig = go.Figure()
     fig.add_trace(go.Candlestick(
@@ -11,21 +13,23 @@ def plot_candles_with_indicators(df, indicators=None, trades=None, title="Backte
         for name, series in indicators.items():
             line_name = "EMA 9" if "FAST" in name else ("EMA 21" if "SLOW" in name else name)
             fig.add_trace(go.Scatter(x=df.index, y=series, mode='lines', name=line_name))
-    if trades:
-        buy  = [t for t in trades if t["side"] == "buy"]
-        sell = [t for t in trades if t["side"] == "sell"]
-        if buy:
+    if trades is not None and len(trades):
+        marks = as_signal_frame(trades, df.index)
+        close = df["close"].to_numpy()
+        buy = marks.pos[marks.side == BUY]
+        sell = marks.pos[marks.side == SELL]
+        if len(buy):
             fig.add_trace(go.Scatter(
-                x=[t["timestamp"] for t in buy],
-                y=[df.loc[t["timestamp"], "close"] for t in buy],
+                x=df.index[buy],
+                y=close[buy],
                 mode="markers",
                 marker=dict(color="green", size=10, symbol="triangle-up"),
                 name="Buys"
             ))
-        if sell:
+        if len(sell):
             fig.add_trace(go.Scatter(
-                x=[t["timestamp"] for t in sell],
-                y=[df.loc[t["timestamp"], "close"] for t in sell],
+                x=df.index[sell],
+                y=close[sell],
                 mode="markers",
                 marker=dict(color="red", size=10, symbol="triangle-down"),
                 name="Sells"